@@ -0,0 +1,393 @@
+"""
+End-to-end benchmark of the AMQP hot path: login, refresh and register messages go through
+the real RabbitMQApiGatewayListener, use cases, services and RabbitMQUserAdapter, on top of
+an in-memory broker (benchmarks.fake_broker) and the stub User Service.
+
+For every operation and concurrency level, `concurrency` simulated API Gateway clients send
+requests back to back for the given duration. p50/p99 latency and messages/sec are reported
+and can be written as JSON, and compared with a previous run to catch regressions.
+
+The in-memory broker has no network hops, so the numbers are the cost of the service itself
+(plus the stub User Service latency), not of a real deployment.
+
+Usage:
+    python -m benchmarks.amqp_pipeline [--operations login,refresh,register] [--concurrency 1,8,64]
+        [--duration S] [--bcrypt-rounds R] [--executor process|thread] [--user-service-latency-ms MS]
+        [--users N] [--json PATH] [--compare PATH] [--max-regression PERCENT]
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import logging
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import uuid
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+import aio_pika
+
+from benchmarks.fake_broker import InMemoryConnectionManager
+from benchmarks.stub_user_service import StubUserService
+from src.application.services.async_password_hasher import AsyncPasswordHasher
+from src.application.services.auth_service import AuthService
+from src.application.services.jwt_service import JWTService
+from src.application.services.password_hasher import BcryptPasswordHasher
+from src.application.services.session_token_service import SessionTokenService
+from src.application.use_cases.login import LoginUseCase
+from src.application.use_cases.logout import LogoutUseCase
+from src.application.use_cases.refresh import RefreshUseCase
+from src.application.use_cases.register import RegisterUseCase
+from src.application.use_cases.verify import VerifyTokenUseCase
+from src.core.logger import LoggerService
+from src.domain.schemas import RolesEnum
+from src.infrastructure.adapters.caching_user_adapter import CachingUserAdapter
+from src.infrastructure.adapters.in_memory_token_store import InMemoryTokenStore
+from src.infrastructure.adapters.rabbitmq_api_gateway_listener import RabbitMQApiGatewayListener
+from src.infrastructure.adapters.rabbitmq_user_adapter import RabbitMQUserAdapter
+from src.infrastructure.codecs import MessageCodecRegistry
+
+PASSWORD = 'correct horse battery staple'
+OPERATIONS = ('login', 'refresh', 'register')
+
+# Numbers of the registered users, unique over the whole run
+_registrations = itertools.count()
+
+# Sends one request and returns the reply: (operation type, payload) -> {"success", "body", ...}
+Call = Callable[[str, Dict[str, Any]], Awaitable[Dict[str, Any]]]
+
+
+class GatewayClient:
+    """Sends requests to 'AUTH.all' the way the API Gateway does and waits for the replies."""
+
+    def __init__(self, connection_manager: InMemoryConnectionManager, codecs: MessageCodecRegistry):
+        self._connection_manager = connection_manager
+        self._codec = codecs.default
+        self._codecs = codecs
+        self._reply_queue_name = f'API-GATEWAY.response-{uuid.uuid4()}'
+        self._pending: Dict[str, asyncio.Future] = {}
+        self._exchange = None
+
+    async def start(self) -> None:
+        channel = await self._connection_manager.open_channel()
+        self._exchange = await channel.declare_exchange(
+            'API-GATEWAY-to-AUTH-SERVICE-exchange.direct',
+            aio_pika.ExchangeType.DIRECT,
+            durable=True
+        )
+        reply_queue = await channel.declare_queue(self._reply_queue_name, exclusive=True)
+        await reply_queue.consume(self._on_reply, no_ack=True)
+
+    async def call(self, operation_type: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+        correlation_id = str(uuid.uuid4())
+        future = self._pending[correlation_id] = asyncio.get_running_loop().create_future()
+        await self._exchange.publish(
+            aio_pika.Message(
+                body=self._codec.encode({"operation_type": operation_type, **payload}),
+                content_type=self._codec.content_type,
+                correlation_id=correlation_id,
+                reply_to=self._reply_queue_name
+            ),
+            routing_key='AUTH.all'
+        )
+        return await future
+
+    async def _on_reply(self, message) -> None:
+        future = self._pending.pop(message.correlation_id, None)
+        if future is not None and not future.done():
+            future.set_result(self._codecs.get(message.content_type).decode(message.body))
+
+
+class Service:
+    """
+    The Auth Service wired like in src.main, with the real login use case, on the in-memory
+    broker by default. Exposes the use cases and codecs like src.main.Dependencies, so it can
+    back the HTTP endpoints too.
+    """
+
+    def __init__(self, args: argparse.Namespace, connection_manager=None):
+        self.connection_manager = connection_manager or InMemoryConnectionManager()
+        self.codecs = MessageCodecRegistry()
+        self.user_service = StubUserService(latency=args.user_service_latency_ms / 1000)
+        self.user_service.seed(args.users, PASSWORD, password_hasher=BcryptPasswordHasher(rounds=args.bcrypt_rounds))
+
+        # Only the records of the sampled 'message_processed' events would be printed otherwise
+        logger = LoggerService('benchmark', 'benchmark_log.log', console_level=logging.WARNING)
+        jwt_service = JWTService()
+        self.password_hasher = AsyncPasswordHasher(
+            password_hasher=BcryptPasswordHasher(rounds=args.bcrypt_rounds),
+            executor_type=args.executor
+        )
+        session_token_service = SessionTokenService(
+            jwt_service=jwt_service,
+            token_store=InMemoryTokenStore(),
+            logger=logger
+        )
+        user_adapter = CachingUserAdapter(
+            user_adapter=RabbitMQUserAdapter(
+                logger=logger,
+                codecs=self.codecs,
+                connection_manager=self.connection_manager
+            )
+        )
+        self.login_use_case = LoginUseCase(
+            user_adapter=user_adapter,
+            session_token_service=session_token_service,
+            auth_service=AuthService(password_hasher=self.password_hasher),
+            logger=logger
+        )
+        self.refresh_use_case = RefreshUseCase(
+            jwt_service=jwt_service,
+            session_token_service=session_token_service,
+            logger=logger
+        )
+        self.register_use_case = RegisterUseCase(
+            user_adapter=user_adapter,
+            password_hasher=self.password_hasher,
+            logger=logger
+        )
+        self.listener = RabbitMQApiGatewayListener(
+            login_use_case=self.login_use_case,
+            refresh_use_case=self.refresh_use_case,
+            register_use_case=self.register_use_case,
+            verify_use_case=VerifyTokenUseCase(jwt_service=jwt_service, logger=logger),
+            logout_use_case=LogoutUseCase(
+                jwt_service=jwt_service,
+                session_token_service=session_token_service,
+                logger=logger
+            ),
+            logger=logger,
+            codecs=self.codecs,
+            connection_manager=self.connection_manager
+        )
+        self.client = GatewayClient(self.connection_manager, self.codecs)
+
+    async def start(self) -> None:
+        await self.password_hasher.start()
+        await self.user_service.serve(self.connection_manager)
+        await self.listener.start_listening()
+        await self.client.start()
+
+    async def stop(self) -> None:
+        await self.listener.stop_listening()
+        await self.user_service.stop()
+        await self.password_hasher.shutdown()
+
+
+class Workload:
+    """Builds the request payloads of an operation, one simulated client at a time."""
+
+    def __init__(self, operation_type: str, call: Call, users: int):
+        self.operation_type = operation_type
+        self._call = call
+        self._users = users
+        self._counter = itertools.count()
+        # Refresh: the latest refresh token of every client, rotated by every request
+        self._refresh_tokens: Dict[int, str] = {}
+
+    async def prepare(self, client_id: int) -> None:
+        if self.operation_type == 'refresh':
+            reply = await self._call('login', self._login_payload(client_id))
+            self._refresh_tokens[client_id] = reply['body']['refresh_token']
+
+    def payload(self, client_id: int) -> Dict[str, Any]:
+        if self.operation_type == 'login':
+            return self._login_payload(next(self._counter))
+        if self.operation_type == 'refresh':
+            return {"refresh_token": self._refresh_tokens[client_id]}
+
+        number = next(_registrations)
+        return {
+            "email": f'new-user{number}@example.com',
+            "phone_number": f'+8{number:010d}',
+            "password": PASSWORD,
+            "first_name": 'Bench',
+            "last_name": f'User{number}',
+            "roles": [RolesEnum.USER.value],
+        }
+
+    def on_reply(self, client_id: int, reply: Dict[str, Any]) -> None:
+        if self.operation_type == 'refresh' and reply.get('success'):
+            self._refresh_tokens[client_id] = reply['body']['refresh_token']
+
+    def _login_payload(self, number: int) -> Dict[str, Any]:
+        # Spread the logins over the users, so concurrent logins are not coalesced
+        return {"email": f'user{number % self._users}@example.com', "password": PASSWORD}
+
+
+def percentile(sorted_values: List[float], share: float) -> float:
+    """Nearest-rank percentile of already sorted values."""
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, max(0, int(round(share * len(sorted_values))) - 1))]
+
+
+async def run_level(call: Call, operation_type: str, concurrency: int, duration: float, users: int) -> dict:
+    workload = Workload(operation_type, call, users)
+    await asyncio.gather(*(workload.prepare(client_id) for client_id in range(concurrency)))
+
+    latencies: List[float] = []
+    errors = 0
+    deadline = time.perf_counter() + duration
+
+    async def client(client_id: int) -> None:
+        nonlocal errors
+        while time.perf_counter() < deadline:
+            started_at = time.perf_counter()
+            reply = await call(operation_type, workload.payload(client_id))
+            latencies.append(time.perf_counter() - started_at)
+            if not reply.get('success'):
+                errors += 1
+            workload.on_reply(client_id, reply)
+
+    started_at = time.perf_counter()
+    await asyncio.gather(*(client(client_id) for client_id in range(concurrency)))
+    elapsed = time.perf_counter() - started_at
+
+    latencies.sort()
+    return {
+        "operation": operation_type,
+        "concurrency": concurrency,
+        "requests": len(latencies),
+        "errors": errors,
+        "messages_per_second": len(latencies) / elapsed,
+        "p50_ms": percentile(latencies, 0.50) * 1000,
+        "p99_ms": percentile(latencies, 0.99) * 1000,
+        "mean_ms": statistics.fmean(latencies) * 1000 if latencies else 0.0,
+        "max_ms": latencies[-1] * 1000 if latencies else 0.0,
+    }
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results: List[dict], baseline_path: str, max_regression: float) -> bool:
+    """
+    Prints the change of every result against the same operation and concurrency of the baseline run.
+
+    Returns:
+        False when the p99 latency or the throughput of any result regressed by more than `max_regression` percent.
+    """
+    with open(baseline_path) as file:
+        baseline = {(result['operation'], result['concurrency']): result for result in json.load(file)['results']}
+
+    within_budget = True
+    print(f"\nCompared with {baseline_path}:")
+    for result in results:
+        previous = baseline.get((result['operation'], result['concurrency']))
+        if previous is None:
+            continue
+
+        p99_change = (result['p99_ms'] / previous['p99_ms'] - 1) * 100 if previous['p99_ms'] else 0.0
+        throughput_change = (
+            (result['messages_per_second'] / previous['messages_per_second'] - 1) * 100
+            if previous['messages_per_second'] else 0.0
+        )
+        regressed = p99_change > max_regression or -throughput_change > max_regression
+        within_budget = within_budget and not regressed
+        print(
+            f"{result['operation']:<10} x{result['concurrency']:<5} p99 {p99_change:+7.1f}%  "
+            f"msg/s {throughput_change:+7.1f}%{'  REGRESSION' if regressed else ''}"
+        )
+
+    return within_budget
+
+
+async def run(args: argparse.Namespace) -> List[dict]:
+    service = Service(args)
+    await service.start()
+    results = []
+    try:
+        for operation_type in args.operations:
+            for concurrency in args.concurrency:
+                result = await run_level(service.client.call, operation_type, concurrency, args.duration, args.users)
+                results.append(result)
+                print_result(result)
+    finally:
+        await service.stop()
+
+    return results
+
+
+def _csv(cast):
+    return lambda value: [cast(item) for item in value.split(',') if item.strip()]
+
+
+def add_arguments(parser: argparse.ArgumentParser) -> None:
+    """Adds the workload and service arguments shared by the end-to-end benchmarks."""
+    parser.add_argument('--operations', type=_csv(str), default=list(OPERATIONS))
+    parser.add_argument('--concurrency', type=_csv(int), default=[1, 8, 64])
+    parser.add_argument('--duration', type=float, default=5, help='Seconds per operation and concurrency level')
+    parser.add_argument('--bcrypt-rounds', type=int, default=10)
+    parser.add_argument('--executor', choices=('process', 'thread'), default='process')
+    parser.add_argument('--user-service-latency-ms', type=float, default=1)
+    parser.add_argument('--users', type=int, default=1000)
+    parser.add_argument('--json', help='Path of a file to write the results to')
+
+
+def parse_arguments(parser: argparse.ArgumentParser) -> argparse.Namespace:
+    args = parser.parse_args()
+    unknown = set(args.operations) - set(OPERATIONS)
+    if unknown:
+        parser.error(f"Unknown operations: {', '.join(sorted(unknown))}")
+
+    return args
+
+
+def write_results(path: str, benchmark: str, args: argparse.Namespace, results: List[dict], **parameters: Any) -> None:
+    """Writes the results with the run parameters, the commit and the host, so runs can be compared."""
+    with open(path, 'w') as file:
+        json.dump({
+            "benchmark": benchmark,
+            "timestamp": time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+            "git_commit": _git_commit(),
+            "python": platform.python_version(),
+            "cpu_count": os.cpu_count(),
+            "parameters": {
+                "duration": args.duration,
+                "bcrypt_rounds": args.bcrypt_rounds,
+                "executor": args.executor,
+                "user_service_latency_ms": args.user_service_latency_ms,
+                "users": args.users,
+                **parameters,
+            },
+            "results": results,
+        }, file, indent=2)
+
+
+def print_result(result: dict, label: str = '') -> None:
+    print(
+        f"{label}{result['operation']:<10} x{result['concurrency']:<5} {result['messages_per_second']:>9.1f} msg/s  "
+        f"p50 {result['p50_ms']:>8.2f} ms  p99 {result['p99_ms']:>8.2f} ms  "
+        f"errors {result['errors']}/{result['requests']}"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    add_arguments(parser)
+    parser.add_argument('--compare', help='Path of the results of a previous run to compare with')
+    parser.add_argument('--max-regression', type=float, default=10, help='Percent, fails the comparison when exceeded')
+    args = parse_arguments(parser)
+
+    results = asyncio.run(run(args))
+
+    if args.json:
+        write_results(args.json, 'amqp_pipeline', args, results)
+
+    if args.compare and not compare(results, args.compare, args.max_regression):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
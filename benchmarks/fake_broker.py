@@ -0,0 +1,244 @@
+"""
+In-memory stand-in for the parts of aio_pika the service uses: exchanges, queues,
+consumers with prefetch, acknowledgements, the default exchange and delay queues
+(a message TTL with a dead-letter exchange).
+
+InMemoryConnectionManager has the interface of RabbitMQConnectionManager, so the real
+listener and adapters run unchanged on top of it, without a broker and without I/O.
+Messages are delivered on the event loop in publish order, like a single broker node.
+"""
+import asyncio
+import itertools
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple
+
+import aio_pika
+
+
+class InMemoryIncomingMessage:
+    """Delivered message, with the attributes and acknowledgement methods of aio_pika.IncomingMessage."""
+
+    def __init__(self, message: aio_pika.Message, routing_key: str, queue: 'InMemoryQueue', redelivered: bool = False,
+                 on_settled: Optional[Callable[[], None]] = None):
+        self.body = message.body
+        self.headers = dict(message.headers or {})
+        self.content_type = message.content_type
+        self.correlation_id = message.correlation_id
+        self.reply_to = message.reply_to
+        self.message_id = message.message_id
+        self.delivery_mode = message.delivery_mode
+        self.routing_key = routing_key
+        self.redelivered = redelivered
+        self.processed = False
+        self._message = message
+        self._queue = queue
+        self._on_settled = on_settled
+
+    async def ack(self) -> None:
+        self._settle()
+
+    async def reject(self, requeue: bool = False) -> None:
+        self._settle()
+        if requeue:
+            self._queue.put(self._message, self.routing_key, redelivered=True)
+
+    async def nack(self, requeue: bool = True) -> None:
+        await self.reject(requeue=requeue)
+
+    @asynccontextmanager
+    async def process(self, requeue: bool = False, ignore_processed: bool = False) -> AsyncIterator['InMemoryIncomingMessage']:
+        try:
+            yield self
+        except BaseException:
+            if not (ignore_processed and self.processed):
+                await self.reject(requeue=requeue)
+            raise
+        if not (ignore_processed and self.processed):
+            await self.ack()
+
+    def _settle(self) -> None:
+        if self.processed:
+            raise RuntimeError("Message is already processed.")
+        self.processed = True
+        if self._on_settled is not None:
+            self._on_settled()
+
+
+class InMemoryQueue:
+    def __init__(self, broker: 'InMemoryBroker', name: str, arguments: Optional[Dict[str, Any]] = None):
+        self._broker = broker
+        self.name = name
+        self.arguments = arguments or {}
+        self._messages: asyncio.Queue = asyncio.Queue()
+        self._consumers: Dict[str, asyncio.Task] = {}
+        self._deliveries: set = set()
+
+    async def bind(self, exchange: 'InMemoryExchange', routing_key: Optional[str] = None) -> None:
+        self._broker.bind(exchange.name, routing_key or self.name, self)
+
+    async def consume(self, callback: Callable[[InMemoryIncomingMessage], Awaitable[Any]], no_ack: bool = False,
+                      prefetch_count: int = 0) -> str:
+        consumer_tag = f'ctag-{next(self._broker.tags)}'
+        self._consumers[consumer_tag] = asyncio.create_task(self._consume(callback, no_ack, prefetch_count))
+        return consumer_tag
+
+    async def cancel(self, consumer_tag: str) -> None:
+        task = self._consumers.pop(consumer_tag, None)
+        if task is not None:
+            task.cancel()
+
+    def put(self, message: aio_pika.Message, routing_key: str, redelivered: bool = False) -> None:
+        ttl = self.arguments.get('x-message-ttl')
+        if ttl is not None:
+            # Only delay queues have a TTL here: they have no consumers, every message expires
+            asyncio.get_running_loop().call_later(ttl / 1000, self._expire, message, routing_key)
+            return
+        self._messages.put_nowait((message, routing_key, redelivered))
+
+    def _expire(self, message: aio_pika.Message, routing_key: str) -> None:
+        exchange_name = self.arguments.get('x-dead-letter-exchange')
+        if exchange_name is None:
+            return
+        exchange = self._broker.exchanges[exchange_name] if exchange_name else self._broker.default_exchange
+        self._broker.route(exchange, message, self.arguments.get('x-dead-letter-routing-key', routing_key))
+
+    async def _consume(self, callback, no_ack: bool, prefetch_count: int) -> None:
+        unacknowledged = asyncio.Semaphore(prefetch_count) if prefetch_count and not no_ack else None
+        while True:
+            message, routing_key, redelivered = await self._messages.get()
+            if unacknowledged is not None:
+                await unacknowledged.acquire()
+
+            incoming = InMemoryIncomingMessage(
+                message, routing_key, self, redelivered,
+                on_settled=unacknowledged.release if unacknowledged is not None else None
+            )
+            if no_ack:
+                incoming.processed = True
+
+            # Keep a reference to the delivery tasks, the event loop only keeps weak ones
+            delivery = asyncio.create_task(callback(incoming))
+            self._deliveries.add(delivery)
+            delivery.add_done_callback(self._deliveries.discard)
+
+
+class InMemoryExchange:
+    def __init__(self, broker: 'InMemoryBroker', name: str, exchange_type: aio_pika.ExchangeType):
+        self._broker = broker
+        self.name = name
+        self.type = exchange_type
+
+    async def publish(self, message: aio_pika.Message, routing_key: str, **_kwargs) -> None:
+        self._broker.route(self, message, routing_key)
+
+
+class InMemoryChannel:
+    def __init__(self, broker: 'InMemoryBroker'):
+        self._broker = broker
+        self._prefetch_count = 0
+        self.is_closed = False
+        self.default_exchange = broker.default_exchange
+
+    async def set_qos(self, prefetch_count: int = 0, **_kwargs) -> None:
+        self._prefetch_count = prefetch_count
+
+    async def declare_exchange(self, name: str, type: aio_pika.ExchangeType = aio_pika.ExchangeType.DIRECT,
+                               **_kwargs) -> InMemoryExchange:
+        return self._broker.declare_exchange(name, type)
+
+    async def get_exchange(self, name: str, ensure: bool = True) -> InMemoryExchange:
+        return self._broker.exchanges[name]
+
+    async def declare_queue(self, name: Optional[str] = None, arguments: Optional[Dict[str, Any]] = None,
+                            **_kwargs) -> '_ChannelQueue':
+        return _ChannelQueue(self._broker.declare_queue(name, arguments), self)
+
+    async def close(self) -> None:
+        self.is_closed = True
+
+
+class _ChannelQueue:
+    """Queue as seen through a channel, its consumers get the prefetch count of the channel."""
+
+    def __init__(self, queue: InMemoryQueue, channel: InMemoryChannel):
+        self._queue = queue
+        self._channel = channel
+        self.name = queue.name
+
+    async def bind(self, exchange: InMemoryExchange, routing_key: Optional[str] = None) -> None:
+        await self._queue.bind(exchange, routing_key)
+
+    async def consume(self, callback, no_ack: bool = False) -> str:
+        return await self._queue.consume(callback, no_ack=no_ack, prefetch_count=self._channel._prefetch_count)
+
+    async def cancel(self, consumer_tag: str) -> None:
+        await self._queue.cancel(consumer_tag)
+
+
+class InMemoryBroker:
+    """Exchanges, queues and bindings shared by all the in-memory channels."""
+
+    def __init__(self):
+        self.tags = itertools.count(1)
+        self.queues: Dict[str, InMemoryQueue] = {}
+        self.exchanges: Dict[str, InMemoryExchange] = {}
+        self.default_exchange = InMemoryExchange(self, '', aio_pika.ExchangeType.DIRECT)
+        # Exchange name -> (routing key, queue) bindings
+        self._bindings: Dict[str, List[Tuple[str, InMemoryQueue]]] = {}
+        self.unroutable: int = 0
+
+    def declare_exchange(self, name: str, exchange_type: aio_pika.ExchangeType) -> InMemoryExchange:
+        exchange = self.exchanges.get(name)
+        if exchange is None:
+            exchange = self.exchanges[name] = InMemoryExchange(self, name, exchange_type)
+        return exchange
+
+    def declare_queue(self, name: Optional[str], arguments: Optional[Dict[str, Any]] = None) -> InMemoryQueue:
+        name = name or f'amq.gen-{next(self.tags)}'
+        queue = self.queues.get(name)
+        if queue is None:
+            queue = self.queues[name] = InMemoryQueue(self, name, arguments)
+        return queue
+
+    def bind(self, exchange_name: str, routing_key: str, queue: InMemoryQueue) -> None:
+        self._bindings.setdefault(exchange_name, []).append((routing_key, queue))
+
+    def route(self, exchange: InMemoryExchange, message: aio_pika.Message, routing_key: str) -> None:
+        if exchange is self.default_exchange:
+            queues = [self.queues[routing_key]] if routing_key in self.queues else []
+        elif exchange.type == aio_pika.ExchangeType.FANOUT:
+            queues = [queue for _key, queue in self._bindings.get(exchange.name, [])]
+        else:
+            queues = [queue for key, queue in self._bindings.get(exchange.name, []) if key == routing_key]
+
+        if not queues:
+            self.unroutable += 1
+        for queue in queues:
+            queue.put(message, routing_key)
+
+
+class InMemoryConnectionManager:
+    """Drop-in replacement of RabbitMQConnectionManager backed by an InMemoryBroker."""
+
+    def __init__(self, broker: Optional[InMemoryBroker] = None):
+        self.broker = broker or InMemoryBroker()
+        self._publishing_channel = InMemoryChannel(self.broker)
+
+    async def connect(self) -> None:
+        pass
+
+    async def open_channel(self, publisher_confirms: bool = False) -> InMemoryChannel:
+        return InMemoryChannel(self.broker)
+
+    @asynccontextmanager
+    async def acquire_channel(self, workload: str) -> AsyncIterator[InMemoryChannel]:
+        yield self._publishing_channel
+
+    def add_close_callback(self, callback: Callable) -> None:
+        pass
+
+    def add_reconnect_callback(self, callback: Callable) -> None:
+        pass
+
+    async def close(self) -> None:
+        pass
@@ -0,0 +1,132 @@
+"""
+Compares the end-to-end latency of the AMQP and HTTP paths of the same service instance.
+
+AMQP: requests go through 'AUTH.all' and the RabbitMQApiGatewayListener, like from the API Gateway.
+HTTP: requests are POSTed to the /auth/* endpoints of the FastAPI app, served by uvicorn on
+the loopback interface, over keep-alive connections (one per simulated client).
+
+Both paths run the same use cases, hasher and User Service adapter. By default the broker is
+the in-memory one (no network hop at all, so the AMQP numbers are a lower bound); pass
+--broker rabbitmq to send the AMQP requests and the User Service calls through the RabbitMQ
+configured in the settings.
+
+Usage:
+    python -m benchmarks.http_vs_amqp [--broker memory|rabbitmq] [--operations login,refresh,register]
+        [--concurrency 1,8,64] [--duration S] [--bcrypt-rounds R] [--executor process|thread]
+        [--user-service-latency-ms MS] [--users N] [--json PATH]
+"""
+import argparse
+import asyncio
+import json
+import logging
+from typing import Any, Dict, List, Tuple
+
+import uvicorn
+from fastapi import FastAPI
+
+from benchmarks.amqp_pipeline import Service, add_arguments, parse_arguments, print_result, run_level, write_results
+from src.core.logger import LoggerService
+from src.core.middleware.clients_filter_middleware import IPFilterMiddleware
+from src.core.middleware.exception_middleware import ExceptionMiddleware
+from src.infrastructure.http.routes import router
+from src.infrastructure.rabbitmq_connection_manager import RabbitMQConnectionManager
+
+HOST = '127.0.0.1'
+
+
+class HttpClient:
+    """Minimal HTTP/1.1 client reusing its connections, so every request measures the service, not the handshake."""
+
+    def __init__(self, host: str, port: int):
+        self._host = host
+        self._port = port
+        self._idle: List[Tuple[asyncio.StreamReader, asyncio.StreamWriter]] = []
+
+    async def call(self, operation_type: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+        reader, writer = self._idle.pop() if self._idle else await asyncio.open_connection(self._host, self._port)
+        body = json.dumps(payload).encode()
+        writer.write(
+            f'POST /auth/{operation_type} HTTP/1.1\r\n'
+            f'Host: {self._host}:{self._port}\r\n'
+            f'Content-Type: application/json\r\n'
+            f'Content-Length: {len(body)}\r\n\r\n'.encode() + body
+        )
+
+        head = await reader.readuntil(b'\r\n\r\n')
+        status_line, *header_lines = head.decode('latin-1').split('\r\n')
+        headers = dict(line.split(':', 1) for line in header_lines if ':' in line)
+        content_length = next(int(value) for name, value in headers.items() if name.lower() == 'content-length')
+        response_body = await reader.readexactly(content_length)
+        self._idle.append((reader, writer))
+
+        status_code = int(status_line.split(' ', 2)[1])
+        return {"success": status_code < 400, "status_code": status_code, "body": json.loads(response_body)}
+
+    async def close(self) -> None:
+        idle, self._idle = self._idle, []
+        for _reader, writer in idle:
+            writer.close()
+
+
+def create_app(service: Service) -> FastAPI:
+    """The FastAPI app of src.main (routes and middlewares), backed by the benchmark service."""
+    app = FastAPI()
+    app.include_router(router)
+    app.add_middleware(IPFilterMiddleware, allowed_networks=[HOST])
+    app.add_middleware(ExceptionMiddleware)
+    app.state.dependencies = service
+    return app
+
+
+async def run(args: argparse.Namespace) -> List[dict]:
+    connection_manager = None
+    if args.broker == 'rabbitmq':
+        connection_manager = RabbitMQConnectionManager(logger=LoggerService('benchmark', 'benchmark_log.log'))
+    service = Service(args, connection_manager)
+    await service.start()
+
+    server = uvicorn.Server(uvicorn.Config(
+        create_app(service), host=HOST, port=0, lifespan='off', log_level='warning', access_log=False
+    ))
+    server_task = asyncio.create_task(server.serve())
+    while not server.started:
+        await asyncio.sleep(0.01)
+    port = server.servers[0].sockets[0].getsockname()[1]
+    http_client = HttpClient(HOST, port)
+
+    results = []
+    try:
+        for operation_type in args.operations:
+            for concurrency in args.concurrency:
+                for transport, call in (('amqp', service.client.call), ('http', http_client.call)):
+                    result = await run_level(call, operation_type, concurrency, args.duration, args.users)
+                    result['transport'] = transport
+                    results.append(result)
+                    print_result(result, label=f'{transport:<5} ')
+    finally:
+        await http_client.close()
+        server.should_exit = True
+        await server_task
+        await service.stop()
+        if connection_manager is not None:
+            await connection_manager.close()
+
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    add_arguments(parser)
+    parser.add_argument('--broker', choices=('memory', 'rabbitmq'), default='memory')
+    args = parse_arguments(parser)
+    # uvicorn and the FastAPI app log through the root logger
+    logging.basicConfig(level=logging.WARNING)
+
+    results = asyncio.run(run(args))
+
+    if args.json:
+        write_results(args.json, 'http_vs_amqp', args, results, broker=args.broker)
+
+
+if __name__ == '__main__':
+    main()
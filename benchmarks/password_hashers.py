@@ -0,0 +1,100 @@
+"""
+Password hasher benchmark: verify throughput per core of bcrypt and Argon2id.
+
+Every worker process verifies the same password in a loop for the given duration,
+one worker per core, the way AsyncPasswordHasher runs them in production.
+
+Usage:
+    python -m benchmarks.password_hashers [--processes N] [--duration S] [--bcrypt-rounds R]
+        [--argon2-time-cost T] [--argon2-memory-cost KIB] [--argon2-parallelism P] [--json PATH]
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from src.application.services.password_hasher import BcryptPasswordHasher, Argon2PasswordHasher
+from src.domain.interfaces.password_hasher_interface import IPasswordHasher
+
+PASSWORD = 'correct horse battery staple'
+
+
+def _verify_loop(password_hasher: IPasswordHasher, password_hash: str, duration: float) -> int:
+    verifications = 0
+    deadline = time.perf_counter() + duration
+    while time.perf_counter() < deadline:
+        password_hasher.verify(PASSWORD, password_hash)
+        verifications += 1
+
+    return verifications
+
+
+def benchmark(name: str, password_hasher: IPasswordHasher, processes: int, duration: float) -> dict:
+    password_hash = password_hasher.hash(PASSWORD)
+    with ProcessPoolExecutor(max_workers=processes, mp_context=multiprocessing.get_context('spawn')) as executor:
+        # Warm up the workers, so the process start-up is not measured
+        list(executor.map(_verify_loop, [password_hasher] * processes, [password_hash] * processes, [0] * processes))
+
+        started_at = time.perf_counter()
+        counts = list(executor.map(
+            _verify_loop,
+            [password_hasher] * processes,
+            [password_hash] * processes,
+            [duration] * processes
+        ))
+        elapsed = time.perf_counter() - started_at
+
+    total = sum(counts)
+    return {
+        "backend": name,
+        "processes": processes,
+        "verifications": total,
+        "verifications_per_second": total / elapsed,
+        "verifications_per_second_per_core": total / elapsed / processes,
+        "mean_latency_ms": elapsed * processes / total * 1000 if total else None,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--processes', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--duration', type=float, default=5)
+    parser.add_argument('--bcrypt-rounds', type=int, default=12)
+    parser.add_argument('--argon2-time-cost', type=int, default=3)
+    parser.add_argument('--argon2-memory-cost', type=int, default=65536, help='KiB')
+    parser.add_argument('--argon2-parallelism', type=int, default=1)
+    parser.add_argument('--json', help='Path of a file to write the results to')
+    args = parser.parse_args()
+
+    backends = [(f'bcrypt (cost {args.bcrypt_rounds})', BcryptPasswordHasher(rounds=args.bcrypt_rounds))]
+    try:
+        backends.append((
+            f'argon2id (t={args.argon2_time_cost}, m={args.argon2_memory_cost}KiB, p={args.argon2_parallelism})',
+            Argon2PasswordHasher(
+                time_cost=args.argon2_time_cost,
+                memory_cost=args.argon2_memory_cost,
+                parallelism=args.argon2_parallelism
+            )
+        ))
+    except ImportError as e:
+        print(f"Skipping argon2id: {e}")
+
+    results = []
+    for name, password_hasher in backends:
+        result = benchmark(name, password_hasher, args.processes, args.duration)
+        results.append(result)
+        print(
+            f"{name:<50} {result['verifications_per_second_per_core']:>8.1f} verify/s/core  "
+            f"{result['verifications_per_second']:>9.1f} verify/s  "
+            f"{result['mean_latency_ms']:>7.1f} ms/verify"
+        )
+
+    if args.json:
+        with open(args.json, 'w') as file:
+            json.dump(results, file, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,197 @@
+"""
+Local stand-in for the User Service, used by the benchmarks.
+
+Usage (answers 'USER.all' on the RabbitMQ configured in the settings):
+    python -m benchmarks.stub_user_service
+"""
+import asyncio
+import datetime
+import uuid
+from typing import Any, Dict, Optional
+
+import aio_pika
+
+from src.application.services.password_hasher import BcryptPasswordHasher
+from src.core.logger import LoggerService
+from src.domain.interfaces.password_hasher_interface import IPasswordHasher
+from src.domain.schemas import RolesEnum
+from src.infrastructure.codecs import MessageCodecRegistry
+from src.infrastructure.rabbitmq_connection_manager import RabbitMQConnectionManager
+
+
+class StubUserService:
+    """
+    Local stand-in for the User Service, keeping the users in memory.
+
+    Answers the same operations as the User Service, including the batched 'getManyByEmail'
+    and 'getManyById', so the Auth Service can be run and load-tested without it.
+    handle() is independent of the broker; serve() answers the RPC calls sent to 'USER.all'.
+    """
+
+    def __init__(self, codecs: Optional[MessageCodecRegistry] = None, latency: float = 0):
+        """
+        Args:
+            codecs: Message body codecs, used by serve().
+            latency: Simulated processing time of every call in seconds.
+        """
+        self._codecs = codecs or MessageCodecRegistry()
+        self._latency = latency
+        self._users: Dict[str, dict] = {}
+        self._ids_by_email: Dict[str, str] = {}
+        self._ids_by_phone_number: Dict[str, str] = {}
+        self._channel: Optional[aio_pika.abc.AbstractRobustChannel] = None
+
+        self._operation_handlers = {
+            'getById': lambda request: self._get_one(self._users.get(str(request.get('user_id')))),
+            'getByEmail': lambda request: self._get_one(self._find(self._ids_by_email, self._email_key(request.get('user_email')))),
+            'getByPhoneNumber': lambda request: self._get_one(self._find(self._ids_by_phone_number, request.get('user_phone_number'))),
+            'getManyById': lambda request: self._get_many(self._users.get(str(user_id)) for user_id in request.get('user_ids', [])),
+            'getManyByEmail': lambda request: self._get_many(self._find(self._ids_by_email, self._email_key(email)) for email in request.get('user_emails', [])),
+            'addUser': self._add_user,
+            'updatePasswordHash': self._update_password_hash,
+        }
+
+    def seed(
+            self,
+            count: int,
+            password: str = 'password',
+            email_template: str = 'user{}@example.com',
+            password_hasher: Optional[IPasswordHasher] = None
+    ) -> None:
+        """
+        Adds `count` active users sharing the same password. The password is hashed once,
+        with bcrypt of the default cost unless another hasher is given.
+        """
+        hashed_password = (password_hasher or BcryptPasswordHasher()).hash(password)
+        for i in range(count):
+            self._add_user({
+                "email": email_template.format(i),
+                "phone_number": f"+7{i:010d}",
+                "hashed_password": hashed_password,
+                "first_name": "Stub",
+                "last_name": f"User{i}",
+                "roles": [RolesEnum.USER.value],
+            })
+
+    async def handle(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Answers a decoded User Service request.
+
+        Returns:
+            The response in the User Service format: 'status_code', 'body', 'success', 'error_message', 'error_origin'.
+        """
+        if self._latency:
+            await asyncio.sleep(self._latency)
+
+        operation_handler = self._operation_handlers.get(request.get('operation_type'))
+        if operation_handler is None:
+            return self._error(404, f"Unknown 'operation_type' received: {request.get('operation_type')}")
+
+        return operation_handler(request)
+
+    async def serve(self, connection_manager: RabbitMQConnectionManager) -> None:
+        """Answers the RPC calls sent to the 'USER.all' queue."""
+        self._channel = await connection_manager.open_channel()
+        exchange = await self._channel.declare_exchange(
+            'AUTH-SERVICE-and-USER-SERVICE-exchange.direct',
+            aio_pika.ExchangeType.DIRECT,
+            durable=True
+        )
+        queue = await self._channel.declare_queue('USER.all', durable=True)
+        await queue.bind(exchange, routing_key='USER.all')
+        await queue.consume(self._on_request, no_ack=True)
+
+    async def stop(self) -> None:
+        if self._channel and not self._channel.is_closed:
+            await self._channel.close()
+
+    async def _on_request(self, message: aio_pika.IncomingMessage) -> None:
+        codec = self._codecs.get(message.content_type)
+        response = await self.handle(codec.decode(message.body))
+        await self._channel.default_exchange.publish(
+            aio_pika.Message(
+                body=codec.encode(response),
+                content_type=codec.content_type,
+                correlation_id=message.correlation_id
+            ),
+            routing_key=message.reply_to
+        )
+
+    @staticmethod
+    def _email_key(email: Any) -> Any:
+        """Emails are matched case-insensitively, like the User Service does."""
+        return email.strip().lower() if isinstance(email, str) else email
+
+    def _find(self, index: Dict[str, str], key: Any) -> Optional[dict]:
+        user_id = index.get(key)
+        return self._users.get(user_id) if user_id else None
+
+    def _get_one(self, user: Optional[dict]) -> Dict[str, Any]:
+        if user is None:
+            return self._error(404, 'User not found.')
+
+        return self._success(200, user)
+
+    def _get_many(self, users) -> Dict[str, Any]:
+        return self._success(200, {"users": [user for user in users if user is not None]})
+
+    def _add_user(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        email, phone_number = request.get('email'), request.get('phone_number')
+        if self._email_key(email) in self._ids_by_email or phone_number in self._ids_by_phone_number:
+            return self._error(400, 'User already exists.')
+
+        now = datetime.datetime.now(datetime.UTC).isoformat()
+        user = {
+            "id": str(uuid.uuid4()),
+            "email": email,
+            "phone_number": phone_number,
+            "hashed_password": request.get('hashed_password'),
+            "first_name": request.get('first_name', ''),
+            "last_name": request.get('last_name', ''),
+            "is_active": True,
+            "roles": request.get('roles') or [RolesEnum.USER.value],
+            "created_at": now,
+            "updated_at": now,
+        }
+        self._users[user['id']] = user
+        if email:
+            self._ids_by_email[self._email_key(email)] = user['id']
+        if phone_number:
+            self._ids_by_phone_number[phone_number] = user['id']
+
+        return self._success(201, user)
+
+    def _update_password_hash(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        user = self._users.get(str(request.get('user_id')))
+        if user is None:
+            return self._error(404, 'User not found.')
+
+        user['hashed_password'] = request.get('hashed_password')
+        user['updated_at'] = datetime.datetime.now(datetime.UTC).isoformat()
+        return self._success(200, {})
+
+    @staticmethod
+    def _success(status_code: int, body: Any) -> Dict[str, Any]:
+        return {"status_code": status_code, "body": body, "success": True, "error_message": None, "error_origin": None}
+
+    @staticmethod
+    def _error(status_code: int, message: str) -> Dict[str, Any]:
+        return {"status_code": status_code, "body": {}, "success": False, "error_message": message, "error_origin": 'User Service'}
+
+
+async def main() -> None:
+    logger = LoggerService(__name__, "stub_user_service_log.log")
+    connection_manager = RabbitMQConnectionManager(logger=logger)
+    user_service = StubUserService()
+    user_service.seed(1000)
+    await user_service.serve(connection_manager)
+    logger.info("Stub User Service is answering the 'USER.all' queue.")
+    try:
+        await asyncio.Future()
+    finally:
+        await user_service.stop()
+        await connection_manager.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
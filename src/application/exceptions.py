@@ -28,3 +28,19 @@ class TokenGenerationError(AuthenticationError):
     """Raised when token generation fails."""
     def __init__(self, message: str = "Failed to generate authentication tokens."):
         super().__init__(message=message, status_code=500)
+
+class InvalidTokenError(AuthenticationError):
+    """Raised when a token is malformed, has an invalid signature, has expired or has an unexpected type."""
+    def __init__(self, message: str = "Invalid token."):
+        super().__init__(message=message, status_code=401)
+
+class TokenReuseError(InvalidTokenError):
+    """Raised when an already rotated refresh token is presented again."""
+    def __init__(self, message: str = "Refresh token reuse detected. The session has been revoked."):
+        super().__init__(message=message)
+
+class TooManyLoginAttemptsError(AuthenticationError):
+    """Raised when logins are temporarily blocked after too many failed attempts."""
+    def __init__(self, retry_after: int, message: str = "Too many failed login attempts."):
+        self.retry_after = retry_after
+        super().__init__(message=f"{message} Retry after {retry_after} seconds.", status_code=429)
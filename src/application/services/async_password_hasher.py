@@ -0,0 +1,150 @@
+import asyncio
+import multiprocessing
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Optional
+
+from src.core.config import settings
+from src.core.exceptions import AuthServiceError
+from src.core.metrics import registry
+from src.core.tracing import tracer
+from src.domain.interfaces.password_hasher_interface import IAsyncPasswordHasher, IPasswordHasher
+
+
+class AsyncPasswordHasher(IAsyncPasswordHasher):
+    """
+    Runs a blocking IPasswordHasher on a bounded pool of workers, so hashing
+    never blocks the event loop.
+
+    At most `max_workers` operations are submitted to the pool at once, the rest wait
+    on the event loop. When `max_queue_size` operations are already waiting, new ones
+    are rejected right away with a 503 instead of piling up behind the pool.
+    """
+
+    def __init__(
+            self,
+            password_hasher: IPasswordHasher,
+            executor_type: str = settings.password_hasher_executor,
+            max_workers: int = settings.password_hasher_workers,
+            max_queue_size: int = settings.password_hasher_max_queue_size
+    ):
+        """
+        Args:
+            password_hasher: Blocking hasher that does the actual work.
+            executor_type: 'process' to run on a ProcessPoolExecutor or 'thread' to run on a ThreadPoolExecutor.
+            max_workers: Number of workers in the pool.
+            max_queue_size: Number of operations allowed to wait for a free worker.
+        """
+        if executor_type not in ('process', 'thread'):
+            raise ValueError(f"Unknown password hasher executor type: {executor_type}")
+
+        self._password_hasher = password_hasher
+        self._executor_type = executor_type
+        self._max_workers = max(1, max_workers)
+        self._max_queue_size = max(0, max_queue_size)
+
+        self._executor: Optional[Executor] = None
+        self._workers: Optional[asyncio.Semaphore] = None
+        self._pending: int = 0
+
+        self.wait_duration = registry.histogram(
+            'auth_password_hasher_wait_seconds',
+            'Time the hashing operations wait for a free worker, by operation.',
+            ('operation',)
+        )
+        self.duration = registry.histogram(
+            'auth_password_hasher_duration_seconds',
+            'Time the hashing operations take on a worker, by operation.',
+            ('operation',)
+        )
+
+    @property
+    def pending(self) -> int:
+        """Number of operations running or waiting for a free worker."""
+        return self._pending
+
+    def _create_executor(self) -> Executor:
+        if self._executor_type == 'process':
+            # 'spawn' does not copy the event loop and its threads into the workers
+            return ProcessPoolExecutor(
+                max_workers=self._max_workers,
+                mp_context=multiprocessing.get_context('spawn')
+            )
+
+        return ThreadPoolExecutor(
+            max_workers=self._max_workers,
+            thread_name_prefix='password-hasher'
+        )
+
+    async def start(self) -> None:
+        if self._executor is not None:
+            return
+
+        self._executor = self._create_executor()
+        self._workers = asyncio.Semaphore(self._max_workers)
+
+    async def shutdown(self) -> None:
+        executor, self._executor = self._executor, None
+        if executor is not None:
+            await asyncio.to_thread(executor.shutdown, wait=True, cancel_futures=True)
+
+    async def verify(self, plain_password: str, password_hash: str) -> bool:
+        return await self._run('verify', self._password_hasher.verify, plain_password, password_hash)
+
+    async def hash(self, password: str) -> str:
+        return await self._run('hash', self._password_hasher.hash, password)
+
+    def needs_rehash(self, password_hash: str) -> bool:
+        return self._password_hasher.needs_rehash(password_hash)
+
+    async def _run(self, operation: str, func: Callable[..., Any], *args: Any) -> Any:
+        """
+        Runs the function on the pool, applying the queue depth limit.
+        The wait for a free worker and the run on the worker are timed separately,
+        and the whole operation is recorded as a span of the current trace.
+
+        Raises:
+            AuthServiceError: When the hasher is not running or is overloaded (503).
+        """
+        if self._executor is None:
+            raise AuthServiceError(
+                status_code=503,
+                detail="Password hasher is not running."
+            )
+
+        if self._pending >= self._max_workers + self._max_queue_size:
+            raise AuthServiceError(
+                status_code=503,
+                detail="Password hashing capacity exceeded. Try again later."
+            )
+
+        self._pending += 1
+        executor = self._executor
+        started_at = time.perf_counter()
+        try:
+            with tracer.start_span(f'password_hasher.{operation}') as span:
+                async with self._workers:
+                    acquired_at = time.perf_counter()
+                    self.wait_duration.labels(operation).observe(acquired_at - started_at)
+                    span.set_attribute('wait_ms', round((acquired_at - started_at) * 1000, 3))
+                    executor = self._executor
+                    if executor is None:
+                        raise AuthServiceError(
+                            status_code=503,
+                            detail="Password hasher is not running."
+                        )
+                    result = await asyncio.get_running_loop().run_in_executor(executor, func, *args)
+                    self.duration.labels(operation).observe(time.perf_counter() - acquired_at)
+                    return result
+        except BrokenProcessPool:
+            # A worker died (e.g. killed by the OOM killer). Replace the pool once for the next calls.
+            if self._executor is executor:
+                self._executor = self._create_executor()
+                executor.shutdown(wait=False)
+            raise AuthServiceError(
+                status_code=503,
+                detail="Password hasher worker crashed. Try again later."
+            )
+        finally:
+            self._pending -= 1
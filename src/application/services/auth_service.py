@@ -1,10 +1,14 @@
 from src.domain.interfaces.auth_service_interface import IAuthService
+from src.domain.interfaces.password_hasher_interface import IAsyncPasswordHasher
 
 
 class AuthService(IAuthService):
     """Service for authentication (hashed_password verification)."""
-    def __init__(self, password_hasher):
+    def __init__(self, password_hasher: IAsyncPasswordHasher):
         self._password_hasher = password_hasher
 
-    def verify_password(self, plain_password: str, password_hash: str) -> bool:
-        return self._password_hasher.verify(plain_password, password_hash)
+    async def verify_password(self, plain_password: str, password_hash: str) -> bool:
+        return await self._password_hasher.verify(plain_password, password_hash)
+
+    def needs_password_rehash(self, password_hash: str) -> bool:
+        return self._password_hasher.needs_rehash(password_hash)
@@ -1,37 +1,136 @@
+import binascii
+import json
+import time
 import uuid
-from datetime import datetime, timedelta, timezone
-
-import jwt
+from typing import Iterable, Optional
 
+from src.application.exceptions import InvalidTokenError
+from src.application.services.jwt_signing_keys import JWTSigningKey, b64url_encode, b64url_decode, \
+    load_signing_key, load_verification_key
 from src.core.config import settings
+from src.core.metrics import registry, FAST_LATENCY_BUCKETS
+from src.core.tracing import tracer
 from src.domain.interfaces.jwt_service_interface import IJWTService
 from src.domain.schemas import RolesEnum
 
 
 class JWTService(IJWTService):
-    def __init__(self):
-        self.private_key = settings.jwt_private_secret_key
-        self.algorithm = settings.jwt_algorithm
+    """
+    Issues signed JWTs.
+
+    The signing key is loaded and the JWS header is serialized once, at construction.
+    With an asymmetric algorithm (RS256, EdDSA) the public keys are published as a JWKS
+    document, so other services verify tokens locally with cached keys.
+    """
+    def __init__(
+            self,
+            signing_key: Optional[JWTSigningKey] = None,
+            previous_keys: Optional[Iterable[JWTSigningKey]] = None
+    ):
+        """
+        Args:
+            signing_key: Key used to sign new tokens. Loaded from the settings by default.
+            previous_keys: Verification-only keys of the previous rotations, still published in the JWKS.
+        """
+        if signing_key is None:
+            signing_key = load_signing_key(settings.jwt_algorithm, settings.jwt_private_secret_key)
+        if previous_keys is None:
+            previous_keys = [
+                load_verification_key(settings.jwt_algorithm, public_key_pem)
+                for public_key_pem in settings.jwt_previous_public_keys_list
+            ]
+
+        self._signing_key = signing_key
+        self.algorithm = signing_key.algorithm
+        self._verification_keys = {key.kid: key for key in (signing_key, *previous_keys)}
+
+        header = {'alg': signing_key.algorithm, 'typ': 'JWT', 'kid': signing_key.kid}
+        self._encoded_header = b64url_encode(json.dumps(header, separators=(',', ':')).encode())
+        self._jwks = {
+            'keys': [jwk for jwk in (key.public_jwk() for key in self._verification_keys.values()) if jwk]
+        }
+
+        self.duration = registry.histogram(
+            'auth_jwt_duration_seconds',
+            'Time spent signing and verifying tokens, by operation and token type.',
+            ('operation', 'token_type'),
+            buckets=FAST_LATENCY_BUCKETS
+        )
+
+    def _encode(self, payload: dict) -> str:
+        started_at = time.perf_counter()
+        with tracer.start_span('jwt.sign', token_type=payload['token_type'], algorithm=self.algorithm):
+            signing_input = self._encoded_header + b'.' + b64url_encode(json.dumps(payload, separators=(',', ':')).encode())
+            token = (signing_input + b'.' + b64url_encode(self._signing_key.sign(signing_input))).decode('ascii')
+        self.duration.labels('sign', payload['token_type']).observe(time.perf_counter() - started_at)
+        return token
 
     def generate_access_token(self, user_id: uuid, roles: list[RolesEnum],
                                     expire_time_in_minutes: int = settings.access_token_expire_time) -> str:
+        issued_at = int(time.time())
         payload = {
             'sub': str(user_id),
             'roles': [role for role in roles],
             'token_type': 'access',
-            'exp': datetime.now(timezone.utc) + timedelta(minutes=expire_time_in_minutes),
-            'iat': datetime.now(timezone.utc)
+            'jti': uuid.uuid4().hex,
+            'exp': issued_at + expire_time_in_minutes * 60,
+            'iat': issued_at
         }
 
-        return jwt.encode(payload, self.private_key, algorithm=self.algorithm)
+        return self._encode(payload)
 
-    def generate_refresh_token(self, user_id: uuid, roles: list[RolesEnum], expire_time_in_days: int = settings.refresh_token_expire_time) -> str:
+    def generate_refresh_token(self, user_id: uuid, roles: list[RolesEnum], expire_time_in_days: int = settings.refresh_token_expire_time,
+                               jti: Optional[str] = None, family_id: Optional[str] = None) -> str:
+        issued_at = int(time.time())
+        jti = jti or uuid.uuid4().hex
         payload = {
             'sub': str(user_id),
             'roles': [role for role in roles],
             'token_type': 'refresh',
-            'exp': datetime.now(timezone.utc) + timedelta(days=expire_time_in_days),
-            'iat': datetime.now(timezone.utc)
+            'jti': jti,
+            'fid': family_id or jti,
+            'exp': issued_at + expire_time_in_days * 86400,
+            'iat': issued_at
         }
 
-        return jwt.encode(payload, self.private_key, algorithm=settings.jwt_algorithm)
+        return self._encode(payload)
+
+    def verify(self, token: str, token_type: str) -> dict:
+        started_at = time.perf_counter()
+        try:
+            return self._verify(token, token_type)
+        finally:
+            # The token type comes from the request, keep the label values bounded
+            label = token_type if token_type in ('access', 'refresh') else 'other'
+            self.duration.labels('verify', label).observe(time.perf_counter() - started_at)
+
+    def _verify(self, token: str, token_type: str) -> dict:
+        try:
+            encoded_header, encoded_payload, encoded_signature = token.encode('ascii').split(b'.')
+            header = json.loads(b64url_decode(encoded_header))
+
+            # Tokens issued before key ids were introduced carry no 'kid'
+            key = self._verification_keys.get(header['kid']) if 'kid' in header else self._signing_key
+            if key is None or header.get('alg') != key.algorithm:
+                raise InvalidTokenError("Token is signed with an unknown key.")
+
+            if not key.verify(encoded_header + b'.' + encoded_payload, b64url_decode(encoded_signature)):
+                raise InvalidTokenError("Invalid token signature.")
+
+            claims = json.loads(b64url_decode(encoded_payload))
+        except InvalidTokenError:
+            raise
+        except (AttributeError, TypeError, ValueError, KeyError, binascii.Error):
+            raise InvalidTokenError("Malformed token.")
+
+        if not isinstance(claims, dict) or claims.get('token_type') != token_type:
+            raise InvalidTokenError(f"Invalid token type, '{token_type}' token expected.")
+
+        expires_at = claims.get('exp')
+        if not isinstance(expires_at, (int, float)) or expires_at <= time.time():
+            raise InvalidTokenError("Token has expired.")
+
+        return claims
+
+    def get_jwks(self) -> dict:
+        return self._jwks
@@ -0,0 +1,184 @@
+import base64
+import hashlib
+import hmac
+import json
+from abc import ABC, abstractmethod
+from typing import Optional
+
+from cryptography.exceptions import InvalidSignature
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import padding, rsa, ed25519
+
+
+def b64url_encode(data: bytes) -> bytes:
+    """Base64url encoding without padding, as used by JWS."""
+    return base64.urlsafe_b64encode(data).rstrip(b'=')
+
+
+def b64url_decode(data: bytes | str) -> bytes:
+    """Decodes base64url data with or without padding."""
+    if isinstance(data, str):
+        data = data.encode('ascii')
+    return base64.urlsafe_b64decode(data + b'=' * (-len(data) % 4))
+
+
+def _int_to_b64url(value: int) -> str:
+    return b64url_encode(value.to_bytes((value.bit_length() + 7) // 8, 'big')).decode('ascii')
+
+
+def _jwk_thumbprint(required_members: dict) -> str:
+    """RFC 7638 JWK thumbprint, used as the key id."""
+    canonical = json.dumps(required_members, sort_keys=True, separators=(',', ':')).encode()
+    return b64url_encode(hashlib.sha256(canonical).digest()).decode('ascii')
+
+
+class JWTSigningKey(ABC):
+    """
+    Key material for one JWS algorithm, loaded once and reused for every token.
+    Keys without a private part can only verify (e.g. previous keys kept for rotation).
+    """
+    algorithm: str
+    kid: str
+
+    @abstractmethod
+    def sign(self, signing_input: bytes) -> bytes:
+        """Signs the JWS signing input ('<header>.<payload>')."""
+        pass
+
+    @abstractmethod
+    def verify(self, signing_input: bytes, signature: bytes) -> bool:
+        """Checks the signature of the JWS signing input."""
+        pass
+
+    def public_jwk(self) -> Optional[dict]:
+        """Returns the public key as a JWK, or None for symmetric keys that must never be published."""
+        return None
+
+
+class HMACSigningKey(JWTSigningKey):
+    """HS256/HS384/HS512 shared secret."""
+    _digests = {'HS256': hashlib.sha256, 'HS384': hashlib.sha384, 'HS512': hashlib.sha512}
+
+    def __init__(self, algorithm: str, secret: str):
+        self.algorithm = algorithm
+        self._digest = self._digests[algorithm]
+        self._secret = secret.encode('utf-8')
+        # Not a thumbprint: the secret must not be derivable from a published value
+        self.kid = hmac.new(self._secret, b'kid', hashlib.sha256).hexdigest()[:16]
+
+    def sign(self, signing_input: bytes) -> bytes:
+        return hmac.new(self._secret, signing_input, self._digest).digest()
+
+    def verify(self, signing_input: bytes, signature: bytes) -> bool:
+        return hmac.compare_digest(self.sign(signing_input), signature)
+
+
+class RSASigningKey(JWTSigningKey):
+    """RS256/RS384/RS512 key pair, or a public key only."""
+    _hashes = {'RS256': hashes.SHA256, 'RS384': hashes.SHA384, 'RS512': hashes.SHA512}
+
+    def __init__(
+            self,
+            algorithm: str,
+            private_key: Optional[rsa.RSAPrivateKey] = None,
+            public_key: Optional[rsa.RSAPublicKey] = None
+    ):
+        self.algorithm = algorithm
+        self._hash = self._hashes[algorithm]()
+        self._private_key = private_key
+        self._public_key = public_key or private_key.public_key()
+
+        numbers = self._public_key.public_numbers()
+        self._jwk = {'kty': 'RSA', 'n': _int_to_b64url(numbers.n), 'e': _int_to_b64url(numbers.e)}
+        self.kid = _jwk_thumbprint(self._jwk)
+
+    def sign(self, signing_input: bytes) -> bytes:
+        if self._private_key is None:
+            raise ValueError(f"Key '{self.kid}' is a verification-only key.")
+        return self._private_key.sign(signing_input, padding.PKCS1v15(), self._hash)
+
+    def verify(self, signing_input: bytes, signature: bytes) -> bool:
+        try:
+            self._public_key.verify(signature, signing_input, padding.PKCS1v15(), self._hash)
+            return True
+        except InvalidSignature:
+            return False
+
+    def public_jwk(self) -> Optional[dict]:
+        return {**self._jwk, 'kid': self.kid, 'alg': self.algorithm, 'use': 'sig'}
+
+
+class EdDSASigningKey(JWTSigningKey):
+    """EdDSA (Ed25519) key pair, or a public key only."""
+
+    def __init__(
+            self,
+            private_key: Optional[ed25519.Ed25519PrivateKey] = None,
+            public_key: Optional[ed25519.Ed25519PublicKey] = None
+    ):
+        self.algorithm = 'EdDSA'
+        self._private_key = private_key
+        self._public_key = public_key or private_key.public_key()
+
+        raw_public_key = self._public_key.public_bytes(serialization.Encoding.Raw, serialization.PublicFormat.Raw)
+        self._jwk = {'kty': 'OKP', 'crv': 'Ed25519', 'x': b64url_encode(raw_public_key).decode('ascii')}
+        self.kid = _jwk_thumbprint(self._jwk)
+
+    def sign(self, signing_input: bytes) -> bytes:
+        if self._private_key is None:
+            raise ValueError(f"Key '{self.kid}' is a verification-only key.")
+        return self._private_key.sign(signing_input)
+
+    def verify(self, signing_input: bytes, signature: bytes) -> bool:
+        try:
+            self._public_key.verify(signature, signing_input)
+            return True
+        except InvalidSignature:
+            return False
+
+    def public_jwk(self) -> Optional[dict]:
+        return {**self._jwk, 'kid': self.kid, 'alg': self.algorithm, 'use': 'sig'}
+
+
+def _pem(key_material: str) -> bytes:
+    # PEM keys in .env files usually have their line breaks escaped
+    return key_material.replace('\\n', '\n').strip().encode('utf-8')
+
+
+def load_signing_key(algorithm: str, key_material: str) -> JWTSigningKey:
+    """
+    Loads the signing key for the algorithm.
+
+    Args:
+        algorithm: JWS algorithm (HS256/384/512, RS256/384/512 or EdDSA).
+        key_material: Shared secret for HS*, PEM private key for RS* and EdDSA.
+
+    Raises:
+        ValueError: When the algorithm is not supported or the key does not match it.
+    """
+    if algorithm in HMACSigningKey._digests:
+        return HMACSigningKey(algorithm, key_material)
+
+    private_key = serialization.load_pem_private_key(_pem(key_material), password=None)
+    if algorithm in RSASigningKey._hashes and isinstance(private_key, rsa.RSAPrivateKey):
+        return RSASigningKey(algorithm, private_key=private_key)
+    if algorithm == 'EdDSA' and isinstance(private_key, ed25519.Ed25519PrivateKey):
+        return EdDSASigningKey(private_key=private_key)
+
+    raise ValueError(f"Unsupported JWT algorithm '{algorithm}' or key type {type(private_key).__name__}.")
+
+
+def load_verification_key(algorithm: str, public_key_pem: str) -> JWTSigningKey:
+    """
+    Loads a verification-only public key, e.g. a previous key kept during rotation.
+
+    Raises:
+        ValueError: When the algorithm is not asymmetric or the key does not match it.
+    """
+    public_key = serialization.load_pem_public_key(_pem(public_key_pem))
+    if algorithm in RSASigningKey._hashes and isinstance(public_key, rsa.RSAPublicKey):
+        return RSASigningKey(algorithm, public_key=public_key)
+    if algorithm == 'EdDSA' and isinstance(public_key, ed25519.Ed25519PublicKey):
+        return EdDSASigningKey(public_key=public_key)
+
+    raise ValueError(f"Unsupported JWT algorithm '{algorithm}' or key type {type(public_key).__name__}.")
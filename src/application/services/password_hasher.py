@@ -1,19 +1,159 @@
+import time
+from typing import Optional, Sequence
+
 import bcrypt
 
 from src.domain.interfaces.password_hasher_interface import IPasswordHasher
 
+try:
+    import argon2
+except ImportError:  # Optional dependency
+    argon2 = None
+
 
 class BcryptPasswordHasher(IPasswordHasher):
     """Implementation of hashed_password hasher using bcrypt algorithm."""
+    hash_prefixes = ('$2b$', '$2a$', '$2y$')
+
+    def __init__(self, rounds: Optional[int] = None):
+        """
+        Args:
+            rounds: bcrypt cost (log2 of the number of rounds) of the new hashes. The bcrypt default if not given.
+        """
+        self.rounds = rounds or 12
+
+    @classmethod
+    def calibrated(cls, target_seconds: float, min_rounds: int = 10, max_rounds: int = 16) -> "BcryptPasswordHasher":
+        """
+        Creates a hasher with the highest cost whose verification takes at most `target_seconds` on this host.
+
+        Every extra round doubles the work, so the time of one hash at `min_rounds` is enough
+        to estimate the time at higher costs.
+        """
+        started_at = time.perf_counter()
+        bcrypt.hashpw(b'calibration', bcrypt.gensalt(rounds=min_rounds))
+        elapsed = time.perf_counter() - started_at
+
+        rounds = min_rounds
+        while rounds < max_rounds and elapsed * 2 <= target_seconds:
+            elapsed *= 2
+            rounds += 1
+
+        return cls(rounds=rounds)
+
     def verify(self, plain_password: str, password_hash: str) -> bool:
         # bcrypt expects bytes, so we encode our strings
-        return bcrypt.checkpw(
-            plain_password.encode('utf-8'),
-            password_hash.encode('utf-8')
-        )
+        try:
+            return bcrypt.checkpw(
+                plain_password.encode('utf-8'),
+                password_hash.encode('utf-8')
+            )
+        except ValueError:
+            # Corrupt or truncated hash ('Invalid salt')
+            return False
 
     def hash(self, password: str) -> str:
         # Generate a salt and hash the hashed_password
-        salt = bcrypt.gensalt()
+        salt = bcrypt.gensalt(rounds=self.rounds)
         hashed = bcrypt.hashpw(password.encode('utf-8'), salt)
-        return hashed.decode('utf-8')
\ No newline at end of file
+        return hashed.decode('utf-8')
+
+    def needs_rehash(self, password_hash: str) -> bool:
+        """
+        Only hashes of a lower cost are rehashed: hosts or restarts calibrated to different costs
+        would otherwise rehash the same password back and forth on every login.
+        """
+        # '$2b$12$<salt and hash>', the cost is the second field
+        try:
+            return int(password_hash.split('$')[2]) < self.rounds
+        except (IndexError, ValueError):
+            return False
+
+
+class Argon2PasswordHasher(IPasswordHasher):
+    """
+    Implementation of hashed_password hasher using Argon2id algorithm.
+
+    Unlike bcrypt, the memory cost is tunable too, which makes GPU cracking expensive
+    without spending more CPU per login. Requires the 'argon2-cffi' package.
+    """
+    hash_prefixes = ('$argon2id$',)
+
+    def __init__(self, time_cost: int = 3, memory_cost: int = 65536, parallelism: int = 1):
+        """
+        Args:
+            time_cost: Number of passes over the memory.
+            memory_cost: Memory used by one hash in KiB.
+            parallelism: Number of lanes (threads) used by one hash. Keep it at 1 when every
+                core already runs its own hashing worker.
+        """
+        if argon2 is None:
+            raise ImportError("The 'argon2-cffi' package is required for Argon2id password hashing.")
+
+        self.time_cost = time_cost
+        self.memory_cost = memory_cost
+        self.parallelism = parallelism
+        self._password_hasher = argon2.PasswordHasher(
+            time_cost=time_cost,
+            memory_cost=memory_cost,
+            parallelism=parallelism,
+            type=argon2.Type.ID
+        )
+
+    def verify(self, plain_password: str, password_hash: str) -> bool:
+        try:
+            return self._password_hasher.verify(password_hash, plain_password)
+        except (argon2.exceptions.VerificationError, argon2.exceptions.InvalidHashError):
+            # A wrong password, or a corrupt or truncated hash that no password can match
+            return False
+
+    def hash(self, password: str) -> str:
+        return self._password_hasher.hash(password)
+
+    def needs_rehash(self, password_hash: str) -> bool:
+        return self._password_hasher.check_needs_rehash(password_hash)
+
+
+class MultiAlgorithmPasswordHasher(IPasswordHasher):
+    """
+    Hashes with the primary hasher and verifies with the hasher matching the hash prefix,
+    so the hashes of every supported algorithm keep working after switching algorithms.
+
+    Hashes of another algorithm than the primary one need a rehash, so the users are
+    moved to the primary algorithm on their next login.
+    """
+
+    def __init__(self, primary: IPasswordHasher, others: Sequence[IPasswordHasher] = ()):
+        """
+        Args:
+            primary: Hasher of the new hashes.
+            others: Hashers of the hashes created with other algorithms.
+        """
+        self._primary = primary
+        self._hashers_by_prefix = {
+            prefix: password_hasher
+            for password_hasher in (*others, primary)
+            for prefix in password_hasher.hash_prefixes
+        }
+
+    def verify(self, plain_password: str, password_hash: str) -> bool:
+        password_hasher = self._hasher_of(password_hash)
+        if password_hasher is None:
+            return False
+
+        return password_hasher.verify(plain_password, password_hash)
+
+    def hash(self, password: str) -> str:
+        return self._primary.hash(password)
+
+    def needs_rehash(self, password_hash: str) -> bool:
+        password_hasher = self._hasher_of(password_hash)
+        if password_hasher is not self._primary:
+            return password_hasher is not None
+
+        return self._primary.needs_rehash(password_hash)
+
+    def _hasher_of(self, password_hash: str) -> Optional[IPasswordHasher]:
+        # Prefixes look like '$2b$' or '$argon2id$'
+        prefix = password_hash[:password_hash.find('$', 1) + 1]
+        return self._hashers_by_prefix.get(prefix)
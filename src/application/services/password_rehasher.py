@@ -0,0 +1,71 @@
+import asyncio
+import uuid
+from typing import Dict
+
+from src.core.config import settings
+from src.core.logger import LoggerService
+from src.domain.interfaces.password_hasher_interface import IAsyncPasswordHasher
+from src.domain.interfaces.user_adapter_interface import IUserAdapter
+
+
+class PasswordRehasher:
+    """
+    Rehashes passwords in the background after a successful login, when the hasher reports that
+    the stored hash needs it (e.g. a lower bcrypt cost than the new hashes, or another algorithm).
+    The new hash is saved through the User Service, so the cost changes without a migration.
+
+    Rehashes are best effort: when too many are pending, new ones are skipped and
+    happen on a later login of the user.
+    """
+
+    def __init__(
+            self,
+            password_hasher: IAsyncPasswordHasher,
+            user_adapter: IUserAdapter,
+            logger: LoggerService,
+            max_pending: int = settings.password_rehash_max_pending
+    ):
+        """
+        Args:
+            password_hasher: Hasher creating the new hashes.
+            user_adapter: Adapter saving the new hashes.
+            logger: Logger service.
+            max_pending: Max number of rehashes running at once.
+        """
+        self._password_hasher = password_hasher
+        self._user_adapter = user_adapter
+        self._logger = logger
+        self._max_pending = max_pending
+        self._pending: Dict[str, asyncio.Task] = {}
+
+    def schedule(self, user_id: uuid.UUID | str, plain_password: str) -> bool:
+        """
+        Queues the rehash of the user's password.
+
+        Returns:
+            False if it was skipped, because a rehash of the user is already pending or too many are.
+        """
+        user_id = str(user_id)
+        if user_id in self._pending or len(self._pending) >= self._max_pending:
+            return False
+
+        task = self._pending[user_id] = asyncio.create_task(self._rehash(user_id, plain_password))
+        task.add_done_callback(lambda _: self._pending.pop(user_id, None))
+        return True
+
+    async def shutdown(self) -> None:
+        """Cancels the pending rehashes, they happen again on the next login."""
+        pending, self._pending = list(self._pending.values()), {}
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+
+    async def _rehash(self, user_id: str, plain_password: str) -> None:
+        try:
+            hashed_password = await self._password_hasher.hash(plain_password)
+            await self._user_adapter.update_password_hash(user_id, hashed_password)
+            self._logger.info("Rehashed the password of user: %s", user_id)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            self._logger.warning("Failed to rehash the password of user: %s. From: PasswordRehasher, _rehash(): %s", user_id, e)
@@ -0,0 +1,123 @@
+import time
+import uuid
+
+from src.application.exceptions import InvalidTokenError, TokenReuseError
+from src.core.config import settings
+from src.core.logger import LoggerService
+from src.domain.interfaces.jwt_service_interface import IJWTService
+from src.domain.interfaces.token_store_interface import ITokenStore
+from src.domain.models.refresh_tokens import RefreshTokenRecord
+from src.domain.schemas import AuthTokens, RolesEnum
+
+
+class SessionTokenService:
+    """
+    Service for the token pairs of user sessions: issues, rotates and revokes refresh tokens,
+    recording every issued refresh token in the token store.
+    """
+    def __init__(
+            self,
+            jwt_service: IJWTService,
+            token_store: ITokenStore,
+            logger: LoggerService,
+            refresh_token_expire_time_in_days: int = settings.refresh_token_expire_time
+    ):
+        self._jwt_service = jwt_service
+        self._token_store = token_store
+        self._logger = logger
+        self._refresh_token_expire_time_in_days = refresh_token_expire_time_in_days
+
+    async def issue_tokens(self, user_id: uuid.UUID | str, roles: list[RolesEnum], family_id: str | None = None) -> AuthTokens:
+        """
+        Issues an access and refresh token pair and records the refresh token.
+
+        Args:
+            user_id: User ID.
+            roles: User roles.
+            family_id: Token family of the session. A new session (family) is started if not given.
+
+        Returns:
+            AuthTokens containing access and refresh tokens.
+        """
+        record = self._new_record(user_id, family_id)
+        tokens = self._generate_tokens(user_id, roles, record)
+        await self._token_store.add(record)
+
+        return tokens
+
+    async def rotate(self, refresh_token_claims: dict) -> AuthTokens:
+        """
+        Exchanges a verified refresh token for a new token pair of the same session.
+        The presented refresh token can't be used again.
+
+        Args:
+            refresh_token_claims: Claims of the verified refresh token.
+
+        Returns:
+            AuthTokens containing the new access and refresh tokens.
+
+        Raises:
+            InvalidTokenError: When the refresh token is unknown or revoked.
+            TokenReuseError: When the refresh token was already exchanged. The whole session is revoked.
+        """
+        jti = refresh_token_claims.get('jti')
+        if not jti:
+            raise InvalidTokenError("Refresh token has no token id.")
+
+        record = await self._token_store.get(jti)
+        if record is None:
+            raise InvalidTokenError("Refresh token is unknown or has expired.")
+        if record.revoked:
+            raise InvalidTokenError("Refresh token has been revoked.")
+
+        new_record = self._new_record(record.user_id, record.family_id)
+        tokens = self._generate_tokens(record.user_id, refresh_token_claims.get('roles', []), new_record)
+
+        if not await self._token_store.rotate(jti, new_record):
+            revoked = await self._token_store.revoke_family(record.family_id)
+            self._logger.warning(
+                "Refresh token reuse detected for user: %s. Revoked %d token(s) of session %s.",
+                record.user_id, revoked, record.family_id
+            )
+            raise TokenReuseError()
+
+        return tokens
+
+    async def revoke(self, refresh_token_claims: dict, all_sessions: bool = False) -> int:
+        """
+        Revokes the session of a verified refresh token, or all the sessions of its user.
+
+        Returns:
+            Number of revoked refresh tokens.
+        """
+        if all_sessions:
+            return await self._token_store.revoke_all_for_user(refresh_token_claims['sub'])
+
+        return await self._token_store.revoke_family(refresh_token_claims.get('fid') or refresh_token_claims.get('jti'))
+
+    def _new_record(self, user_id: uuid.UUID | str, family_id: str | None) -> RefreshTokenRecord:
+        jti = uuid.uuid4().hex
+        return RefreshTokenRecord(
+            jti=jti,
+            user_id=str(user_id),
+            family_id=family_id or jti,
+            expires_at=time.time() + self._refresh_token_expire_time_in_days * 86400
+        )
+
+    def _generate_tokens(self, user_id: uuid.UUID | str, roles: list[RolesEnum], record: RefreshTokenRecord) -> AuthTokens:
+        access_token = self._jwt_service.generate_access_token(
+            user_id=user_id,
+            roles=roles
+        )
+        refresh_token = self._jwt_service.generate_refresh_token(
+            user_id=user_id,
+            roles=roles,
+            expire_time_in_days=self._refresh_token_expire_time_in_days,
+            jti=record.jti,
+            family_id=record.family_id
+        )
+
+        return AuthTokens(
+            access_token=str(access_token),
+            refresh_token=str(refresh_token)
+        )
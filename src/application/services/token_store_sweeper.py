@@ -0,0 +1,51 @@
+import asyncio
+import time
+from typing import Optional
+
+from src.core.config import settings
+from src.core.logger import LoggerService
+from src.domain.interfaces.token_store_interface import ITokenStore
+
+
+class TokenStoreSweeper:
+    """Background task that periodically prunes the expired refresh tokens from the token store."""
+
+    def __init__(
+            self,
+            token_store: ITokenStore,
+            logger: LoggerService,
+            interval: float = settings.token_store_sweep_interval
+    ):
+        """
+        Args:
+            token_store: Token store to prune.
+            logger: Logger service.
+            interval: Time between two sweeps in seconds.
+        """
+        self._token_store = token_store
+        self._logger = logger
+        self._interval = interval
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._sweep_periodically())
+
+    async def shutdown(self) -> None:
+        task, self._task = self._task, None
+        if task is not None:
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+
+    async def _sweep_periodically(self) -> None:
+        while True:
+            await asyncio.sleep(self._interval)
+            try:
+                pruned = await self._token_store.prune_expired(time.time())
+                if pruned:
+                    self._logger.debug("Pruned %d expired refresh token(s).", pruned)
+            except Exception as e:
+                self._logger.error("Failed to prune expired refresh tokens. From: TokenStoreSweeper, _sweep_periodically(): %s", e)
@@ -1,16 +1,19 @@
-import datetime
-import uuid
-from typing import Optional
+import dataclasses
+import hashlib
+from typing import Hashable, Optional
 
 from src.application.exceptions import InvalidCredentialsError, UserNotFoundError, InactiveUserError, \
-    TokenGenerationError, InvalidPasswordError
+    TokenGenerationError, InvalidPasswordError, TooManyLoginAttemptsError
+from src.application.services.login_throttler import LoginThrottler
+from src.application.services.password_rehasher import PasswordRehasher
+from src.application.services.session_token_service import SessionTokenService
 from src.core.logger import LoggerService
+from src.core.single_flight import SingleFlight
 from src.domain.interfaces.auth_service_interface import IAuthService
-from src.domain.interfaces.jwt_service_interface import IJWTService
 from src.domain.interfaces.user_adapter_interface import IUserAdapter
 from src.domain.models.auth_requests import LoginRequestDTO
 from src.domain.models.user_responses import UserAuthResponseDTO
-from src.domain.schemas import AuthTokens, RolesEnum
+from src.domain.schemas import AuthTokens
 from src.infrastructure.exceptions import UserServiceError, RabbitMQError
 from src.core.exceptions import AuthServiceError
 
@@ -21,26 +24,37 @@ class LoginUseCase:
 
     This use case handles the authentication flow:
     1. Validates user credentials
-    2. Retrieves user data
-    3. Verifies user status and hashed_password
-    4. Generates access and refresh tokens
+    2. Rejects the login if the identifier or the client IP is locked out after failed attempts
+    3. Retrieves user data
+    4. Verifies user status and hashed_password
+    5. Generates access and refresh tokens, starting a new session
+    6. Queues a background rehash of the password if its hash has an outdated cost
+
+    Identical logins that are processed at the same time (client retries) share the user
+    fetch and the password verification. Every caller still gets its own tokens, so two
+    clients logging in at the same time don't end up in the same session.
     """
 
     def __init__(
             self,
             user_adapter: IUserAdapter,
-            jwt_service: IJWTService,
+            session_token_service: SessionTokenService,
             auth_service: IAuthService,
-            logger: LoggerService
+            logger: LoggerService,
+            password_rehasher: Optional[PasswordRehasher] = None,
+            login_throttler: Optional[LoginThrottler] = None
     ):
         self._user_adapter = user_adapter
-        self._jwt_service = jwt_service
+        self._session_token_service = session_token_service
         self._auth_service = auth_service
         self._logger = logger
+        self._password_rehasher = password_rehasher
+        self._login_throttler = login_throttler
+        self._authentications_in_flight: SingleFlight[UserAuthResponseDTO] = SingleFlight()
 
     async def execute(self, credentials: dict) -> AuthTokens:
         """
-        Executes the login flow.
+        Executes the login flow, sharing the authentication with an identical login already in progress.
 
         Args:
             credentials: User credentials containing email/phone and hashed_password
@@ -53,48 +67,37 @@ class LoginUseCase:
             UserNotFoundError: When user is not found
             InactiveUserError: When user account is inactive
             InvalidPasswordError: When hashed_password verification fails
+            TooManyLoginAttemptsError: When the identifier or the client IP is locked out
+            AuthServiceError: When the credentials have unknown fields (400)
             TokenGenerationError: When token generation fails
         """
         try:
-            domain_schema_data = LoginRequestDTO(**credentials)
+            try:
+                domain_schema_data = LoginRequestDTO(**credentials)
+            except TypeError:
+                unknown = credentials.keys() - {field.name for field in dataclasses.fields(LoginRequestDTO)}
+                raise AuthServiceError(status_code=400, detail=f"Unknown fields: {', '.join(sorted(unknown))}.")
             # Validate credentials format
             if not domain_schema_data.is_valid():
                 raise InvalidCredentialsError("Invalid credentials format.")
 
-            # Get user
-            user = await self._get_user(domain_schema_data)
-            if not user:
-                raise UserNotFoundError()
+            # Reject locked out identifiers and sources before any User Service call or hashing
+            if self._login_throttler is not None:
+                await self._login_throttler.check(domain_schema_data.identifier, domain_schema_data.client_ip)
 
-            # Validate user status
-            if not user.is_user_active():
-                raise InactiveUserError()
+            user = await self._authenticate_once(domain_schema_data)
 
-            # Verify hashed_password
-            if not self._auth_service.verify_password(
-                    domain_schema_data.password,
-                    user.hashed_password
-            ):
-                self._logger.warning(f"Invalid hashed_password attempt for user: {user.id}")
-                raise InvalidPasswordError()
+            if self._login_throttler is not None:
+                await self._login_throttler.record_success(domain_schema_data.identifier)
 
-            # Generate tokens
+            # Generate tokens, a new session for every caller
             try:
-                access_token = self._jwt_service.generate_access_token(
-                    user_id=user.id,
-                    roles=user.roles
-                )
-                refresh_token = self._jwt_service.generate_refresh_token(
+                return await self._session_token_service.issue_tokens(
                     user_id=user.id,
                     roles=user.roles
                 )
-
-                return AuthTokens(
-                    access_token=str(access_token),
-                    refresh_token=str(refresh_token)
-                )
             except Exception as e:
-                self._logger.critical(f"Token generation failed. From LoginUseCase, execute(): {str(e)}")
+                self._logger.critical("Token generation failed. From LoginUseCase, execute(): %s", e)
                 raise TokenGenerationError()
 
         except (
@@ -102,20 +105,100 @@ class LoginUseCase:
                 UserNotFoundError,
                 InactiveUserError,
                 InvalidPasswordError,
+                TooManyLoginAttemptsError,
                 TokenGenerationError,
                 UserServiceError,
                 RabbitMQError,
                 AuthServiceError
         ) as e:
             self._logger.info(
-                f"Authentication failed: {str(e)}. "
-                f"User identifier: {credentials.get('email') or credentials.get('phone_number')}"
+                "Authentication failed: %s. User identifier: %s",
+                e, credentials.get('email') or credentials.get('phone_number'),
+                event='login_failed',
+                operation_type='login',
+                outcome=type(e).__name__,
+                status_code=e.status_code
             )
             raise
         except Exception as e:
-            self._logger.critical(f"Unexpected error during authentication. From: LoginUseCase, execute(): {str(e)}")
+            self._logger.critical("Unexpected error during authentication. From: LoginUseCase, execute(): %s", e)
             raise TokenGenerationError("Authentication failed due to internal error.")
 
+    @staticmethod
+    def _is_failed_attempt(error: Exception) -> bool:
+        """
+        Whether the error is a wrong guess counted by the throttling: a wrong password or an
+        unknown identifier (counted too, so probing for existing accounts is throttled as well).
+        """
+        if isinstance(error, (InvalidPasswordError, UserNotFoundError)):
+            return True
+
+        return isinstance(error, UserServiceError) and error.status_code == 404
+
+    async def _authenticate_once(self, credentials: LoginRequestDTO) -> UserAuthResponseDTO:
+        """
+        Authenticates the user, or waits for the identical authentication already in progress.
+        """
+        key = self._login_key(credentials)
+        if key is None:
+            return await self._authenticate(credentials)
+
+        return await self._authentications_in_flight.do(key, lambda: self._authenticate(credentials))
+
+    async def _authenticate(self, credentials: LoginRequestDTO) -> UserAuthResponseDTO:
+        """
+        Checks the credentials once for all the callers sharing the authentication, so a failed
+        one counts as one failed attempt, however many identical logins were waiting for it.
+        """
+        try:
+            return await self._check_credentials(credentials)
+        except (InvalidPasswordError, UserNotFoundError, UserServiceError) as e:
+            if self._login_throttler is not None and self._is_failed_attempt(e):
+                await self._login_throttler.record_failure(credentials.identifier, credentials.client_ip)
+            raise
+
+    async def _check_credentials(self, credentials: LoginRequestDTO) -> UserAuthResponseDTO:
+        """
+        Returns the user the credentials belong to, after checking their status and password.
+        Queues a background rehash of the password if its hash has an outdated cost.
+        """
+        # Get user
+        user = await self._get_user(credentials)
+        if not user:
+            raise UserNotFoundError()
+
+        # Validate user status
+        if not user.is_user_active():
+            raise InactiveUserError()
+
+        # Verify hashed_password
+        if not await self._auth_service.verify_password(
+                credentials.password,
+                user.hashed_password
+        ):
+            self._logger.warning("Invalid hashed_password attempt for user: %s", user.id)
+            raise InvalidPasswordError()
+
+        if self._password_rehasher is not None and self._auth_service.needs_password_rehash(user.hashed_password):
+            self._password_rehasher.schedule(user.id, credentials.password)
+
+        return user
+
+    @staticmethod
+    def _login_key(credentials: LoginRequestDTO) -> Optional[Hashable]:
+        """
+        Returns the key identical logins share: the identifier, a digest of the password (so plain
+        passwords are not kept as keys) and the client IP, whose failed attempts are counted.
+        None if the credentials are malformed.
+        """
+        identifier = credentials.identifier
+        password = credentials.password
+        if not isinstance(identifier, str) or not isinstance(password, str) \
+                or not isinstance(credentials.client_ip, (str, type(None))):
+            return None
+
+        return identifier, hashlib.sha256(password.encode('utf-8')).digest(), credentials.client_ip
+
     async def _get_user(self, credentials: LoginRequestDTO) -> Optional[UserAuthResponseDTO]:
         """
         Retrieves user by email or phone number.
@@ -130,46 +213,3 @@ class LoginUseCase:
             return await self._user_adapter.get_by_email(credentials.email, include_password_hash=True)
 
         return await self._user_adapter.get_by_phone_number(credentials.phone_number, include_password_hash=True)
-
-
-
-# FOR TESTING PURPOSES ONLY
-class StubLoginUseCase(LoginUseCase):
-    """
-    Stub-use case for testing purposes.
-    """
-
-    async def execute(self, credentials: dict) -> AuthTokens:
-        # Create a fake user with all roles
-        domain_schema_data = LoginRequestDTO(**credentials)
-
-        fake_user = UserAuthResponseDTO(
-            id=uuid.uuid4(),
-            email=domain_schema_data.email,
-            phone_number=domain_schema_data.phone_number,
-            hashed_password="stub_hashed_password",
-            first_name="Fake",
-            last_name="User",
-            is_active=True,
-            created_at=datetime.datetime.now(datetime.UTC),
-            updated_at=datetime.datetime.now(datetime.UTC),
-            roles=[
-                RolesEnum.USER,
-                RolesEnum.CSS_EMPLOYEE,
-                RolesEnum.CSS_ADMIN
-            ]
-        )
-
-        access_token = self._jwt_service.generate_access_token(
-            user_id=fake_user.id,
-            roles=fake_user.roles
-        )
-        refresh_token = self._jwt_service.generate_refresh_token(
-            user_id=fake_user.id,
-            roles=fake_user.roles
-        )
-
-        return AuthTokens(
-            access_token=str(access_token),
-            refresh_token=str(refresh_token)
-        )
\ No newline at end of file
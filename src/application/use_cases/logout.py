@@ -0,0 +1,50 @@
+from src.application.exceptions import InvalidTokenError
+from src.application.services.session_token_service import SessionTokenService
+from src.core.logger import LoggerService
+from src.domain.interfaces.jwt_service_interface import IJWTService
+from src.domain.models.auth_requests import LogoutRequestDTO
+from src.domain.models.auth_responses import LogoutResponseDTO
+
+
+class LogoutUseCase:
+    """
+    USE CASE: Logout a user by revoking the session of the refresh token, or all the sessions of the user.
+
+    Revoked refresh tokens can't be exchanged for new tokens anymore. Access tokens that
+    were already issued stay valid until they expire.
+    """
+    def __init__(
+            self,
+            jwt_service: IJWTService,
+            session_token_service: SessionTokenService,
+            logger: LoggerService
+    ):
+        self._jwt_service = jwt_service
+        self._session_token_service = session_token_service
+        self._logger = logger
+
+    async def execute(self, logout_payload: dict) -> LogoutResponseDTO:
+        """
+        Executes the logout flow.
+
+        Args:
+            logout_payload (dict): Payload with the 'refresh_token' and an optional 'all_sessions' flag.
+
+        Returns:
+            LogoutResponseDTO with the number of revoked refresh tokens.
+
+        Raises:
+            InvalidTokenError: When the refresh token is missing, invalid or expired.
+        """
+        domain_schema_data = LogoutRequestDTO(
+            refresh_token=logout_payload.get('refresh_token'),
+            all_sessions=bool(logout_payload.get('all_sessions', False))
+        )
+        if not domain_schema_data.is_valid():
+            raise InvalidTokenError("Refresh token is not provided.")
+
+        claims = self._jwt_service.verify(domain_schema_data.refresh_token, token_type='refresh')
+        revoked = await self._session_token_service.revoke(claims, all_sessions=domain_schema_data.all_sessions)
+        self._logger.info("Revoked %d refresh token(s) of user: %s.", revoked, claims['sub'])
+
+        return LogoutResponseDTO(revoked=revoked)
@@ -1,20 +1,26 @@
-from src.application.exceptions import TokenGenerationError
+from src.application.exceptions import TokenGenerationError, InvalidTokenError
+from src.application.services.session_token_service import SessionTokenService
 from src.core.logger import LoggerService
 from src.domain.interfaces.jwt_service_interface import IJWTService
 from src.domain.models.auth_requests import RefreshTokenRequestDTO
-from src.domain.schemas import AuthTokens, RefreshTokenRequest
+from src.domain.schemas import AuthTokens
 
 
 class RefreshUseCase:
     """
     USE CASE: Refresh the access token using the refresh token.
+
+    The refresh token is verified (signature, expiry and type) before new tokens are issued.
+    The presented refresh token is rotated: it is replaced by the new one and can't be used again.
     """
     def __init__(
             self,
             jwt_service: IJWTService,
+            session_token_service: SessionTokenService,
             logger: LoggerService
     ):
         self._jwt_service = jwt_service
+        self._session_token_service = session_token_service
         self._logger = logger
 
     async def execute(self, refresh_token_payload: dict) -> AuthTokens:
@@ -22,30 +28,27 @@ class RefreshUseCase:
         Executes the refresh flow.
 
         Args:
-            refresh_token_payload (dict): Refresh token payload.
+            refresh_token_payload (dict): Payload with the 'refresh_token'.
 
         Returns:
             AuthTokens domain model containing access and refresh tokens.
 
         Raises:
+            InvalidTokenError: When the refresh token is missing, invalid, expired or revoked.
+            TokenReuseError: When the refresh token was already used. The whole session is revoked.
             TokenGenerationError: When token generation fails.
         """
         try:
-            domain_schema_data = RefreshTokenRequestDTO(user_id=refresh_token_payload.get('user_id'), roles=refresh_token_payload.get('roles'))
-
-            new_access_token = self._jwt_service.generate_refresh_token(
-                user_id=domain_schema_data.user_id,
-                roles=domain_schema_data.roles,
-            )
-            new_refresh_token = self._jwt_service.generate_refresh_token(
-                user_id=domain_schema_data.user_id,
-                roles=domain_schema_data.roles,
-            )
-
-            return AuthTokens(
-                access_token=str(new_access_token),
-                refresh_token=str(new_refresh_token)
-            )
+            domain_schema_data = RefreshTokenRequestDTO(refresh_token=refresh_token_payload.get('refresh_token'))
+            if not domain_schema_data.is_valid():
+                raise InvalidTokenError("Refresh token is not provided.")
+
+            claims = self._jwt_service.verify(domain_schema_data.refresh_token, token_type='refresh')
+
+            return await self._session_token_service.rotate(claims)
+        except InvalidTokenError as e:
+            self._logger.info("Token refresh failed: %s", e)
+            raise
         except Exception as e:
-            self._logger.critical(f"Token generation failed. From RefreshUseCase, execute(): {str(e)}")
+            self._logger.critical("Token generation failed. From RefreshUseCase, execute(): %s", e)
             raise TokenGenerationError()
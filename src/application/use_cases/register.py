@@ -1,5 +1,17 @@
+import dataclasses
+import hashlib
+import hmac
+import json
+import secrets
+from typing import Dict, Optional, Tuple
+
+from src.core.cache import TTLCache
+from src.core.config import settings
+from src.core.exceptions import AuthServiceError
 from src.core.logger import LoggerService
-from src.domain.interfaces.password_hasher_interface import IPasswordHasher
+from src.core.metrics import registry
+from src.core.single_flight import SingleFlight
+from src.domain.interfaces.password_hasher_interface import IAsyncPasswordHasher
 from src.domain.interfaces.user_adapter_interface import IUserAdapter
 from src.domain.models.user_requests import AddUserRequestDTO
 from src.domain.models.user_responses import UserResponseDTO
@@ -8,37 +20,164 @@ from src.domain.models.user_responses import UserResponseDTO
 class RegisterUseCase:
     """
     USE CASE: Register a user and return their data.
+
+    Registrations carrying an idempotency key (the AMQP message id of a redelivered message,
+    or a key supplied by the client) run at most once per key: the created user is kept for
+    a while and returned again for a repeated key, without hashing the password or calling
+    the User Service a second time. Duplicates arriving while the first one is still running
+    wait for its result, while a registration with the same key and different data is rejected.
+    Failed registrations are not kept, so they can be retried.
+
+    The completed registrations are kept per process: a duplicate handled by another worker
+    process or replica is not recognised and registers again (the User Service then rejects
+    the already used email or phone number).
     """
 
+    # Fields of the user data that the caller may send, besides the plain password
+    _FIELDS = frozenset(field.name for field in dataclasses.fields(AddUserRequestDTO)) - {'hashed_password'}
+    _REQUIRED_FIELDS = frozenset(
+        field.name for field in dataclasses.fields(AddUserRequestDTO)
+        if field.default is dataclasses.MISSING and field.default_factory is dataclasses.MISSING
+    ) - {'hashed_password'} | {'password'}
+
     def __init__(
             self,
             user_adapter: IUserAdapter,
-            password_hasher: IPasswordHasher,
-            logger: LoggerService
+            password_hasher: IAsyncPasswordHasher,
+            logger: LoggerService,
+            completed_registrations: Optional[TTLCache[Tuple[bytes, UserResponseDTO]]] = None
     ):
         self._user_adapter = user_adapter
         self._password_hasher = password_hasher
         self._logger = logger
+        if completed_registrations is None:
+            completed_registrations = TTLCache(
+                max_size=settings.register_idempotency_cache_size,
+                ttl=settings.register_idempotency_ttl
+            )
+        # Idempotency key -> (fingerprint of the user data, created user)
+        self._completed_registrations = completed_registrations
+        self._registrations_in_flight: SingleFlight[UserResponseDTO] = SingleFlight()
+        # Idempotency key -> fingerprint of the user data of the running registration
+        self._in_flight_fingerprints: Dict[str, bytes] = {}
+        # The fingerprints cover the password, so they are keyed with a secret of the process
+        self._fingerprint_key = secrets.token_bytes(32)
+
+        self.replayed = registry.counter(
+            'auth_register_replayed_total',
+            'Registrations answered with the user created for an earlier message with the same idempotency key.'
+        )
 
     async def execute(self, user_data: dict) -> UserResponseDTO:
         """
-        Executes the register flow:
-        1. Map the user data to a dictionary.
-        2. Replace the plain password with a hashed password.
-        3. Map the dictionary to an AddUserRequestDTO object.
-        4. Call for an adapter method to add the user.
+        Executes the register flow, or returns the result of the registration with the same idempotency key.
 
         Args:
-            user_data (dict): User's data to register.
+            user_data (dict): User's data to register, with an optional 'idempotency_key'.
 
         Returns:
             UserResponseDTO: created user's data.
+
+        Raises:
+            AuthServiceError: When required fields are missing or unknown fields are given (400),
+                when a registration with the same idempotency key and different user data is
+                running (409), or when the key was already used for different user data (422).
+        """
+        idempotency_key = user_data.pop('idempotency_key', None)
+        self._validate(user_data)
+        if not idempotency_key:
+            return await self._register(user_data)
+
+        idempotency_key = str(idempotency_key)
+        fingerprint = self._fingerprint(user_data)
+        completed = self._completed_registrations.get(idempotency_key)
+        if completed is not None:
+            return self._replay(idempotency_key, fingerprint, *completed)
+
+        in_flight_fingerprint = self._in_flight_fingerprints.setdefault(idempotency_key, fingerprint)
+        if in_flight_fingerprint != fingerprint:
+            raise AuthServiceError(
+                status_code=409,
+                detail="A registration with the same idempotency key and different data is in progress."
+            )
+
+        return await self._registrations_in_flight.do(
+            idempotency_key,
+            lambda: self._register_once(idempotency_key, fingerprint, user_data)
+        )
+
+    async def _register_once(self, idempotency_key: str, fingerprint: bytes, user_data: dict) -> UserResponseDTO:
+        try:
+            user = await self._register(user_data)
+            self._completed_registrations.set(idempotency_key, (fingerprint, user))
+            return user
+        finally:
+            self._in_flight_fingerprints.pop(idempotency_key, None)
+
+    def _replay(
+            self,
+            idempotency_key: str,
+            fingerprint: bytes,
+            completed_fingerprint: bytes,
+            user: UserResponseDTO
+    ) -> UserResponseDTO:
+        if fingerprint != completed_fingerprint:
+            raise AuthServiceError(
+                status_code=422,
+                detail="The idempotency key was already used for a registration with different data."
+            )
+
+        self.replayed.labels().inc()
+        self._logger.info(
+            "Replayed the registration of user %s for idempotency key %s.",
+            user.id, idempotency_key,
+            event='register_replayed',
+            operation_type='register'
+        )
+        return user
+
+    async def _register(self, user_data: dict) -> UserResponseDTO:
+        """
+        Executes the register flow:
+        1. Map the user data to a dictionary.
+        2. Replace the plain password with a hashed password.
+        3. Map the dictionary to an AddUserRequestDTO object.
+        4. Call for an adapter method to add the user.
         """
+        user_data = dict(user_data)
         plain_password = user_data.pop('password')
-        hashed_password = self._password_hasher.hash(plain_password)
+        hashed_password = await self._password_hasher.hash(plain_password)
 
         user_data['hashed_password'] = hashed_password
 
         add_user_request = AddUserRequestDTO(**user_data)
 
         return await self._user_adapter.add(add_user_request)
+
+    @classmethod
+    def _validate(cls, user_data: dict) -> None:
+        """Rejects user data that can't make an AddUserRequestDTO, before any hashing."""
+        missing = cls._REQUIRED_FIELDS - user_data.keys()
+        if missing:
+            raise AuthServiceError(
+                status_code=400,
+                detail=f"Missing required fields: {', '.join(sorted(missing))}."
+            )
+
+        unknown = user_data.keys() - cls._FIELDS - {'password'}
+        if unknown:
+            raise AuthServiceError(
+                status_code=400,
+                detail=f"Unknown fields: {', '.join(sorted(unknown))}."
+            )
+
+        if not isinstance(user_data['password'], str) or not user_data['password']:
+            raise AuthServiceError(status_code=400, detail="Password must be a non-empty string.")
+
+    def _fingerprint(self, user_data: dict) -> bytes:
+        """
+        Keyed digest of the user data, so a key reused for another registration is detected
+        without keeping the plain password, or an unsalted hash of it, in memory.
+        """
+        canonical = json.dumps(user_data, sort_keys=True, default=str, separators=(',', ':'))
+        return hmac.new(self._fingerprint_key, canonical.encode('utf-8'), hashlib.sha256).digest()
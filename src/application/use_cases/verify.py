@@ -0,0 +1,104 @@
+import hashlib
+import time
+from typing import Optional
+
+from src.application.exceptions import InvalidTokenError
+from src.core.cache import TTLCache
+from src.core.config import settings
+from src.core.exceptions import AuthServiceError
+from src.core.logger import LoggerService
+from src.domain.interfaces.jwt_service_interface import IJWTService
+from src.domain.models.auth_requests import VerifyTokensRequestDTO
+from src.domain.models.auth_responses import TokenVerificationResultDTO, VerifyTokensResponseDTO
+
+
+class VerifyTokenUseCase:
+    """
+    USE CASE: Verify a batch of tokens for downstream services (token introspection).
+
+    The API Gateway can validate all the tokens of a burst of requests in one round-trip.
+    Results are cached for a short time: valid tokens until they expire at the latest,
+    invalid ones so that replayed garbage tokens do not cost a signature check each time.
+    """
+
+    def __init__(
+            self,
+            jwt_service: IJWTService,
+            logger: LoggerService,
+            valid_tokens_cache: Optional[TTLCache[dict]] = None,
+            invalid_tokens_cache: Optional[TTLCache[str]] = None,
+            max_batch_size: int = settings.verify_max_batch_size
+    ):
+        self._jwt_service = jwt_service
+        self._logger = logger
+        if valid_tokens_cache is None:
+            valid_tokens_cache = TTLCache(
+                max_size=settings.verify_cache_size,
+                ttl=settings.verify_valid_cache_ttl
+            )
+        if invalid_tokens_cache is None:
+            invalid_tokens_cache = TTLCache(
+                max_size=settings.verify_cache_size,
+                ttl=settings.verify_invalid_cache_ttl
+            )
+        self._valid_tokens_cache = valid_tokens_cache
+        self._invalid_tokens_cache = invalid_tokens_cache
+        self._max_batch_size = max_batch_size
+
+    async def execute(self, payload: dict) -> VerifyTokensResponseDTO:
+        """
+        Executes the verify flow.
+
+        Args:
+            payload (dict): Either a single 'token' or a list of 'tokens', and an optional
+                'token_type' ('access' by default).
+
+        Returns:
+            VerifyTokensResponseDTO with a result per token, in the order of the tokens.
+
+        Raises:
+            AuthServiceError: When no tokens are provided or the batch is too large (400).
+        """
+        domain_schema_data = VerifyTokensRequestDTO.from_payload(payload)
+        if not domain_schema_data.is_valid():
+            raise AuthServiceError(status_code=400, detail="No tokens to verify provided.")
+        if len(domain_schema_data.tokens) > self._max_batch_size:
+            raise AuthServiceError(
+                status_code=400,
+                detail=f"Too many tokens to verify at once, max batch size is {self._max_batch_size}."
+            )
+
+        # The same token is often sent several times in a burst, verify it once
+        verified: dict[str, TokenVerificationResultDTO] = {}
+        results = []
+        for token in domain_schema_data.tokens:
+            if not isinstance(token, str):
+                results.append(TokenVerificationResultDTO(valid=False, error="Malformed token."))
+                continue
+
+            result = verified.get(token)
+            if result is None:
+                result = verified[token] = self._verify(token, domain_schema_data.token_type)
+            results.append(result)
+
+        return VerifyTokensResponseDTO(results=results)
+
+    def _verify(self, token: str, token_type: str) -> TokenVerificationResultDTO:
+        cache_key = (token_type, hashlib.sha256(token.encode('utf-8')).digest())
+
+        claims = self._valid_tokens_cache.get(cache_key)
+        if claims is not None and claims['exp'] > time.time():
+            return TokenVerificationResultDTO(valid=True, claims=claims)
+
+        error = self._invalid_tokens_cache.get(cache_key)
+        if error is not None:
+            return TokenVerificationResultDTO(valid=False, error=error)
+
+        try:
+            claims = self._jwt_service.verify(token, token_type=token_type)
+        except InvalidTokenError as e:
+            self._invalid_tokens_cache.set(cache_key, str(e))
+            return TokenVerificationResultDTO(valid=False, error=str(e))
+
+        self._valid_tokens_cache.set(cache_key, claims, ttl=claims['exp'] - time.time())
+        return TokenVerificationResultDTO(valid=True, claims=claims)
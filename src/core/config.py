@@ -6,6 +6,25 @@ from pydantic.v1 import BaseSettings
 load_dotenv('src/.env')
 
 
+def parse_mapping(value: str) -> dict[str, str]:
+    """
+    Parses a 'key=value,key=value' setting into a dictionary.
+
+    Args:
+        value (str): Raw setting value.
+
+    Returns:
+        dict: Parsed keys and values with surrounding whitespace stripped.
+    """
+    mapping = {}
+    for item in (value or '').split(','):
+        if '=' in item:
+            key, item_value = item.split('=', 1)
+            mapping[key.strip()] = item_value.strip()
+
+    return mapping
+
+
 class Settings(BaseSettings):
     db_driver: str = os.getenv("DB_DRIVER")
     postgres_user: str = os.getenv("POSTGRES_USER")
@@ -16,13 +35,74 @@ class Settings(BaseSettings):
 
     jwt_private_secret_key: str = os.getenv("JWT_PRIVATE_SECRET_KEY")
     jwt_algorithm: str = os.getenv("ALGORITHM")
+    jwt_previous_public_keys: str = os.getenv("JWT_PREVIOUS_PUBLIC_KEYS", "")
     access_token_expire_time: int = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES"))
     refresh_token_expire_time: int = int(os.getenv("REFRESH_TOKEN_EXPIRE_DAYS"))
+    verify_max_batch_size: int = int(os.getenv("VERIFY_MAX_BATCH_SIZE", 100))
+    verify_cache_size: int = int(os.getenv("VERIFY_CACHE_SIZE", 50000))
+    verify_valid_cache_ttl: int = int(os.getenv("VERIFY_VALID_CACHE_TTL_SECONDS", 30))
+    verify_invalid_cache_ttl: int = int(os.getenv("VERIFY_INVALID_CACHE_TTL_SECONDS", 10))
+    token_store_backend: str = os.getenv("TOKEN_STORE_BACKEND", "memory")
+    token_store_sqlite_path: str = os.getenv("TOKEN_STORE_SQLITE_PATH", "refresh_tokens.sqlite3")
+    token_store_sweep_interval: int = int(os.getenv("TOKEN_STORE_SWEEP_INTERVAL_SECONDS", 60))
+    user_cache_size: int = int(os.getenv("USER_CACHE_SIZE", 10000))
+    user_cache_ttl: int = int(os.getenv("USER_CACHE_TTL_SECONDS", 30))
+    login_throttle_enabled: bool = os.getenv("LOGIN_THROTTLE_ENABLED", "true").lower() == "true"
+    login_max_failures_per_identifier: int = int(os.getenv("LOGIN_MAX_FAILURES_PER_IDENTIFIER", 5))
+    login_max_failures_per_ip: int = int(os.getenv("LOGIN_MAX_FAILURES_PER_IP", 50))
+    login_failure_window: int = int(os.getenv("LOGIN_FAILURE_WINDOW_SECONDS", 900))
+    login_lockout: int = int(os.getenv("LOGIN_LOCKOUT_SECONDS", 30))
+    login_max_lockout: int = int(os.getenv("LOGIN_MAX_LOCKOUT_SECONDS", 3600))
+    login_throttle_max_keys: int = int(os.getenv("LOGIN_THROTTLE_MAX_KEYS", 100000))
+    # Per process: a duplicate registration handled by another worker process is not recognised
+    register_idempotency_cache_size: int = int(os.getenv("REGISTER_IDEMPOTENCY_CACHE_SIZE", 10000))
+    register_idempotency_ttl: int = int(os.getenv("REGISTER_IDEMPOTENCY_TTL_SECONDS", 600))
+
+    password_hasher_executor: str = os.getenv("PASSWORD_HASHER_EXECUTOR", "process")
+    password_hasher_workers: int = int(os.getenv("PASSWORD_HASHER_WORKERS", os.cpu_count() or 1))
+    password_hasher_max_queue_size: int = int(os.getenv("PASSWORD_HASHER_MAX_QUEUE_SIZE", 64))
+    password_hash_algorithm: str = os.getenv("PASSWORD_HASH_ALGORITHM", "bcrypt")
+    argon2_time_cost: int = int(os.getenv("ARGON2_TIME_COST", 3))
+    argon2_memory_cost: int = int(os.getenv("ARGON2_MEMORY_COST_KIB", 65536))
+    argon2_parallelism: int = int(os.getenv("ARGON2_PARALLELISM", 1))
+    bcrypt_rounds: int = int(os.getenv("BCRYPT_ROUNDS", 0))
+    bcrypt_min_rounds: int = int(os.getenv("BCRYPT_MIN_ROUNDS", 10))
+    bcrypt_max_rounds: int = int(os.getenv("BCRYPT_MAX_ROUNDS", 16))
+    password_hash_target_ms: int = int(os.getenv("PASSWORD_HASH_TARGET_MS", 250))
+    password_rehash_max_pending: int = int(os.getenv("PASSWORD_REHASH_MAX_PENDING", 32))
+
+    log_queue_size: int = int(os.getenv('LOG_QUEUE_SIZE', 10000))
+    log_queue_overflow_policy: str = os.getenv('LOG_QUEUE_OVERFLOW_POLICY', 'drop')
+    log_format: str = os.getenv('LOG_FORMAT', 'text')
+    log_sampling_rates: str = os.getenv('LOG_SAMPLING_RATES', 'message_processed=0.1')
+    log_repeat_limit: int = int(os.getenv('LOG_REPEAT_LIMIT', 20))
+    log_repeat_window: float = float(os.getenv('LOG_REPEAT_WINDOW_SECONDS', 10))
+    log_repeat_max_templates: int = int(os.getenv('LOG_REPEAT_MAX_TEMPLATES', 1000))
+    tracing_exporter: str = os.getenv('TRACING_EXPORTER', 'none')
+    tracing_file_path: str = os.getenv('TRACING_FILE_PATH', 'logs/traces-{pid}.jsonl')
+    tracing_sample_rate: float = float(os.getenv('TRACING_SAMPLE_RATE', 1.0))
 
     RABBITMQ_LOGIN: str = os.getenv('RABBITMQ_LOGIN')
     RABBITMQ_PASSWORD: str = os.getenv('RABBITMQ_PASSWORD')
     RABBITMQ_HOST: str = os.getenv('RABBITMQ_HOST')
     RABBITMQ_PORT: int = int(os.getenv('RABBITMQ_PORT'))
+    amqp_content_type: str = os.getenv('AMQP_CONTENT_TYPE', 'application/json')
+    auth_workers: int = int(os.getenv('AUTH_WORKERS', os.cpu_count() or 1))
+    worker_shutdown_timeout: int = int(os.getenv('WORKER_SHUTDOWN_TIMEOUT', 30))
+    http_host: str = os.getenv('HTTP_HOST', '0.0.0.0')
+    http_port: int = int(os.getenv('HTTP_PORT', 8001))
+    rabbitmq_channel_pool_sizes: str = os.getenv('RABBITMQ_CHANNEL_POOL_SIZES', 'responses=4,rpc=4')
+    rabbitmq_publisher_confirms_workloads: str = os.getenv('RABBITMQ_PUBLISHER_CONFIRMS_WORKLOADS', 'retries')
+    user_batching_enabled: bool = os.getenv('USER_BATCHING_ENABLED', 'false').lower() == 'true'
+    user_batch_max_size: int = int(os.getenv('USER_BATCH_MAX_SIZE', 64))
+    user_batch_max_delay_ms: float = float(os.getenv('USER_BATCH_MAX_DELAY_MS', 2))
+    user_events_exchange: str = os.getenv('USER_EVENTS_EXCHANGE', '')
+    rabbitmq_prefetch_count: int = int(os.getenv('RABBITMQ_PREFETCH_COUNT', 256))
+    auth_max_attempts: int = int(os.getenv('AUTH_MAX_ATTEMPTS', 3))
+    auth_retry_delay_ms: int = int(os.getenv('AUTH_RETRY_DELAY_MS', 500))
+    operation_concurrency_limits: str = os.getenv('OPERATION_CONCURRENCY_LIMITS', 'login=16,register=8,refresh=64,verify=64,logout=16')
+    http_allowed_networks: str = os.getenv('HTTP_ALLOWED_NETWORKS', '127.0.0.1/32,::1/128')
+    http_trusted_proxies: str = os.getenv('HTTP_TRUSTED_PROXIES', '127.0.0.1/32,::1/128')
 
     @property
     def db_url(self, db_driver: str = db_driver) -> str:
@@ -34,6 +114,85 @@ class Settings(BaseSettings):
         """
         return f"{db_driver}://{self.postgres_user}:{self.postgres_password}@{self.postgres_host}:{self.postgres_port}/{self.postgres_database}"
 
+    @property
+    def http_allowed_networks_list(self) -> list[str]:
+        """
+        Property that represents the client networks allowed to call the HTTP endpoints.
+
+        Returns:
+            list: IP addresses and CIDR networks.
+        """
+        return [network.strip() for network in self.http_allowed_networks.split(',') if network.strip()]
+
+    @property
+    def http_trusted_proxies_list(self) -> list[str]:
+        """
+        Property that represents the proxies (e.g. the API Gateway) whose X-Forwarded-For header is trusted.
+
+        Returns:
+            list: IP addresses and CIDR networks.
+        """
+        return [network.strip() for network in self.http_trusted_proxies.split(',') if network.strip()]
+
+    @property
+    def jwt_previous_public_keys_list(self) -> list[str]:
+        """
+        Property that represents the PEM public keys of the previous JWT signing keys.
+
+        Returns:
+            list: PEM public keys.
+        """
+        return [key for key in self.jwt_previous_public_keys.split(';') if key.strip()]
+
+    @property
+    def log_sampling_rates_map(self) -> dict[str, float]:
+        """
+        Property that represents the share of the log records kept per event type.
+
+        Returns:
+            dict: Event type -> sampling rate between 0 and 1.
+        """
+        return {
+            event: float(rate)
+            for event, rate in parse_mapping(self.log_sampling_rates).items()
+        }
+
+    @property
+    def operation_concurrency_limits_map(self) -> dict[str, int]:
+        """
+        Property that represents the max number of concurrently processed messages per operation type.
+
+        Returns:
+            dict: Operation type -> concurrency limit.
+        """
+        return {
+            operation_type: int(limit)
+            for operation_type, limit in parse_mapping(self.operation_concurrency_limits).items()
+        }
+
+    @property
+    def rabbitmq_channel_pool_sizes_map(self) -> dict[str, int]:
+        """
+        Property that represents the number of pooled RabbitMQ channels per workload.
+
+        Returns:
+            dict: Workload name -> pool size.
+        """
+        return {
+            workload: int(size)
+            for workload, size in parse_mapping(self.rabbitmq_channel_pool_sizes).items()
+        }
+
+    @property
+    def rabbitmq_publisher_confirms_workloads_set(self) -> set[str]:
+        """
+        Property that represents the workloads whose channels use publisher confirms.
+
+        Returns:
+            set: Workload names.
+        """
+        return {workload.strip() for workload in self.rabbitmq_publisher_confirms_workloads.split(',') if workload.strip()}
+
     @property
     def rabbitmq_url(self) -> str:
         """
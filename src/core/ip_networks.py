@@ -0,0 +1,38 @@
+import ipaddress
+from typing import Iterable, Optional
+
+
+class IPNetworks:
+    """
+    A set of IP addresses and CIDR networks, parsed once.
+
+    Single addresses are checked with a set lookup and only the wider networks are scanned.
+    IPv4-mapped IPv6 addresses ('::ffff:a.b.c.d', as seen by dual-stack servers) match their IPv4 address.
+    """
+
+    def __init__(self, networks: Iterable[str]) -> None:
+        """
+        Args:
+            networks: IP addresses and CIDR networks, e.g. '10.0.0.0/8'.
+        """
+        parsed = [ipaddress.ip_network(network, strict=False) for network in networks]
+        self._addresses = frozenset(network.network_address for network in parsed if network.num_addresses == 1)
+        self._networks = tuple(network for network in parsed if network.num_addresses > 1)
+
+    def __contains__(self, address: Optional[str]) -> bool:
+        """Whether the address belongs to one of the networks. Invalid addresses never do."""
+        if not address:
+            return False
+
+        try:
+            ip_address = ipaddress.ip_address(address)
+        except ValueError:
+            return False
+
+        if ip_address.version == 6 and ip_address.ipv4_mapped is not None:
+            ip_address = ip_address.ipv4_mapped
+
+        if ip_address in self._addresses:
+            return True
+
+        return any(ip_address in network for network in self._networks)
@@ -1,6 +1,194 @@
+import atexit
+import json
 import logging
 import os
+import queue
+import random
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
 from logging import Logger
+from logging.handlers import QueueHandler, QueueListener
+from typing import Any, Dict, Optional, Tuple
+
+from src.core.config import settings
+
+
+class BoundedQueueHandler(QueueHandler):
+    """
+    Queue handler that hands the records over to a background thread through a bounded queue.
+
+    When the queue is full, records are either dropped ('drop' policy, the caller never waits)
+    or the caller waits for free space ('block' policy, no record is lost). Dropped records
+    are counted and reported by a warning as soon as the queue has room again.
+    """
+
+    def __init__(self, record_queue: queue.Queue, overflow_policy: str = 'drop'):
+        """
+        Args:
+            record_queue (queue.Queue): Bounded queue shared with the listener.
+            overflow_policy (str): 'drop' or 'block', what to do when the queue is full.
+        """
+        if overflow_policy not in ('drop', 'block'):
+            raise ValueError(f"Unknown log queue overflow policy: {overflow_policy}")
+
+        super().__init__(record_queue)
+        self.overflow_policy = overflow_policy
+        self.dropped: int = 0
+        self._unreported_drops: int = 0
+        self._lock = threading.Lock()
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Unlike QueueHandler, leave the '%' formatting of the message to the listener thread.
+        # Arguments are formatted later, so don't pass objects that are modified right after logging.
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        if self.overflow_policy == 'block':
+            self.queue.put(record)
+            return
+
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            with self._lock:
+                self.dropped += 1
+                self._unreported_drops += 1
+            return
+
+        if self._unreported_drops:
+            self._report_drops(record.name)
+
+    def _report_drops(self, logger_name: str) -> None:
+        with self._lock:
+            dropped, self._unreported_drops = self._unreported_drops, 0
+
+        report = logging.LogRecord(
+            logger_name, logging.WARNING, __file__, 0,
+            "Log queue was full, dropped %d log record(s).", (dropped,), None
+        )
+        try:
+            self.queue.put_nowait(report)
+        except queue.Full:
+            with self._lock:
+                self._unreported_drops += dropped
+
+
+# Structured fields a record can carry, passed as keyword arguments to the LoggerService methods
+LOG_FIELDS: Tuple[str, ...] = (
+    'event', 'correlation_id', 'operation_type', 'latency_ms', 'outcome', 'status_code', 'suppressed_repeats'
+)
+
+
+class JsonFormatter(logging.Formatter):
+    """Formats the records as JSON lines, with the structured fields as top-level keys."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "timestamp": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec='milliseconds'),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for field in LOG_FIELDS:
+            value = getattr(record, field, None)
+            if value is not None:
+                entry[field] = value
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Keeps only a share of the records of the sampled event types (the 'event' field).
+    Warnings and errors are always kept.
+    """
+
+    def __init__(self, sampling_rates: Dict[str, float]):
+        """
+        Args:
+            sampling_rates (dict): Event type -> share of the records to keep, between 0 and 1.
+        """
+        super().__init__()
+        self.sampling_rates = sampling_rates
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING:
+            return True
+
+        rate = self.sampling_rates.get(getattr(record, 'event', None))
+        return rate is None or random.random() < rate
+
+
+class RepeatSuppressionFilter(logging.Filter):
+    """
+    Lets at most `limit` records with the same message template (and level) through per
+    `window` seconds. The first record let through after a suppression carries the number
+    of suppressed repeats in its 'suppressed_repeats' field.
+
+    At most `max_templates` templates are tracked, the least recently logged ones are forgotten
+    first. Templates are the messages before the '%' formatting, so the variable parts must be
+    passed as arguments: a message built with an f-string is a new template every time.
+    """
+
+    def __init__(self, limit: int, window: float, max_templates: int = 1000):
+        super().__init__()
+        self.limit = limit
+        self.window = window
+        self.max_templates = max(1, max_templates)
+        # (level, template) -> [window start, records in the window, suppressed records], least recently logged first
+        self._counters: OrderedDict[Tuple[int, Any], list] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if self.limit <= 0:
+            return True
+
+        key = (record.levelno, record.msg)
+        now = time.monotonic()
+        with self._lock:
+            counter = self._counters.get(key)
+            if counter is None:
+                self._evict(now)
+            else:
+                self._counters.move_to_end(key)
+
+            if counter is None or now - counter[0] >= self.window:
+                suppressed = counter[2] if counter else 0
+                counter = self._counters[key] = [now, 0, suppressed]
+
+            if counter[1] >= self.limit:
+                counter[2] += 1
+                return False
+
+            counter[1] += 1
+            suppressed, counter[2] = counter[2], 0
+
+        if suppressed:
+            record.suppressed_repeats = suppressed
+        return True
+
+    def _evict(self, now: float) -> None:
+        """Makes room for a new template: forgets the expired windows, or the least recently logged template."""
+        while self._counters:
+            oldest = next(iter(self._counters.values()))
+            if now - oldest[0] < self.window and len(self._counters) < self.max_templates:
+                return
+            self._counters.popitem(last=False)
+
+
+# Logger name -> listener writing its records, stopped (and flushed) at exit
+_listeners: Dict[str, QueueListener] = {}
+
+
+@atexit.register
+def _stop_listeners() -> None:
+    for listener in _listeners.values():
+        listener.stop()
+    _listeners.clear()
 
 
 class LoggerService:
@@ -13,11 +201,26 @@ class LoggerService:
             date_format: str = '%Y-%m-%d %H:%M:%S',
             console_level: int = logging.INFO,
             file_level: int = logging.ERROR,
-            base_level: int = logging.DEBUG
+            base_level: int = logging.DEBUG,
+            queue_size: int = settings.log_queue_size,
+            overflow_policy: str = settings.log_queue_overflow_policy,
+            output_format: str = settings.log_format,
+            sampling_rates: Optional[Dict[str, float]] = None,
+            repeat_limit: int = settings.log_repeat_limit,
+            repeat_window: float = settings.log_repeat_window,
+            repeat_max_templates: int = settings.log_repeat_max_templates
     ) -> None:
         """
         Creates a customized logger that outputs logs to both the console and a file.
 
+        Records are written by a background thread, so logging never does console or disk I/O
+        on the event loop. Pass the message arguments separately (`logger.info("Got %s", value)`),
+        they are only formatted if the record is written. Structured fields (see LOG_FIELDS)
+        are passed as keyword arguments and written as JSON keys with the 'json' output format.
+
+        Records of hot-path event types can be sampled, and repeats of the same message
+        template are rate-limited, so logging costs stay bounded under load.
+
         Args:
             name (str): Logger name.
             log_file_name (str): File name (with file extension, ex. '.log'), where logs will be written.
@@ -27,40 +230,70 @@ class LoggerService:
             console_level (int): Console logging level.
             file_level (int): File logging level.
             base_level (int): Base logging level.
+            queue_size (int): Max number of records waiting to be written.
+            overflow_policy (str): 'drop' or 'block', what to do with new records when the queue is full.
+            output_format (str): 'text' or 'json' (JSON lines).
+            sampling_rates (dict): Event type -> share of its records to keep.
+            repeat_limit (int): Max records with the same message template per window, 0 for no limit.
+            repeat_window (float): Repeat suppression window in seconds.
+            repeat_max_templates (int): Max number of message templates tracked by the repeat suppression.
         """
+        if output_format not in ('text', 'json'):
+            raise ValueError(f"Unknown log output format: {output_format}")
+        if sampling_rates is None:
+            sampling_rates = settings.log_sampling_rates_map
+
         self.logger: Logger = logging.getLogger(name)
-        self.logger.setLevel(base_level)
+        # Records below the level of both handlers would be discarded anyway, skip creating them
+        self.logger.setLevel(max(base_level, min(console_level, file_level)))
         # If handlers have already been added, there's no need to recreate them
         if not self.logger.handlers:
             if not os.path.exists(log_dir):
                 os.makedirs(log_dir)
 
-            formatter = logging.Formatter(log_format, datefmt=date_format)
+            if output_format == 'json':
+                formatter = JsonFormatter()
+            else:
+                formatter = logging.Formatter(log_format, datefmt=date_format)
 
             # Console handler setting up
             console_handler = logging.StreamHandler()
             console_handler.setLevel(console_level)
             console_handler.setFormatter(formatter)
-            self.logger.addHandler(console_handler)
 
             # File handler setting up
             file_path = os.path.join(log_dir, f"{log_file_name}")
             file_handler = logging.FileHandler(file_path)
             file_handler.setLevel(file_level)
             file_handler.setFormatter(formatter)
-            self.logger.addHandler(file_handler)
 
-    def debug(self, message: str) -> None:
-        self.logger.debug(message)
+            # Only the queue handler runs in the caller's thread
+            queue_handler = BoundedQueueHandler(queue.Queue(maxsize=queue_size), overflow_policy)
+            # Filters run before the record is queued, so filtered records cost no queue slot
+            queue_handler.addFilter(SamplingFilter(sampling_rates))
+            queue_handler.addFilter(RepeatSuppressionFilter(repeat_limit, repeat_window, repeat_max_templates))
+            self.logger.addHandler(queue_handler)
+
+            listener = QueueListener(queue_handler.queue, console_handler, file_handler, respect_handler_level=True)
+            listener.start()
+            _listeners[name] = listener
+
+    @property
+    def dropped_records(self) -> int:
+        """Number of records dropped because the queue was full."""
+        return sum(getattr(handler, 'dropped', 0) for handler in self.logger.handlers)
+
+    def debug(self, message: str, *args: Any, **fields: Any) -> None:
+        self.logger.debug(message, *args, extra=fields)
 
-    def info(self, message: str) -> None:
-        self.logger.info(message)
+    def info(self, message: str, *args: Any, **fields: Any) -> None:
+        self.logger.info(message, *args, extra=fields)
 
-    def warning(self, message: str) -> None:
-        self.logger.warning(message)
+    def warning(self, message: str, *args: Any, **fields: Any) -> None:
+        self.logger.warning(message, *args, extra=fields)
 
-    def error(self, message: str) -> None:
-        self.logger.error(message)
+    def error(self, message: str, *args: Any, **fields: Any) -> None:
+        self.logger.error(message, *args, extra=fields)
 
-    def critical(self, message: str) -> None:
-        self.logger.critical(message)
+    def critical(self, message: str, *args: Any, **fields: Any) -> None:
+        self.logger.critical(message, *args, extra=fields)
@@ -0,0 +1,271 @@
+from bisect import bisect_left
+from typing import Dict, List, Optional, Tuple, Union
+
+
+class _GaugeChild:
+    """Value of a gauge for one combination of label values."""
+    __slots__ = ('value',)
+
+    def __init__(self) -> None:
+        self.value: float = 0
+
+    def inc(self, amount: float = 1) -> None:
+        self.value += amount
+
+    def dec(self, amount: float = 1) -> None:
+        self.value -= amount
+
+    def set(self, value: float) -> None:
+        self.value = value
+
+
+class _CounterChild:
+    """Value of a counter for one combination of label values."""
+    __slots__ = ('value',)
+
+    def __init__(self) -> None:
+        self.value: float = 0
+
+    def inc(self, amount: float = 1) -> None:
+        self.value += amount
+
+
+class Counter:
+    """
+    Metric that represents a value that only goes up (e.g. number of processed messages).
+
+    Like Gauge, only touched from the event loop thread.
+    """
+
+    def __init__(self, name: str, description: str, label_names: Tuple[str, ...] = ()) -> None:
+        """
+        Args:
+            name (str): Metric name.
+            description (str): Human-readable description of the metric.
+            label_names (tuple): Names of the labels the metric is split by.
+        """
+        self.name = name
+        self.description = description
+        self.label_names = label_names
+        self._children: Dict[Tuple[str, ...], _CounterChild] = {}
+
+    def labels(self, *label_values: str) -> _CounterChild:
+        """
+        Returns the counter child for the given label values, creating it if needed.
+
+        Raises:
+            ValueError: When the number of label values does not match the label names.
+        """
+        if len(label_values) != len(self.label_names):
+            raise ValueError(f"Counter '{self.name}' expects labels {self.label_names}, got {label_values}.")
+
+        child = self._children.get(label_values)
+        if child is None:
+            child = self._children[label_values] = _CounterChild()
+
+        return child
+
+    def values(self) -> Dict[Tuple[str, ...], float]:
+        """Returns a snapshot of the current values keyed by label values."""
+        return {label_values: child.value for label_values, child in self._children.items()}
+
+
+class Gauge:
+    """
+    Metric that represents a value that can go up and down (e.g. number of messages in flight).
+
+    Values are only touched from the event loop thread, so updates are plain attribute
+    writes without locking. Resolve the child with labels() once and keep it on hot paths.
+    """
+
+    def __init__(self, name: str, description: str, label_names: Tuple[str, ...] = ()) -> None:
+        """
+        Args:
+            name (str): Metric name.
+            description (str): Human-readable description of the metric.
+            label_names (tuple): Names of the labels the metric is split by.
+        """
+        self.name = name
+        self.description = description
+        self.label_names = label_names
+        self._children: Dict[Tuple[str, ...], _GaugeChild] = {}
+
+    def labels(self, *label_values: str) -> _GaugeChild:
+        """
+        Returns the gauge child for the given label values, creating it if needed.
+
+        Raises:
+            ValueError: When the number of label values does not match the label names.
+        """
+        if len(label_values) != len(self.label_names):
+            raise ValueError(f"Gauge '{self.name}' expects labels {self.label_names}, got {label_values}.")
+
+        child = self._children.get(label_values)
+        if child is None:
+            child = self._children[label_values] = _GaugeChild()
+
+        return child
+
+    def values(self) -> Dict[Tuple[str, ...], float]:
+        """Returns a snapshot of the current values keyed by label values."""
+        return {label_values: child.value for label_values, child in self._children.items()}
+
+
+DEFAULT_LATENCY_BUCKETS: Tuple[float, ...] = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+FAST_LATENCY_BUCKETS: Tuple[float, ...] = (0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025)
+
+
+class _HistogramChild:
+    """Observations of a histogram for one combination of label values."""
+    __slots__ = ('_upper_bounds', 'bucket_counts', 'sum', 'count')
+
+    def __init__(self, upper_bounds: Tuple[float, ...]) -> None:
+        self._upper_bounds = upper_bounds
+        # One extra bucket for the observations above the highest bound (+Inf)
+        self.bucket_counts: List[int] = [0] * (len(upper_bounds) + 1)
+        self.sum: float = 0
+        self.count: int = 0
+
+    def observe(self, value: float) -> None:
+        self.bucket_counts[bisect_left(self._upper_bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class Histogram:
+    """
+    Metric that counts observations (e.g. latencies or batch sizes) in buckets.
+
+    Like Gauge, only touched from the event loop thread. Buckets are not cumulative,
+    each observation is counted in the first bucket whose upper bound it does not exceed.
+    """
+
+    def __init__(
+            self,
+            name: str,
+            description: str,
+            label_names: Tuple[str, ...] = (),
+            buckets: Tuple[float, ...] = DEFAULT_LATENCY_BUCKETS
+    ) -> None:
+        """
+        Args:
+            name (str): Metric name.
+            description (str): Human-readable description of the metric.
+            label_names (tuple): Names of the labels the metric is split by.
+            buckets (tuple): Upper bounds of the buckets, in increasing order.
+        """
+        self.name = name
+        self.description = description
+        self.label_names = label_names
+        self.buckets = tuple(sorted(buckets))
+        self._children: Dict[Tuple[str, ...], _HistogramChild] = {}
+
+    def labels(self, *label_values: str) -> _HistogramChild:
+        """
+        Returns the histogram child for the given label values, creating it if needed.
+
+        Raises:
+            ValueError: When the number of label values does not match the label names.
+        """
+        if len(label_values) != len(self.label_names):
+            raise ValueError(f"Histogram '{self.name}' expects labels {self.label_names}, got {label_values}.")
+
+        child = self._children.get(label_values)
+        if child is None:
+            child = self._children[label_values] = _HistogramChild(self.buckets)
+
+        return child
+
+    def children(self) -> Dict[Tuple[str, ...], _HistogramChild]:
+        """Returns the histogram children keyed by label values."""
+        return dict(self._children)
+
+
+Metric = Union[Counter, Gauge, Histogram]
+
+
+def _escape_label_value(value: str) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(label_names: Tuple[str, ...], label_values: Tuple[str, ...], extra: str = '') -> str:
+    labels = [f'{name}="{_escape_label_value(value)}"' for name, value in zip(label_names, label_values)]
+    if extra:
+        labels.append(extra)
+
+    return '{' + ','.join(labels) + '}' if labels else ''
+
+
+def _format_value(value: float) -> str:
+    if value == float('inf'):
+        return '+Inf'
+
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class MetricsRegistry:
+    """
+    Holds the metrics of the process and renders them in the Prometheus text format.
+
+    Metrics are created once with counter(), gauge() or histogram() and then updated without
+    going through the registry, so the registry costs nothing on the hot path. Asking for
+    an existing name returns the existing metric.
+    """
+
+    def __init__(self) -> None:
+        self._metrics: Dict[str, Metric] = {}
+
+    def counter(self, name: str, description: str, label_names: Tuple[str, ...] = ()) -> Counter:
+        return self._get_or_create(Counter, name, description, label_names)
+
+    def gauge(self, name: str, description: str, label_names: Tuple[str, ...] = ()) -> Gauge:
+        return self._get_or_create(Gauge, name, description, label_names)
+
+    def histogram(
+            self,
+            name: str,
+            description: str,
+            label_names: Tuple[str, ...] = (),
+            buckets: Tuple[float, ...] = DEFAULT_LATENCY_BUCKETS
+    ) -> Histogram:
+        return self._get_or_create(Histogram, name, description, label_names, buckets=buckets)
+
+    def get(self, name: str) -> Optional[Metric]:
+        return self._metrics.get(name)
+
+    def render(self) -> str:
+        """Renders all the metrics in the Prometheus text exposition format (version 0.0.4)."""
+        lines = []
+        for metric in self._metrics.values():
+            metric_type = {Counter: 'counter', Gauge: 'gauge', Histogram: 'histogram'}[type(metric)]
+            lines.append(f'# HELP {metric.name} {metric.description}')
+            lines.append(f'# TYPE {metric.name} {metric_type}')
+
+            if isinstance(metric, Histogram):
+                for label_values, child in metric.children().items():
+                    cumulative = 0
+                    for upper_bound, count in zip((*metric.buckets, float('inf')), child.bucket_counts):
+                        cumulative += count
+                        le = f'le="{_format_value(upper_bound)}"'
+                        lines.append(f'{metric.name}_bucket{_format_labels(metric.label_names, label_values, le)} {cumulative}')
+                    labels = _format_labels(metric.label_names, label_values)
+                    lines.append(f'{metric.name}_sum{labels} {_format_value(child.sum)}')
+                    lines.append(f'{metric.name}_count{labels} {child.count}')
+            else:
+                for label_values, value in metric.values().items():
+                    lines.append(f'{metric.name}{_format_labels(metric.label_names, label_values)} {_format_value(value)}')
+
+        return '\n'.join(lines) + '\n'
+
+    def _get_or_create(self, metric_class, name: str, description: str, label_names: Tuple[str, ...], **kwargs) -> Metric:
+        metric = self._metrics.get(name)
+        if metric is None:
+            metric = self._metrics[name] = metric_class(name, description, label_names, **kwargs)
+        elif not isinstance(metric, metric_class) or metric.label_names != label_names:
+            raise ValueError(f"Metric '{name}' is already registered with another type or labels.")
+
+        return metric
+
+
+# Metrics of the process, exposed on the '/metrics' endpoint
+registry = MetricsRegistry()
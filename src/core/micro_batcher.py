@@ -0,0 +1,90 @@
+import asyncio
+from typing import Awaitable, Callable, Dict, Generic, Hashable, List, Mapping, Optional, Set, TypeVar
+
+K = TypeVar('K', bound=Hashable)
+V = TypeVar('V')
+
+
+class MicroBatcher(Generic[K, V]):
+    """
+    Collects the keys requested within a short window and loads them with one batch call.
+
+    A batch is sent when it reaches `max_batch_size` distinct keys or `max_delay` seconds
+    after its first key, whichever comes first. Callers requesting the same key in the same
+    batch share its result. If the batch call fails, all its callers get the exception.
+
+    Meant to be used from the event loop thread only, so it takes no locks.
+    """
+
+    def __init__(
+            self,
+            load_batch: Callable[[List[K]], Awaitable[Mapping[K, V]]],
+            missing_error: Callable[[K], Exception],
+            max_batch_size: int,
+            max_delay: float
+    ):
+        """
+        Args:
+            load_batch: Loads a batch of distinct keys, returns the found values keyed by key.
+            missing_error: Builds the exception raised to the callers of a key that was not found.
+            max_batch_size: Max number of distinct keys per batch.
+            max_delay: Max time in seconds the first key of a batch waits for more keys.
+        """
+        self._load_batch = load_batch
+        self._missing_error = missing_error
+        self._max_batch_size = max(1, max_batch_size)
+        self._max_delay = max_delay
+
+        self._pending: Dict[K, List[asyncio.Future]] = {}
+        self._timer: Optional[asyncio.TimerHandle] = None
+        # Keeps the running batches referenced until they complete
+        self._batches: Set[asyncio.Task] = set()
+
+    async def load(self, key: K) -> V:
+        """
+        Returns the value of the key, loaded with the next batch.
+
+        Raises:
+            Exception: The exception of the batch call, or the missing error of the key.
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.setdefault(key, []).append(future)
+
+        if len(self._pending) >= self._max_batch_size:
+            self.flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self._max_delay, self.flush)
+
+        return await future
+
+    def flush(self) -> None:
+        """Sends the pending keys right away."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        batch, self._pending = self._pending, {}
+        if batch:
+            task = asyncio.create_task(self._run_batch(batch))
+            self._batches.add(task)
+            task.add_done_callback(self._batches.discard)
+
+    async def _run_batch(self, batch: Dict[K, List[asyncio.Future]]) -> None:
+        try:
+            values = await self._load_batch(list(batch))
+        except Exception as e:
+            for futures in batch.values():
+                for future in futures:
+                    if not future.done():
+                        future.set_exception(e)
+            return
+
+        for key, futures in batch.items():
+            for future in futures:
+                if future.done():
+                    continue  # The caller was cancelled
+                if key in values:
+                    future.set_result(values[key])
+                else:
+                    future.set_exception(self._missing_error(key))
@@ -1,26 +1,54 @@
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.requests import Request
+import json
+from typing import Iterable, Optional
 
-from src.core.exceptions import AuthServiceError
+from starlette.types import ASGIApp, Receive, Scope, Send
 
-ALLOWED_IPS = ('localhost', '127.0.0.1')
-# ALLOWED_PORTS = (8000, 8001, 56182)
+from src.core.config import settings
+from src.core.ip_networks import IPNetworks
 
-class IPFilterMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request: Request, call_next):
-        client_ip = request.client.host
-        # client_port = request.client.port
 
-        if client_ip != "127.0.0.1":
-            raise AuthServiceError(
-                status_code=403,
-                detail="Access denied: your IP is not allowed."
-            )
+class IPFilterMiddleware:
+    """
+    Rejects the HTTP and WebSocket requests of clients outside the allowed networks with a 403.
 
-        # if client_ip not in ALLOWED_IPS or client_port not in ALLOWED_PORTS:
-        #     raise PaymentServiceError(
-        #         status_code=403,
-        #         detail="Access denied: your IP and port are not allowed."
-        #     )
+    Pure ASGI middleware: the request is passed on as is, without the extra task and body
+    streams of BaseHTTPMiddleware. The allowed networks are parsed once.
+    """
 
-        return await call_next(request)
+    _DENIED_BODY = json.dumps({
+        "success": False, "message": "Access denied: your IP is not allowed.", "error_origin": "Auth Service"
+    }).encode()
+
+    def __init__(self, app: ASGIApp, allowed_networks: Optional[Iterable[str]] = None) -> None:
+        """
+        Args:
+            app: The wrapped ASGI application.
+            allowed_networks: Allowed IP addresses and CIDR networks. Loaded from the settings by default.
+        """
+        self.app = app
+        if allowed_networks is None:
+            allowed_networks = settings.http_allowed_networks_list
+
+        self._allowed_networks = IPNetworks(allowed_networks)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope['type'] not in ('http', 'websocket') or self.is_allowed(scope.get('client')):
+            await self.app(scope, receive, send)
+            return
+
+        if scope['type'] == 'websocket':
+            await send({'type': 'websocket.close', 'code': 1008})
+            return
+
+        await send({
+            'type': 'http.response.start',
+            'status': 403,
+            'headers': [
+                (b'content-type', b'application/json'),
+                (b'content-length', str(len(self._DENIED_BODY)).encode()),
+            ],
+        })
+        await send({'type': 'http.response.body', 'body': self._DENIED_BODY})
+
+    def is_allowed(self, client: Optional[tuple]) -> bool:
+        return bool(client) and client[0] in self._allowed_networks
@@ -1,18 +1,71 @@
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.responses import JSONResponse
+import json
+from typing import Optional, Tuple
 
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from src.application.exceptions import AuthenticationError, TooManyLoginAttemptsError
 from src.core.exceptions import AuthServiceError
+from src.core.logger import LoggerService
+from src.infrastructure.exceptions import RabbitMQError, UserServiceError
+
+
+class ExceptionMiddleware:
+    """
+    Turns the errors raised while handling an HTTP request into JSON error responses,
+    with the same fields as the error replies sent over RabbitMQ:
+    {"success": false, "message": "...", "error_origin": "..."}.
+
+    Pure ASGI middleware, so successful requests only pay for one try block. Errors raised
+    after the response has started can't be turned into a response anymore and are re-raised.
+    """
+
+    def __init__(self, app: ASGIApp, logger: Optional[LoggerService] = None) -> None:
+        self.app = app
+        self._logger = logger
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
 
+        response_started = False
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal response_started
+            if message['type'] == 'http.response.start':
+                response_started = True
+            await send(message)
 
-class ExceptionMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request, call_next):
         try:
-            response = await call_next(request)
-
-            return response
-        except AuthServiceError as exc:
-            if exc.status_code == 403:
-                return JSONResponse(
-                    status_code=exc.status_code,
-                    content={"success": False, "message": exc.detail},
-                )
+            await self.app(scope, receive, send_wrapper)
+        except Exception as e:
+            if response_started:
+                raise
+
+            status_code, message, error_origin = self._map_error(e)
+            headers = [(b'content-type', b'application/json')]
+            if isinstance(e, TooManyLoginAttemptsError):
+                headers.append((b'retry-after', str(e.retry_after).encode()))
+
+            body = json.dumps({"success": False, "message": message, "error_origin": error_origin}).encode()
+            headers.append((b'content-length', str(len(body)).encode()))
+            await send({'type': 'http.response.start', 'status': status_code, 'headers': headers})
+            await send({'type': 'http.response.body', 'body': body})
+
+    def _map_error(self, error: Exception) -> Tuple[int, str, str]:
+        """
+        Returns:
+            The status code, message and origin of the error response.
+        """
+        if isinstance(error, RabbitMQError):
+            return error.status_code, error.detail, 'RabbitMQ'
+        if isinstance(error, UserServiceError):
+            return error.status_code, error.detail, 'User Service'
+        if isinstance(error, AuthServiceError):
+            return error.status_code, error.detail, 'Auth Service'
+        if isinstance(error, AuthenticationError):
+            return error.status_code, str(error), 'Auth Service'
+
+        if self._logger is not None:
+            self._logger.critical("Unhandled error occurred while processing an HTTP request. From: ExceptionMiddleware, __call__(): %s", error)
+        return 500, "Unhandled error occurred while processing the request in the Auth Service.", 'Auth Service'
@@ -0,0 +1,41 @@
+import asyncio
+from typing import Awaitable, Callable, Dict, Generic, Hashable, TypeVar
+
+V = TypeVar('V')
+
+
+class SingleFlight(Generic[V]):
+    """
+    Coalesces concurrent calls with the same key into one execution.
+
+    The first caller of a key starts the call, the callers arriving while it runs wait
+    for it and get the same result (or exception). The key is forgotten as soon as the
+    call completes, nothing is cached.
+
+    Meant to be used from the event loop thread only, so it takes no locks.
+    """
+
+    def __init__(self):
+        self.shared: int = 0
+        self._calls: Dict[Hashable, asyncio.Task] = {}
+
+    def __len__(self) -> int:
+        return len(self._calls)
+
+    async def do(self, key: Hashable, func: Callable[[], Awaitable[V]]) -> V:
+        """
+        Runs `func()`, unless a call with the same key is already running, and returns its result.
+
+        Args:
+            key: Key of the call.
+            func: Starts the call. Not called when the call is shared.
+        """
+        task = self._calls.get(key)
+        if task is None:
+            task = self._calls[key] = asyncio.ensure_future(func())
+            task.add_done_callback(lambda _: self._calls.pop(key, None))
+        else:
+            self.shared += 1
+
+        # A cancelled caller must not cancel the call the other callers are waiting for
+        return await asyncio.shield(task)
@@ -0,0 +1,327 @@
+import json
+import logging
+import os
+import queue
+import random
+import re
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import deque
+from contextvars import ContextVar
+from logging.handlers import QueueListener
+from typing import Any, Dict, List, Mapping, NamedTuple, Optional
+
+from src.core.logger import BoundedQueueHandler
+
+
+class SpanContext(NamedTuple):
+    """Identifiers of a span, as carried by the W3C 'traceparent' header."""
+    trace_id: str
+    span_id: str
+    sampled: bool
+
+
+TRACEPARENT_HEADER = 'traceparent'
+_TRACEPARENT_PATTERN = re.compile(r'^([0-9a-f]{2})-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})(-.*)?$')
+
+
+def parse_traceparent(value: Any) -> Optional[SpanContext]:
+    """
+    Parses a W3C 'traceparent' header value ('00-<trace id>-<parent id>-<flags>').
+
+    Returns:
+        The span context, or None when the value is missing or malformed.
+    """
+    if isinstance(value, bytes):
+        value = value.decode('ascii', errors='replace')
+    if not isinstance(value, str):
+        return None
+
+    match = _TRACEPARENT_PATTERN.match(value.strip().lower())
+    if match is None:
+        return None
+
+    version, trace_id, span_id, flags, rest = match.groups()
+    # Version 'ff' is invalid, version 00 has no trailing fields, all-zero ids are invalid
+    if version == 'ff' or (version == '00' and rest) or trace_id == '0' * 32 or span_id == '0' * 16:
+        return None
+
+    return SpanContext(trace_id, span_id, bool(int(flags, 16) & 1))
+
+
+def format_traceparent(context: SpanContext) -> str:
+    return f"00-{context.trace_id}-{context.span_id}-{'01' if context.sampled else '00'}"
+
+
+class Span:
+    """
+    One timed unit of work. Used as a context manager, the span is the current span
+    (the parent of the spans started inside it) until it ends.
+    """
+    __slots__ = ('name', 'context', 'parent_id', 'attributes', 'status', 'start_time', 'duration',
+                 '_started_at', '_tracer', '_token')
+
+    def __init__(self, tracer: 'Tracer', name: str, context: SpanContext, parent_id: Optional[str],
+                 attributes: Dict[str, Any]) -> None:
+        self.name = name
+        self.context = context
+        self.parent_id = parent_id
+        self.attributes = attributes
+        self.status: str = 'ok'
+        self.start_time: float = 0
+        self.duration: float = 0
+        self._started_at: float = 0
+        self._tracer = tracer
+        self._token = None
+
+    @property
+    def traceparent(self) -> str:
+        return format_traceparent(self.context)
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def __enter__(self) -> 'Span':
+        self.start_time = time.time()
+        self._started_at = time.perf_counter()
+        self._token = _current_span.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc, _traceback) -> None:
+        self.duration = time.perf_counter() - self._started_at
+        _current_span.reset(self._token)
+        if exc_type is not None:
+            self.status = 'error'
+            self.attributes.setdefault('error', exc_type.__name__)
+        if self.context.sampled:
+            self._tracer.export(self)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "trace_id": self.context.trace_id,
+            "span_id": self.context.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "start_time": self.start_time,
+            "duration_ms": round(self.duration * 1000, 3),
+            "status": self.status,
+            "attributes": self.attributes,
+        }
+
+
+class _NoopSpan:
+    """Span returned while tracing is disabled, records nothing."""
+    __slots__ = ()
+    context = None
+    traceparent = None
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        pass
+
+    def __enter__(self) -> '_NoopSpan':
+        return self
+
+    def __exit__(self, exc_type, exc, _traceback) -> None:
+        pass
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+class _RemoteParentSpan(_NoopSpan):
+    """
+    Span returned while tracing is disabled for work continuing a remote trace. It records
+    nothing, but makes the remote context current so inject() forwards it downstream.
+    """
+    __slots__ = ('context', '_token')
+
+    def __init__(self, context: SpanContext) -> None:
+        self.context = context
+        self._token = None
+
+    @property
+    def traceparent(self) -> str:
+        return format_traceparent(self.context)
+
+    def __enter__(self) -> '_RemoteParentSpan':
+        self._token = _current_span.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc, _traceback) -> None:
+        _current_span.reset(self._token)
+
+
+_current_span: ContextVar[Optional[Span | _RemoteParentSpan]] = ContextVar('current_span', default=None)
+
+
+class SpanExporter(ABC):
+    """Receives the ended sampled spans. Called on the event loop, so it must not block."""
+
+    @abstractmethod
+    def export(self, span: Span) -> None:
+        pass
+
+    def shutdown(self) -> None:
+        pass
+
+
+class InMemorySpanExporter(SpanExporter):
+    """Keeps the last `max_spans` spans in memory, e.g. for benchmarks and local analysis."""
+
+    def __init__(self, max_spans: int = 10000) -> None:
+        self._spans: deque = deque(maxlen=max_spans)
+
+    def export(self, span: Span) -> None:
+        self._spans.append(span)
+
+    def spans(self) -> List[Span]:
+        return list(self._spans)
+
+    def clear(self) -> None:
+        self._spans.clear()
+
+
+class _SpanFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        return json.dumps(record.span.to_dict(), default=str, ensure_ascii=False)
+
+
+class FileSpanExporter(SpanExporter):
+    """
+    Appends the spans to a file as JSON lines.
+
+    Like the logs, the spans are serialized and written by a background thread through
+    a bounded queue. Spans arriving while the queue is full are dropped and counted.
+    """
+
+    def __init__(self, path: str, queue_size: int = 10000) -> None:
+        """
+        Args:
+            path (str): Path of the spans file.
+            queue_size (int): Max number of spans waiting to be written.
+        """
+        directory = os.path.dirname(path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+
+        file_handler = logging.FileHandler(path)
+        file_handler.setFormatter(_SpanFormatter())
+        self._handler = BoundedQueueHandler(queue.Queue(maxsize=queue_size), overflow_policy='drop')
+        self._listener: Optional[QueueListener] = QueueListener(self._handler.queue, file_handler)
+        self._listener.start()
+        self._lock = threading.Lock()
+
+    @property
+    def dropped(self) -> int:
+        return self._handler.dropped
+
+    def export(self, span: Span) -> None:
+        record = logging.LogRecord('tracing', logging.INFO, __file__, 0, span.name, None, None)
+        record.span = span
+        self._handler.handle(record)
+
+    def shutdown(self) -> None:
+        with self._lock:
+            listener, self._listener = self._listener, None
+        if listener is not None:
+            listener.stop()
+            for handler in listener.handlers:
+                handler.close()
+
+
+class Tracer:
+    """
+    Records spans of the work done for a request and propagates the trace context
+    through the W3C 'traceparent' header.
+
+    The current span is kept in a context variable, so it follows the request through
+    the awaits and into the tasks created while handling it. Traces are sampled when they
+    start (in this service or upstream), spans of unsampled traces still propagate the
+    context but are not exported. Without an exporter, tracing is disabled and costs
+    one attribute check per span; an incoming context is still forwarded unchanged.
+    """
+
+    def __init__(self, exporter: Optional[SpanExporter] = None, sample_rate: float = 1.0) -> None:
+        self._exporter = exporter
+        self.sample_rate = sample_rate
+
+    @property
+    def enabled(self) -> bool:
+        return self._exporter is not None
+
+    def configure(self, exporter: Optional[SpanExporter], sample_rate: float = 1.0) -> None:
+        """Replaces the exporter (None disables tracing) and the sample rate of the new traces."""
+        previous, self._exporter = self._exporter, exporter
+        self.sample_rate = sample_rate
+        if previous is not None and previous is not exporter:
+            previous.shutdown()
+
+    def shutdown(self) -> None:
+        self.configure(None, self.sample_rate)
+
+    def start_span(self, name: str, parent: Optional[SpanContext] = None, **attributes: Any) -> Span | _NoopSpan:
+        """
+        Creates a span, to be used as a context manager.
+
+        Args:
+            name: Name of the span, e.g. 'jwt.sign'.
+            parent: Remote parent (see extract()). By default the current span is the parent,
+                and without a current span a new trace is started.
+            attributes: Attributes of the span.
+        """
+        if self._exporter is None:
+            return NOOP_SPAN if parent is None else _RemoteParentSpan(parent)
+
+        if parent is None:
+            current = _current_span.get()
+            parent = current.context if current is not None else None
+
+        if parent is None:
+            context = SpanContext(
+                trace_id=f'{random.getrandbits(128):032x}',
+                span_id=self._new_span_id(),
+                sampled=random.random() < self.sample_rate
+            )
+            return Span(self, name, context, None, attributes)
+
+        context = SpanContext(parent.trace_id, self._new_span_id(), parent.sampled)
+        return Span(self, name, context, parent.span_id, attributes)
+
+    def export(self, span: Span) -> None:
+        exporter = self._exporter
+        if exporter is not None:
+            exporter.export(span)
+
+    @staticmethod
+    def current_span() -> Optional[Span | _RemoteParentSpan]:
+        return _current_span.get()
+
+    @staticmethod
+    def extract(headers: Optional[Mapping[str, Any]]) -> Optional[SpanContext]:
+        """Returns the span context carried by the message headers, if any."""
+        if not headers:
+            return None
+
+        return parse_traceparent(headers.get(TRACEPARENT_HEADER))
+
+    def inject(self, headers: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Adds the 'traceparent' of the current span to the message headers. While tracing
+        is disabled, this is the context received with the message being handled.
+        """
+        current = _current_span.get()
+        if current is not None:
+            headers[TRACEPARENT_HEADER] = current.traceparent
+
+        return headers
+
+    @staticmethod
+    def _new_span_id() -> str:
+        span_id = random.getrandbits(64)
+        # All-zero ids are invalid
+        return f'{span_id or 1:016x}'
+
+
+# Tracer of the process, configured at startup
+tracer = Tracer()
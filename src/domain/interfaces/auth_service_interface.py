@@ -3,5 +3,9 @@ from abc import ABC, abstractmethod
 
 class IAuthService(ABC):
     @abstractmethod
-    def verify_password(self, plain_password: str, password_hash: str) -> bool:
+    async def verify_password(self, plain_password: str, password_hash: str) -> bool:
+        pass
+
+    @abstractmethod
+    def needs_password_rehash(self, password_hash: str) -> bool:
         pass
@@ -1,5 +1,6 @@
 import uuid
 from abc import abstractmethod, ABC
+from typing import Optional
 
 from src.core.config import settings
 from src.domain.schemas import RolesEnum
@@ -12,5 +13,35 @@ class IJWTService(ABC):
         pass
 
     @abstractmethod
-    def generate_refresh_token(self, user_id: uuid, roles: list[RolesEnum], expire_time_in_days: int = settings.refresh_token_expire_time) -> str:
+    def generate_refresh_token(self, user_id: uuid, roles: list[RolesEnum], expire_time_in_days: int = settings.refresh_token_expire_time,
+                               jti: Optional[str] = None, family_id: Optional[str] = None) -> str:
+        """
+        Generates a refresh token with the given token id ('jti') and token family id ('fid').
+        A new id is generated when none is given, and the token starts its own family.
+        """
+        pass
+
+    @abstractmethod
+    def verify(self, token: str, token_type: str) -> dict:
+        """
+        Verifies the token signature, expiry and type.
+
+        Args:
+            token: Encoded JWT.
+            token_type: Expected 'token_type' claim ('access' or 'refresh').
+
+        Returns:
+            The token claims.
+
+        Raises:
+            InvalidTokenError: When the token is malformed, has an invalid signature, has expired or has another type.
+        """
+        pass
+
+    @abstractmethod
+    def get_jwks(self) -> dict:
+        """
+        Returns the JSON Web Key Set with the public keys that verify the issued tokens.
+        Empty for symmetric algorithms, whose secret must not be published.
+        """
         pass
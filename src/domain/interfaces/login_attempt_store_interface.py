@@ -0,0 +1,32 @@
+from abc import ABC, abstractmethod
+
+
+class ILoginAttemptStore(ABC):
+    """
+    Interface for the storage of failed login attempts, keyed by user identifier or client IP.
+
+    A key is locked out when it reaches the max number of failures within the sliding window.
+    Every further failure before the key has been quiet for a whole window locks it out again,
+    each time twice as long. Implementations own this policy, so a shared backend can apply it
+    for all the replicas.
+    """
+
+    @abstractmethod
+    async def locked_for(self, key: str) -> float:
+        """Returns the remaining lockout time of the key in seconds, 0 if it is not locked out."""
+        pass
+
+    @abstractmethod
+    async def record_failure(self, key: str) -> float:
+        """
+        Records a failed attempt.
+
+        Returns:
+            The lockout time in seconds started by this failure, 0 if the key is not locked out.
+        """
+        pass
+
+    @abstractmethod
+    async def reset(self, key: str) -> None:
+        """Forgets the failed attempts of the key, e.g. after a successful login."""
+        pass
@@ -0,0 +1,20 @@
+from abc import ABC, abstractmethod
+from typing import Any
+
+
+class IMessageCodec(ABC):
+    """
+    Interface for message body serialization.
+    Every implementation is identified by the content type it produces and accepts.
+    """
+    content_type: str
+
+    @abstractmethod
+    def encode(self, data: Any) -> bytes:
+        """Serializes the data into a message body."""
+        pass
+
+    @abstractmethod
+    def decode(self, body: bytes) -> Any:
+        """Deserializes the message body."""
+        pass
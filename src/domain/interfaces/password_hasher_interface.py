@@ -13,3 +13,37 @@ class IPasswordHasher(ABC):
     def hash(self, password: str) -> str:
         """Creates a hash from the hashed_password."""
         pass
+
+    @abstractmethod
+    def needs_rehash(self, password_hash: str) -> bool:
+        """Checks if the hash was created with other parameters (e.g. cost) than the new hashes."""
+        pass
+
+
+class IAsyncPasswordHasher(ABC):
+    """Interface for non-blocking hashed_password hashing operations."""
+
+    @abstractmethod
+    async def start(self) -> None:
+        """Starts the workers that run the hashing operations."""
+        pass
+
+    @abstractmethod
+    async def shutdown(self) -> None:
+        """Stops the workers, waiting for the running operations to finish."""
+        pass
+
+    @abstractmethod
+    async def verify(self, plain_password: str, password_hash: str) -> bool:
+        """Verifies if the plain hashed_password matches the hash without blocking the event loop."""
+        pass
+
+    @abstractmethod
+    async def hash(self, password: str) -> str:
+        """Creates a hash from the hashed_password without blocking the event loop."""
+        pass
+
+    @abstractmethod
+    def needs_rehash(self, password_hash: str) -> bool:
+        """Checks if the hash was created with other parameters (e.g. cost) than the new hashes. Cheap, runs inline."""
+        pass
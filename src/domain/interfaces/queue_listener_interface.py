@@ -1,5 +1,5 @@
 from abc import ABC, abstractmethod
-from typing import Any
+from typing import Any, Optional
 
 
 class IQueueListener(ABC):
@@ -16,5 +16,10 @@ class IQueueListener(ABC):
         pass
 
     @abstractmethod
-    async def send_response(self, routing_key: str, response: Any, correlation_id: str) -> None:
+    async def stop_listening(self, timeout: float) -> None:
+        pass
+
+    @abstractmethod
+    async def send_response(self, routing_key: str, response: Any, correlation_id: str,
+                            content_type: Optional[str] = None) -> None:
         pass
@@ -0,0 +1,51 @@
+from abc import ABC, abstractmethod
+from typing import Optional
+
+from src.domain.models.refresh_tokens import RefreshTokenRecord
+
+
+class ITokenStore(ABC):
+    """
+    Interface for the storage of issued refresh tokens.
+    Tokens are looked up by their 'jti' and indexed by user and token family.
+    """
+
+    @abstractmethod
+    async def add(self, record: RefreshTokenRecord) -> None:
+        """Stores a newly issued refresh token."""
+        pass
+
+    @abstractmethod
+    async def get(self, jti: str) -> Optional[RefreshTokenRecord]:
+        """Returns the refresh token with the given id, None if it is unknown or was pruned."""
+        pass
+
+    @abstractmethod
+    async def rotate(self, jti: str, new_record: RefreshTokenRecord) -> bool:
+        """
+        Atomically replaces an active refresh token with a new one.
+
+        Returns:
+            False if the token is unknown, revoked or was already replaced (i.e. it is being reused).
+        """
+        pass
+
+    @abstractmethod
+    async def revoke_family(self, family_id: str) -> int:
+        """Revokes all refresh tokens of a token family (one login session). Returns the number of revoked tokens."""
+        pass
+
+    @abstractmethod
+    async def revoke_all_for_user(self, user_id: str) -> int:
+        """Revokes all refresh tokens of the user (all sessions). Returns the number of revoked tokens."""
+        pass
+
+    @abstractmethod
+    async def prune_expired(self, now: float) -> int:
+        """Removes the tokens expired before `now` (epoch seconds). Returns the number of removed tokens."""
+        pass
+
+    @abstractmethod
+    async def close(self) -> None:
+        """Releases the resources of the store."""
+        pass
@@ -1,5 +1,6 @@
 from abc import ABC, abstractmethod
 from typing import Dict, Any
+from uuid import UUID
 
 from src.domain.models.user_requests import AddUserRequestDTO
 from src.domain.models.user_responses import UserAuthResponseDTO, UserResponseDTO
@@ -95,6 +96,18 @@ class IUserAdapter(ABC):
         """
         pass
 
+    @abstractmethod
+    async def update_password_hash(self, user_id: UUID | str, hashed_password: str) -> None:
+        """
+        Replaces the hashed_password hash of a user in the DB through User Service,
+        e.g. after rehashing the password with a different cost.
+
+        Args:
+            user_id: The ID of the user.
+            hashed_password: New hashed_password hash.
+        """
+        pass
+
     def _handle_error_response(self, response: RabbitMQResponse):
         """
         Handles the error responses from the User Service.
@@ -1,6 +1,5 @@
 from dataclasses import dataclass
 from typing import Optional
-from uuid import UUID
 
 from src.domain.interfaces.auth_dto_interfaces import IAuthRequestDTO
 from src.domain.schemas import RolesEnum
@@ -15,6 +14,12 @@ class LoginRequestDTO(IAuthRequestDTO):
     email: Optional[str] = None
     phone_number: Optional[str] = None
     password: str = ""
+    client_ip: Optional[str] = None  # IP of the end client, as seen by the API Gateway
+
+    @property
+    def identifier(self) -> Optional[str]:
+        """The email, or the phone number if no email is provided."""
+        return self.email or self.phone_number
 
     def is_valid(self) -> bool:
         """
@@ -27,7 +32,8 @@ class LoginRequestDTO(IAuthRequestDTO):
         return {
             "email": self.email,
             "phone_number": self.phone_number,
-            "hashed_password": self.password
+            "hashed_password": self.password,
+            "client_ip": self.client_ip
         }
 
 
@@ -68,12 +74,77 @@ class RefreshTokenRequestDTO(IAuthRequestDTO):
     Domain schema for Refresh Token Request.
     Represents the data needed to refresh user's authentication tokens in the domain logic.
     """
-    user_id: UUID
-    roles: list[RolesEnum]
+    refresh_token: Optional[str] = None
+
+    def is_valid(self) -> bool:
+        """
+        Checks if the refresh token is provided.
+        """
+        return isinstance(self.refresh_token, str) and bool(self.refresh_token)
+
+    def to_dict(self) -> dict:
+        """Convert the domain object to a dictionary."""
+        return {
+            "refresh_token": self.refresh_token
+        }
+
+
+@dataclass(frozen=True)
+class LogoutRequestDTO(IAuthRequestDTO):
+    """
+    Domain schema for Logout Request.
+    Represents the session to revoke in the domain logic: the one of the refresh token,
+    or all the sessions of its user.
+    """
+    refresh_token: Optional[str] = None
+    all_sessions: bool = False
+
+    def is_valid(self) -> bool:
+        """
+        Checks if the refresh token is provided.
+        """
+        return isinstance(self.refresh_token, str) and bool(self.refresh_token)
+
+    def to_dict(self) -> dict:
+        """Convert the domain object to a dictionary."""
+        return {
+            "refresh_token": self.refresh_token,
+            "all_sessions": self.all_sessions
+        }
+
+
+@dataclass(frozen=True)
+class VerifyTokensRequestDTO(IAuthRequestDTO):
+    """
+    Domain schema for Verify Tokens Request.
+    Represents a batch of tokens to be verified in the domain logic.
+    """
+    tokens: tuple[str, ...] = ()
+    token_type: str = 'access'
+
+    @classmethod
+    def from_payload(cls, payload: dict) -> "VerifyTokensRequestDTO":
+        """
+        Creates the request from a payload with either a single 'token' or a list of 'tokens'.
+        """
+        tokens = payload.get('tokens')
+        if tokens is None and payload.get('token') is not None:
+            tokens = [payload.get('token')]
+
+        return cls(
+            tokens=tuple(tokens) if isinstance(tokens, (list, tuple)) else (),
+            token_type=payload.get('token_type') or 'access'
+        )
+
+    def is_valid(self) -> bool:
+        """
+        Checks if at least one token is provided.
+        """
+        return bool(self.tokens)
 
     def to_dict(self) -> dict:
         """Convert the domain object to a dictionary."""
         return {
-            "user_id": self.user_id,
-            "roles": [role for role in list(self.roles)]
+            "tokens": list(self.tokens),
+            "token_type": self.token_type
         }
@@ -32,3 +32,51 @@ class RegisterResponseDTO(IAuthResponseDTO):
         )
 
         return base_dict
+
+
+@dataclass(frozen=True)
+class LogoutResponseDTO(IAuthResponseDTO):
+    """
+    Domain schema for Logout Response.
+    Represents the number of refresh tokens revoked by the logout.
+    """
+    revoked: int
+
+    def to_dict(self) -> dict:
+        """Convert the domain object to a dictionary."""
+        return {
+            "revoked": self.revoked
+        }
+
+
+@dataclass(frozen=True)
+class TokenVerificationResultDTO:
+    """
+    Domain schema for the verification result of a single token.
+    Contains the token claims when the token is valid and the error otherwise.
+    """
+    valid: bool
+    claims: Optional[dict] = None
+    error: Optional[str] = None
+
+    def to_dict(self) -> dict:
+        """Convert the domain object to a dictionary."""
+        if self.valid:
+            return {"valid": True, "claims": self.claims}
+
+        return {"valid": False, "error": self.error}
+
+
+@dataclass(frozen=True)
+class VerifyTokensResponseDTO(IAuthResponseDTO):
+    """
+    Domain schema for Verify Tokens Response.
+    Holds the results in the order of the requested tokens.
+    """
+    results: list[TokenVerificationResultDTO]
+
+    def to_dict(self) -> dict:
+        """Convert the domain object to a dictionary."""
+        return {
+            "results": [result.to_dict() for result in self.results]
+        }
@@ -0,0 +1,24 @@
+from dataclasses import dataclass
+from typing import Optional
+
+
+@dataclass(slots=True)
+class RefreshTokenRecord:
+    """
+    Domain schema for an issued refresh token.
+
+    Every login starts a token family. Each refresh replaces the presented token with a
+    new one of the same family, so a replaced token that shows up again reveals that it
+    was stolen and the whole family gets revoked.
+    """
+    jti: str
+    user_id: str
+    family_id: str
+    expires_at: float
+
+    revoked: bool = False
+    replaced_by: Optional[str] = None
+
+    def is_active(self) -> bool:
+        """Checks if the token can still be exchanged for new tokens."""
+        return not self.revoked and self.replaced_by is None
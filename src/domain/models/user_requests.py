@@ -1,4 +1,4 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 import datetime
 
 from src.domain.schemas import RolesEnum
@@ -20,11 +20,14 @@ class AddUserRequestDTO:
 
     is_active: bool = True
 
-    created_at: datetime = datetime.datetime.now(datetime.UTC)
-    updated_at: datetime = datetime.datetime.now(datetime.UTC)
+    created_at: datetime = field(default_factory=lambda: datetime.datetime.now(datetime.UTC))
+    updated_at: datetime = field(default_factory=lambda: datetime.datetime.now(datetime.UTC))
 
     def to_dict(self) -> dict:
-        """Convert the domain object to a dictionary."""
+        """
+        Convert the domain object to a dictionary.
+        UUID and datetime values are left as is, the message codec serializes them.
+        """
         return {
             "email": self.email,
             "phone_number": self.phone_number,
@@ -33,6 +36,6 @@ class AddUserRequestDTO:
             "last_name": self.last_name,
             "is_active": self.is_active,
             "roles": [role for role in self.roles],
-            "created_at": self.created_at.isoformat(),
-            "updated_at": self.updated_at.isoformat(),
+            "created_at": self.created_at,
+            "updated_at": self.updated_at,
         }
@@ -27,7 +27,10 @@ class UserResponseDTO(IUserResponseDTO):
     updated_at: datetime
 
     def to_dict(self) -> dict:
-        """Convert the domain object to a dictionary."""
+        """
+        Convert the domain object to a dictionary.
+        UUID and datetime values are left as is, the message codec serializes them.
+        """
         return {
             "id": self.id,
             "email": self.email,
@@ -35,9 +38,9 @@ class UserResponseDTO(IUserResponseDTO):
             "first_name": self.first_name,
             "last_name": self.last_name,
             "is_active": self.is_active,
-            "roles": [role.value for role in self.roles],
-            "created_at": self.created_at.isoformat(),
-            "updated_at": self.updated_at.isoformat(),
+            "roles": [RolesEnum(role).value for role in self.roles],  # The User Service sends plain strings
+            "created_at": self.created_at,
+            "updated_at": self.updated_at,
         }
 
     @classmethod
@@ -77,7 +80,10 @@ class UserAuthResponseDTO(IUserResponseDTO):
     updated_at: datetime
 
     def to_dict(self) -> dict:
-        """Convert the domain object to a dictionary."""
+        """
+        Convert the domain object to a dictionary.
+        UUID and datetime values are left as is, the message codec serializes them.
+        """
         return {
             "id": self.id,
             "email": self.email,
@@ -86,7 +92,7 @@ class UserAuthResponseDTO(IUserResponseDTO):
             "first_name": self.first_name,
             "last_name": self.last_name,
             "is_active": self.is_active,
-            "roles": [role.value for role in self.roles],
-            "created_at": self.created_at.isoformat(),
-            "updated_at": self.updated_at.isoformat(),
+            "roles": [RolesEnum(role).value for role in self.roles],  # The User Service sends plain strings
+            "created_at": self.created_at,
+            "updated_at": self.updated_at,
         }
@@ -0,0 +1,135 @@
+import uuid
+from typing import Any, Awaitable, Callable, Hashable, Optional
+
+from src.core.cache import TTLCache
+from src.core.config import settings
+from src.core.single_flight import SingleFlight
+from src.domain.interfaces.user_adapter_interface import IUserAdapter
+from src.domain.models.user_requests import AddUserRequestDTO
+from src.domain.models.user_responses import UserResponseDTO, UserAuthResponseDTO
+
+
+class CachingUserAdapter(IUserAdapter):
+    """
+    Read-through cache in front of another user adapter.
+
+    Users are cached for a short time under every identifier they were looked up with
+    (id, email, phone number). All the entries of a user are indexed by the user id,
+    so invalidating the user by any of its identifiers drops all of them.
+
+    Concurrent lookups of the same missing key share one User Service call.
+    """
+
+    def __init__(
+            self,
+            user_adapter: IUserAdapter,
+            max_size: int = settings.user_cache_size,
+            ttl: float = settings.user_cache_ttl
+    ):
+        """
+        Args:
+            user_adapter: Adapter that fetches the users from the User Service.
+            max_size: Max number of cached lookups.
+            ttl: Time to live of a cached user in seconds.
+        """
+        self._user_adapter = user_adapter
+        self._users: TTLCache[UserResponseDTO | UserAuthResponseDTO] = TTLCache(max_size=max_size, ttl=ttl)
+        # User ID -> cache keys of the user, refreshed together with the entries so it stays bounded
+        self._keys_by_user_id: TTLCache[set] = TTLCache(max_size=max_size, ttl=ttl)
+        self._in_flight: SingleFlight = SingleFlight()
+        # Bumped on every invalidation, so lookups that started before it do not cache stale users
+        self._generation: int = 0
+
+    @property
+    def cache(self) -> TTLCache:
+        """The cache of users, e.g. to report its hit ratio."""
+        return self._users
+
+    async def connect(self):
+        await self._user_adapter.connect()
+
+    async def get_by_id(self, given_id: uuid.UUID, include_password_hash: bool) -> UserResponseDTO | UserAuthResponseDTO:
+        return await self._get(
+            ('id', str(given_id), include_password_hash),
+            lambda: self._user_adapter.get_by_id(given_id, include_password_hash)
+        )
+
+    async def get_by_phone_number(self, phone_number: str, include_password_hash: bool) -> UserResponseDTO | UserAuthResponseDTO:
+        return await self._get(
+            ('phone_number', phone_number, include_password_hash),
+            lambda: self._user_adapter.get_by_phone_number(phone_number, include_password_hash)
+        )
+
+    async def get_by_email(self, email: str, include_password_hash: bool) -> UserResponseDTO | UserAuthResponseDTO:
+        return await self._get(
+            ('email', email, include_password_hash),
+            lambda: self._user_adapter.get_by_email(email, include_password_hash)
+        )
+
+    async def add(self, user_data: AddUserRequestDTO) -> UserResponseDTO:
+        return await self._user_adapter.add(user_data)
+
+    async def update_password_hash(self, user_id: uuid.UUID | str, hashed_password: str) -> None:
+        await self._user_adapter.update_password_hash(user_id, hashed_password)
+        self.invalidate(user_id=user_id)
+
+    def invalidate(
+            self,
+            user_id: Optional[uuid.UUID | str] = None,
+            email: Optional[str] = None,
+            phone_number: Optional[str] = None
+    ) -> None:
+        """
+        Drops the cached entries of a user, under all of its identifiers.
+
+        Args:
+            user_id: ID of the user.
+            email: Email of the user, e.g. the previous one when it has changed.
+            phone_number: Phone number of the user, e.g. the previous one when it has changed.
+        """
+        self._generation += 1
+
+        user_ids = set()
+        if user_id is not None:
+            user_ids.add(str(user_id))
+        for kind, value in (('email', email), ('phone_number', phone_number)):
+            if value is None:
+                continue
+            for include_password_hash in (True, False):
+                user = self._users.pop((kind, value, include_password_hash))
+                if user is not None:
+                    user_ids.add(str(user.id))
+
+        for cached_user_id in user_ids:
+            for key in self._keys_by_user_id.pop(cached_user_id, ()):
+                self._users.pop(key)
+
+    def clear(self) -> None:
+        """Drops all the cached users, e.g. when invalidation events may have been missed."""
+        self._generation += 1
+        self._users.clear()
+        self._keys_by_user_id.clear()
+
+    async def _get(self, key: Hashable, fetch: Callable[[], Awaitable[Any]]) -> Any:
+        user = self._users.get(key)
+        if user is not None:
+            return user
+
+        return await self._in_flight.do(key, lambda: self._fetch(key, fetch))
+
+    async def _fetch(self, key: Hashable, fetch: Callable[[], Awaitable[Any]]) -> Any:
+        generation = self._generation
+        user = await fetch()
+
+        if generation == self._generation:
+            self._store(key, user)
+
+        return user
+
+    def _store(self, key: Hashable, user: UserResponseDTO | UserAuthResponseDTO) -> None:
+        user_id = str(user.id)
+        user_keys = self._keys_by_user_id.get(user_id) or set()
+        user_keys.add(key)
+
+        self._users.set(key, user)
+        self._keys_by_user_id.set(user_id, user_keys)
@@ -0,0 +1,94 @@
+import time
+from array import array
+from collections import OrderedDict
+
+from src.domain.interfaces.login_attempt_store_interface import ILoginAttemptStore
+
+
+class _Attempts:
+    """Failed attempts of one key: a ring buffer of the last `max_failures` failure times."""
+    __slots__ = ('failures', 'next', 'last_failure', 'locked_until', 'lockouts')
+
+    def __init__(self, max_failures: int) -> None:
+        self.failures = array('d', bytes(8 * max_failures))
+        self.next: int = 0
+        self.last_failure: float = 0
+        self.locked_until: float = 0
+        self.lockouts: int = 0
+
+
+class InMemoryLoginAttemptStore(ILoginAttemptStore):
+    """
+    Process-local store of failed login attempts.
+
+    Every key keeps the times of its last `max_failures` failures in a fixed-size ring buffer,
+    so the sliding window check is O(1) and a key costs the same memory however hard it is
+    attacked. Keys are evicted least recently failed first beyond `max_keys`, so a flood
+    of random identifiers can't exhaust the memory.
+
+    Each process has its own store, so the limits apply per process.
+    """
+
+    def __init__(
+            self,
+            max_failures: int,
+            window: float,
+            lockout: float,
+            max_lockout: float,
+            max_keys: int
+    ):
+        """
+        Args:
+            max_failures: Failures within the window that lock the key out.
+            window: Sliding window in seconds.
+            lockout: Duration of the first lockout in seconds, doubled by every further one.
+            max_lockout: Max duration of a lockout in seconds.
+            max_keys: Max number of tracked keys.
+        """
+        self._max_failures = max(1, max_failures)
+        self._window = window
+        self._lockout = lockout
+        self._max_lockout = max_lockout
+        self._max_keys = max(1, max_keys)
+        self._attempts: OrderedDict[str, _Attempts] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._attempts)
+
+    async def locked_for(self, key: str) -> float:
+        attempts = self._attempts.get(key)
+        if attempts is None:
+            return 0
+
+        return max(0.0, attempts.locked_until - time.monotonic())
+
+    async def record_failure(self, key: str) -> float:
+        now = time.monotonic()
+        attempts = self._attempts.get(key)
+        if attempts is None:
+            attempts = self._attempts[key] = _Attempts(self._max_failures)
+            while len(self._attempts) > self._max_keys:
+                self._attempts.popitem(last=False)
+        else:
+            self._attempts.move_to_end(key)
+
+        # The backoff is forgotten once the key has been quiet for a whole window
+        if attempts.lockouts and now - attempts.last_failure >= self._window:
+            attempts.lockouts = 0
+        attempts.last_failure = now
+
+        attempts.failures[attempts.next] = now
+        attempts.next = (attempts.next + 1) % self._max_failures
+        # The next slot to overwrite holds the oldest of the last `max_failures` failures (0 if fewer)
+        oldest = attempts.failures[attempts.next]
+
+        if not attempts.lockouts and (not oldest or now - oldest >= self._window):
+            return 0
+
+        lockout = min(self._lockout * 2 ** min(attempts.lockouts, 32), self._max_lockout)
+        attempts.lockouts += 1
+        attempts.locked_until = now + lockout
+        return lockout
+
+    async def reset(self, key: str) -> None:
+        self._attempts.pop(key, None)
@@ -0,0 +1,88 @@
+import heapq
+from typing import Dict, Optional, Set
+
+from src.domain.interfaces.token_store_interface import ITokenStore
+from src.domain.models.refresh_tokens import RefreshTokenRecord
+
+
+class InMemoryTokenStore(ITokenStore):
+    """
+    Process-local refresh token store.
+
+    Tokens are indexed by 'jti' (O(1) lookup), by user and by family. An expiry heap
+    lets the sweeper prune expired tokens without scanning all of them.
+
+    Each process has its own store, so use a shared backend (e.g. SQLiteTokenStore)
+    when running several workers.
+    """
+
+    def __init__(self):
+        self._records: Dict[str, RefreshTokenRecord] = {}
+        self._user_index: Dict[str, Set[str]] = {}
+        self._family_index: Dict[str, Set[str]] = {}
+        self._expiry_heap: list[tuple[float, str]] = []
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    async def add(self, record: RefreshTokenRecord) -> None:
+        self._add(record)
+
+    def _add(self, record: RefreshTokenRecord) -> None:
+        self._records[record.jti] = record
+        self._user_index.setdefault(record.user_id, set()).add(record.jti)
+        self._family_index.setdefault(record.family_id, set()).add(record.jti)
+        heapq.heappush(self._expiry_heap, (record.expires_at, record.jti))
+
+    async def get(self, jti: str) -> Optional[RefreshTokenRecord]:
+        return self._records.get(jti)
+
+    async def rotate(self, jti: str, new_record: RefreshTokenRecord) -> bool:
+        record = self._records.get(jti)
+        if record is None or not record.is_active():
+            return False
+
+        record.replaced_by = new_record.jti
+        self._add(new_record)
+        return True
+
+    async def revoke_family(self, family_id: str) -> int:
+        return self._revoke(self._family_index.get(family_id, ()))
+
+    async def revoke_all_for_user(self, user_id: str) -> int:
+        return self._revoke(self._user_index.get(user_id, ()))
+
+    def _revoke(self, jtis) -> int:
+        revoked = 0
+        for jti in jtis:
+            record = self._records[jti]
+            if not record.revoked:
+                record.revoked = True
+                revoked += 1
+
+        return revoked
+
+    async def prune_expired(self, now: float) -> int:
+        pruned = 0
+        while self._expiry_heap and self._expiry_heap[0][0] <= now:
+            _, jti = heapq.heappop(self._expiry_heap)
+            record = self._records.pop(jti, None)
+            if record is None:
+                continue
+
+            self._discard_from_index(self._user_index, record.user_id, jti)
+            self._discard_from_index(self._family_index, record.family_id, jti)
+            pruned += 1
+
+        return pruned
+
+    @staticmethod
+    def _discard_from_index(index: Dict[str, Set[str]], key: str, jti: str) -> None:
+        jtis = index.get(key)
+        if jtis is not None:
+            jtis.discard(jti)
+            if not jtis:
+                del index[key]
+
+    async def close(self) -> None:
+        pass
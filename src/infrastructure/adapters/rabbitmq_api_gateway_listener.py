@@ -1,67 +1,156 @@
-import json
-from typing import Callable, Any
+import asyncio
+import time
+from typing import Callable, Any, Dict, List, Optional, Tuple
 
 import aio_pika
 
 from src.application.exceptions import InvalidCredentialsError, UserNotFoundError, InactiveUserError, \
-    InvalidPasswordError, TokenGenerationError
+    InvalidPasswordError, TokenGenerationError, InvalidTokenError, TooManyLoginAttemptsError
 from src.core.config import settings
+from src.core.metrics import registry
+from src.core.tracing import tracer
 from src.domain.interfaces.queue_listener_interface import IQueueListener
 from src.domain.schemas import RabbitMQResponse
+from src.infrastructure.codecs import MessageCodecRegistry
 from src.infrastructure.exceptions import RabbitMQError, UserServiceError
+from src.infrastructure.rabbitmq_connection_manager import RabbitMQConnectionManager
 from src.core.exceptions import AuthServiceError
 
 
 class RabbitMQApiGatewayListener(IQueueListener):
+    """
+    Consumes the 'AUTH.all' queue and dispatches messages to the use cases.
+
+    Up to `prefetch_count` messages are processed concurrently. On top of that every
+    operation type has its own concurrency limit, so slow bcrypt-backed operations
+    (login, register) cannot occupy all the workers and starve cheap ones (refresh).
+    Messages waiting for their operation's limit still count against the prefetch
+    window, so keep `prefetch_count` above the sum of the limits.
+
+    Messages that can't be processed don't go back to the head of the queue:
+    - malformed ones (undecodable body, no 'operation_type') are answered with a 400 and
+      moved to the 'AUTH.all.dead-letter' queue right away. Invalid data of a well-formed
+      message is rejected by the use cases with a 4xx, like any other client error;
+    - infrastructure failures (RabbitMQ, or the User Service unavailable or timing out) are
+      retried through delay queues (a message TTL doubling on every attempt, then dead-lettered
+      back to 'AUTH.all'), up to `max_attempts` attempts counted in the 'x-auth-attempt' header.
+      The last failure is answered with its error and dead-lettered;
+    - unexpected errors would fail the same way again, they are answered with a 500 and
+      dead-lettered right away.
+    Dead-lettered messages carry the failure class and error in their headers.
+    """
+
+    # Header of the republished messages with the number of the attempt
+    ATTEMPT_HEADER = 'x-auth-attempt'
+    # Errors of the User Service worth another attempt
+    USER_SERVICE_UNAVAILABLE_STATUS_CODES = frozenset({502, 503, 504})
+
     def __init__(
             self,
             login_use_case,
             refresh_use_case,
             register_use_case,
-            logger
+            verify_use_case,
+            logout_use_case,
+            logger,
+            codecs: MessageCodecRegistry,
+            connection_manager: RabbitMQConnectionManager,
+            prefetch_count: int = settings.rabbitmq_prefetch_count,
+            operation_concurrency_limits: Optional[Dict[str, int]] = None,
+            max_attempts: int = settings.auth_max_attempts,
+            retry_delay_ms: int = settings.auth_retry_delay_ms
     ):
         self._login_use_case = login_use_case
         self._refresh_use_case = refresh_use_case
         self._register_use_case = register_use_case
+        self._verify_use_case = verify_use_case
+        self._logout_use_case = logout_use_case
         self._logger = logger
+        self._codecs = codecs
+        self._connection_manager = connection_manager
 
-        self._connection = None
         self._channel = None
         self._exchange = None
         self._exchange_name = 'API-GATEWAY-to-AUTH-SERVICE-exchange.direct'
+        self._queue_name = 'AUTH.all'
+        self._dead_letter_exchange_name = 'AUTH.all.dlx'
+        self._dead_letter_queue_name = 'AUTH.all.dead-letter'
+        self._auth_queue = None
+        self._consumer_tag = None
+
+        # Messages being processed right now (of any operation type), used to drain on shutdown
+        self._active_messages: int = 0
+        self._idle = asyncio.Event()
+        self._idle.set()
 
         self._operation_handlers = {
             'login': self._login_use_case.execute,
             'refresh': self._refresh_use_case.execute,
             'register': self._register_use_case.execute,
+            'verify': self._verify_use_case.execute,
+            'logout': self._logout_use_case.execute,
+        }
+
+        self._max_attempts = max(1, max_attempts)
+        # Delay before the 2nd, 3rd, ... attempt
+        self._retry_delays: List[int] = [retry_delay_ms * 2 ** attempt for attempt in range(self._max_attempts - 1)]
+
+        self._prefetch_count = prefetch_count
+        if operation_concurrency_limits is None:
+            operation_concurrency_limits = settings.operation_concurrency_limits_map
+        # Operations without a configured limit are only bounded by the prefetch count
+        self._operation_semaphores: Dict[str, asyncio.Semaphore] = {
+            operation_type: asyncio.Semaphore(operation_concurrency_limits.get(operation_type, prefetch_count))
+            for operation_type in self._operation_handlers
         }
+        limits_sum = sum(
+            limit for operation_type, limit in operation_concurrency_limits.items()
+            if operation_type in self._operation_handlers
+        )
+        if limits_sum > prefetch_count:
+            self._logger.warning(
+                "The operation concurrency limits add up to %d, above the prefetch count of %d: messages waiting "
+                "for a busy operation can fill the prefetch window and hold up the other operations.",
+                limits_sum, prefetch_count
+            )
+
+        # Per-instance gauges, used to size the number of replicas
+        self.messages_in_flight = registry.gauge(
+            'auth_messages_in_flight',
+            'Messages currently being processed, by operation type.',
+            ('operation_type',)
+        )
+        self.messages_waiting = registry.gauge(
+            'auth_messages_waiting',
+            'Messages waiting for a free slot of their operation type.',
+            ('operation_type',)
+        )
+        self.operation_duration = registry.histogram(
+            'auth_operation_duration_seconds',
+            'Time spent in the operation handlers, without the wait for a free slot, by operation type.',
+            ('operation_type',)
+        )
+        self.operations = registry.counter(
+            'auth_operations_total',
+            'Operations handled, by operation type and outcome.',
+            ('operation_type', 'outcome')
+        )
+        self.message_failures = registry.counter(
+            'auth_message_failures_total',
+            "Messages that couldn't be processed, by failure class ('malformed', 'unavailable', 'unhandled') and action ('retried', 'dead_lettered').",
+            ('failure_class', 'action')
+        )
 
     async def connect(self) -> None:
         """
-        Establishes a connection to the RabbitMQ service.
+        Opens the consumer channel on the shared connection and declares the exchange.
+        Responses are published on pooled channels, so they do not queue up behind each other.
 
         Raises:
             RabbitMQError: When RabbitMQ service is not available.
         """
-        if not self._connection or self._connection.is_closed:
-            try:
-                self._connection = await aio_pika.connect_robust(
-                    settings.rabbitmq_url,
-                    timeout=10,
-                    client_properties={'client_name': 'Auth Service'}
-                )
-                self._channel = await self._connection.channel()
-                self._exchange = await self._channel.declare_exchange(
-                    self._exchange_name,
-                    aio_pika.ExchangeType.DIRECT,
-                    durable=True
-                )
-            except aio_pika.exceptions.AMQPConnectionError as e:
-                self._logger.critical(f"RabbitMQ service is unavailable. Connection error: {e}. From: RabbitMQListener, connect().")
-                raise RabbitMQError(detail="RabbitMQ service is unavailable.")
-
         if not self._channel or self._channel.is_closed:
-            self._channel = await self._connection.channel()
+            self._channel = await self._connection_manager.open_channel()
             self._exchange = await self._channel.declare_exchange(
                 self._exchange_name,
                 aio_pika.ExchangeType.DIRECT,
@@ -69,106 +158,410 @@ class RabbitMQApiGatewayListener(IQueueListener):
             )
 
     async def _initialize_queue(self) -> None:
+        await self._channel.set_qos(prefetch_count=self._prefetch_count)
+        await self._declare_retry_topology()
         auth_queue = await self._channel.declare_queue(
-            'AUTH.all',
+            self._queue_name,
             durable=True
         )
-        await auth_queue.bind(self._exchange, routing_key='AUTH.all')
-        await auth_queue.consume(self._message_handler())
+        await auth_queue.bind(self._exchange, routing_key=self._queue_name)
+        self._consumer_tag = await auth_queue.consume(self._message_handler())
+        self._auth_queue = auth_queue
+
+    async def _declare_retry_topology(self) -> None:
+        """
+        Declares the dead-letter exchange and queue, and a delay queue per retry delay.
+
+        The delay queues have no consumers: their messages expire after the queue TTL and are
+        dead-lettered back to 'AUTH.all'. The delay is part of the queue name, so changing the
+        delays declares new queues instead of conflicting with the arguments of the old ones.
+        """
+        dead_letter_exchange = await self._channel.declare_exchange(
+            self._dead_letter_exchange_name,
+            aio_pika.ExchangeType.FANOUT,
+            durable=True
+        )
+        dead_letter_queue = await self._channel.declare_queue(self._dead_letter_queue_name, durable=True)
+        await dead_letter_queue.bind(dead_letter_exchange)
+
+        for delay in self._retry_delays:
+            await self._channel.declare_queue(
+                self._retry_queue_name(delay),
+                durable=True,
+                arguments={
+                    'x-message-ttl': delay,
+                    'x-dead-letter-exchange': self._exchange_name,
+                    'x-dead-letter-routing-key': self._queue_name,
+                }
+            )
+
+    def _retry_queue_name(self, delay: int) -> str:
+        return f'{self._queue_name}.retry-{delay}ms'
 
     async def start_listening(self) -> None:
         await self.connect()
         await self._initialize_queue()
         self._logger.info("Started listening for messages in the 'AUTH.all' queue.")
 
+    async def stop_listening(self, timeout: float = settings.worker_shutdown_timeout) -> None:
+        """
+        Stops consuming and drains the listener: messages already received are processed,
+        answered and acknowledged before the connection is closed.
+
+        Messages that are still unfinished after the timeout are left unacknowledged,
+        so the broker redelivers them to another consumer.
+
+        Args:
+            timeout: Max time in seconds to wait for the in-flight messages.
+        """
+        if self._auth_queue is not None and self._consumer_tag is not None:
+            try:
+                await self._auth_queue.cancel(self._consumer_tag)
+            except aio_pika.exceptions.AMQPException as e:
+                self._logger.warning("Failed to cancel the 'AUTH.all' consumer. From: RabbitMQApiGatewayListener, stop_listening(): %s", e)
+            self._consumer_tag = None
+
+        try:
+            await asyncio.wait_for(self._idle.wait(), timeout)
+        except asyncio.TimeoutError:
+            self._logger.warning(
+                "%d message(s) were still in flight after %ss and will be redelivered. "
+                "From: RabbitMQApiGatewayListener, stop_listening().",
+                self._active_messages, timeout
+            )
+
+        # The connection is shared and closed by its manager
+        if self._channel and not self._channel.is_closed:
+            await self._channel.close()
+
+        self._logger.info("Stopped listening for messages in the 'AUTH.all' queue.")
+
     async def send_response(
             self,
             routing_key: str,
             response: Any,
-            correlation_id: str
+            correlation_id: str,
+            content_type: Optional[str] = None
     ) -> None:
-        print(response)
+        # Answer with the codec of the request, so older API Gateway instances keep getting JSON
+        codec = self._codecs.get(content_type)
         message = aio_pika.Message(
-            body=json.dumps({
+            body=codec.encode({
                 "status_code": response.status_code,
                 "body": response.body,
                 "success": response.success,
                 "error_message": response.error_message,
                 "error_origin": response.error_origin
-            }).encode(),
-            correlation_id=correlation_id
+            }),
+            content_type=codec.content_type,
+            correlation_id=correlation_id,
+            # Lets the API Gateway tie the reply to the trace of its request
+            headers=tracer.inject({})
+        )
+        async with self._connection_manager.acquire_channel('responses') as channel:
+            await channel.default_exchange.publish(
+                message,
+                routing_key=routing_key
+            )
+
+    async def _run_operation(self, operation_type: str, operation_handler: Callable, data: dict) -> Any:
+        """
+        Runs the operation handler within the concurrency limit of its operation type.
+        """
+        waiting = self.messages_waiting.labels(operation_type)
+        in_flight = self.messages_in_flight.labels(operation_type)
+
+        waiting.inc()
+        try:
+            await self._operation_semaphores[operation_type].acquire()
+        finally:
+            waiting.dec()
+
+        in_flight.inc()
+        started_at = time.perf_counter()
+        outcome = 'error'
+        try:
+            result = await operation_handler(data)
+            outcome = 'success'
+            return result
+        finally:
+            self.operation_duration.labels(operation_type).observe(time.perf_counter() - started_at)
+            self.operations.labels(operation_type, outcome).inc()
+            in_flight.dec()
+            self._operation_semaphores[operation_type].release()
+
+    def _decode(self, message: aio_pika.IncomingMessage) -> Optional[Tuple[str, dict]]:
+        """
+        Returns:
+            The operation type and the data of the message, None if the message is malformed.
+        """
+        try:
+            data = self._codecs.get(message.content_type).decode(message.body)
+        except Exception:
+            return None
+
+        if not isinstance(data, dict) or not isinstance(data.get('operation_type'), str):
+            return None
+
+        return data.pop('operation_type'), data
+
+    async def _handle_operation(
+            self,
+            message: aio_pika.IncomingMessage,
+            operation_type: str,
+            data: dict
+    ) -> Optional[RabbitMQResponse]:
+        """
+        Runs the operation and returns the response to send, or None if the message is retried.
+        """
+        try:
+            operation_handler = self._operation_handlers.get(operation_type)
+            if not operation_handler:
+                self._logger.error(
+                    "Unknown 'operation_type' received in RabbitMQApiGatewayListener, _message_handler(): %s",
+                    operation_type
+                )
+                raise AuthServiceError(
+                    status_code=404,
+                    detail=f"Unknown 'operation_type' received: {operation_type}"
+                )
+
+            if operation_type == 'register' and message.message_id:
+                # A redelivered message keeps its id, so it is answered with the user created the first time
+                data.setdefault('idempotency_key', message.message_id)
+
+            result = await self._run_operation(operation_type, operation_handler, data)
+
+            status_code = 200
+            if operation_type == 'register':
+                status_code = 201
+
+            return RabbitMQResponse.success_response(
+                status_code=status_code,
+                body=result.to_dict(),
+            )
+
+        except (
+                RabbitMQError,
+                UserServiceError,
+                asyncio.TimeoutError,
+                ConnectionError,
+                aio_pika.exceptions.AMQPException
+        ) as e:
+            if isinstance(e, UserServiceError) and e.status_code not in self.USER_SERVICE_UNAVAILABLE_STATUS_CODES:
+                return self._infrastructure_error_response(e)
+            return await self._retry_or_dead_letter(message, operation_type, e)
+        except (
+                InvalidCredentialsError,
+                UserNotFoundError,
+                InactiveUserError,
+                InvalidPasswordError,
+                TooManyLoginAttemptsError,
+                TokenGenerationError,
+                InvalidTokenError,
+                AuthServiceError
+        ) as e:
+            return RabbitMQResponse.error_response(
+                status_code=e.status_code,
+                message=str(e),
+                error_origin='Auth Service'
+            )
+        except Exception as e:
+            self._logger.critical("Unhandled error occurred while processing message in RabbitMQApiGatewayListener, _message_handler(): %s", e)
+            await self._dead_letter(message, 'unhandled', str(e))
+            return RabbitMQResponse.error_response(
+                status_code=500,
+                message=f"Unhandled error occurred while processing message in the Auth Service: {str(e)}",
+                error_origin='Auth Service'
+            )
+
+    @staticmethod
+    def _infrastructure_error_response(error: Exception) -> RabbitMQResponse:
+        if isinstance(error, UserServiceError):
+            return RabbitMQResponse.error_response(
+                status_code=error.status_code,
+                message=str(error),
+                error_origin='User Service'
+            )
+        if isinstance(error, RabbitMQError):
+            return RabbitMQResponse.error_response(
+                status_code=error.status_code,
+                message=str(error),
+                error_origin='RabbitMQ'
+            )
+
+        return RabbitMQResponse.error_response(
+            status_code=503,
+            message=f"Service temporarily unavailable: {type(error).__name__}.",
+            error_origin='Auth Service'
+        )
+
+    async def _reject_malformed(self, message: aio_pika.IncomingMessage) -> RabbitMQResponse:
+        """
+        Moves a malformed message to the dead-letter queue, retrying it would fail the same way.
+        """
+        self._logger.error(
+            "Malformed message moved to the dead-letter queue.",
+            event='message_dead_lettered',
+            correlation_id=message.correlation_id,
+            failure_class='malformed'
+        )
+        await self._dead_letter(message, 'malformed', "The message body is not a valid message with an 'operation_type'.")
+        return RabbitMQResponse.error_response(
+            status_code=400,
+            message="Malformed message: the body must be an object with an 'operation_type'.",
+            error_origin='Auth Service'
         )
-        await self._channel.default_exchange.publish(
+
+    async def _retry_or_dead_letter(
+            self,
+            message: aio_pika.IncomingMessage,
+            operation_type: str,
+            error: Exception
+    ) -> Optional[RabbitMQResponse]:
+        """
+        Schedules another attempt of a message that failed on an infrastructure error,
+        after a delay, or dead-letters it after the last attempt.
+
+        Returns:
+            None if the message is retried, the error response otherwise.
+        """
+        attempt = self._attempt(message)
+        if attempt < self._max_attempts:
+            delay = self._retry_delays[attempt - 1]
+            await self._publish_copy(
+                message,
+                exchange_name=None,
+                routing_key=self._retry_queue_name(delay),
+                headers={self.ATTEMPT_HEADER: attempt + 1}
+            )
+            self.message_failures.labels('unavailable', 'retried').inc()
+            self._logger.warning(
+                "'%s' message failed on attempt %d of %d, retrying in %dms.",
+                operation_type, attempt, self._max_attempts, delay,
+                event='message_retried',
+                correlation_id=message.correlation_id,
+                operation_type=operation_type,
+                failure_class='unavailable'
+            )
+            return None
+
+        await self._dead_letter(message, 'unavailable', str(error))
+        return self._infrastructure_error_response(error)
+
+    async def _dead_letter(self, message: aio_pika.IncomingMessage, failure_class: str, error: str) -> None:
+        await self._publish_copy(
             message,
-            routing_key=routing_key
+            exchange_name=self._dead_letter_exchange_name,
+            routing_key=self._queue_name,
+            headers={
+                self.ATTEMPT_HEADER: self._attempt(message),
+                'x-auth-failure-class': failure_class,
+                'x-auth-error': error[:1000],
+            }
+        )
+        self.message_failures.labels(failure_class, 'dead_lettered').inc()
+
+    async def _publish_copy(
+            self,
+            message: aio_pika.IncomingMessage,
+            exchange_name: Optional[str],
+            routing_key: str,
+            headers: Dict[str, Any]
+    ) -> None:
+        """
+        Publishes a persistent copy of the message, with the same properties and extra headers.
+        The 'retries' channels wait for publisher confirms (by default), so the original
+        message is only acknowledged once its copy is safe in the broker.
+        """
+        copy = aio_pika.Message(
+            body=message.body,
+            headers={**(message.headers or {}), **headers},
+            content_type=message.content_type,
+            correlation_id=message.correlation_id,
+            reply_to=message.reply_to,
+            message_id=message.message_id,
+            delivery_mode=aio_pika.DeliveryMode.PERSISTENT
+        )
+        async with self._connection_manager.acquire_channel('retries') as channel:
+            if exchange_name is None:
+                exchange = channel.default_exchange
+            else:
+                exchange = await channel.get_exchange(exchange_name, ensure=False)
+            await exchange.publish(copy, routing_key=routing_key)
+
+    def _attempt(self, message: aio_pika.IncomingMessage) -> int:
+        """Returns the number of the current attempt of the message, 1 for the first delivery."""
+        try:
+            return max(1, int((message.headers or {}).get(self.ATTEMPT_HEADER, 1)))
+        except (TypeError, ValueError):
+            return 1
+
+    def _log_processed(
+            self,
+            message: aio_pika.IncomingMessage,
+            operation_type: Optional[str],
+            response: RabbitMQResponse,
+            started_at: float
+    ) -> None:
+        """
+        Logs one structured record per processed message. Message bodies are not logged,
+        they contain credentials and tokens.
+        """
+        outcome = 'success' if response.success else 'error'
+        log = self._logger.warning if response.status_code >= 500 else self._logger.info
+        log(
+            "Processed '%s' message: %s (%d).",
+            operation_type, outcome, response.status_code,
+            event='message_processed',
+            correlation_id=message.correlation_id,
+            operation_type=operation_type,
+            latency_ms=round((time.perf_counter() - started_at) * 1000, 3),
+            outcome=outcome,
+            status_code=response.status_code
         )
 
     def _message_handler(self) -> Callable:
         async def handler(message: aio_pika.IncomingMessage) -> None:
-            async with message.process():
-                self._logger.info(f"Received message: {message.body}")
-                try:
-                    data = json.loads(message.body.decode())
-                    operation_type = data.pop("operation_type")
-                    operation_handler = self._operation_handlers.get(operation_type)
-                    if not operation_handler:
-                        self._logger.error(
-                            f"Unknown 'operation_type' received in RabbitMQApiGatewayListener, _message_handler(): {operation_type}"
-                        )
-                        raise AuthServiceError(
-                            status_code=404,
-                            detail=f"Unknown 'operation_type' received: {operation_type}"
-                        )
-
-                    result = await operation_handler(data)
-
-                    status_code = 200
-                    if operation_type == 'register':
-                        status_code = 201
-
-                    response = RabbitMQResponse.success_response(
-                        status_code=status_code,
-                        body=result.to_dict(),
-                    )
+            self._active_messages += 1
+            self._idle.clear()
+            try:
+                await process(message)
+            finally:
+                self._active_messages -= 1
+                if not self._active_messages:
+                    self._idle.set()
 
-                except (
-                        InvalidCredentialsError,
-                        UserNotFoundError,
-                        InactiveUserError,
-                        InvalidPasswordError,
-                        TokenGenerationError,
-                        AuthServiceError
-                ) as e:
-                    response = RabbitMQResponse.error_response(
-                        status_code=e.status_code,
-                        message=str(e),
-                        error_origin='Auth Service'
-                    )
-                except RabbitMQError as e:
-                    response = RabbitMQResponse.error_response(
-                        status_code=e.status_code,
-                        message=str(e),
-                        error_origin='RabbitMQ'
-                    )
-                except UserServiceError as e:
-                    response = RabbitMQResponse.error_response(
-                        status_code=e.status_code,
-                        message=str(e),
-                        error_origin='User Service'
-                    )
-                except Exception as e:
-                    self._logger.critical(f"Unhandled error occurred while processing message in RabbitMQApiGatewayListener, _message_handler(): {str(e)}")
-                    response = RabbitMQResponse.error_response(
-                        status_code=500,
-                        message=f"Unhandled error occurred while processing message in the Auth Service: {str(e)}",
-                        error_origin='Auth Service'
-                    )
-                    raise e
-                finally:
+        async def process(message: aio_pika.IncomingMessage) -> None:
+            with tracer.start_span('auth.process', parent=tracer.extract(message.headers)) as span:
+                await process_in_span(message, span)
+
+        async def process_in_span(message: aio_pika.IncomingMessage, span) -> None:
+            # Failures escaping here (the retry can't be published, the worker is stopping)
+            # requeue the message, so it isn't lost. Handled ones are acknowledged.
+            async with message.process(requeue=True, ignore_processed=True):
+                started_at = time.perf_counter()
+                decoded = self._decode(message)
+                if decoded is None:
+                    operation_type = None
+                    response = await self._reject_malformed(message)
+                else:
+                    operation_type, data = decoded
+                    span.set_attribute('operation_type', operation_type)
+                    response = await self._handle_operation(message, operation_type, data)
+
+                # Retried: the next attempt answers
+                if response is None:
+                    return
+
+                span.set_attribute('status_code', response.status_code)
+                if message.reply_to:
                     await self.send_response(
                         routing_key=message.reply_to,
                         response=response,
-                        correlation_id=message.correlation_id
+                        correlation_id=message.correlation_id,
+                        content_type=message.content_type
                     )
+                self._log_processed(message, operation_type, response, started_at)
 
         return handler
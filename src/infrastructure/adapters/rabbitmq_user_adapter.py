@@ -1,55 +1,153 @@
 import asyncio
-import json
+import time
 import uuid
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional
 
 import aio_pika
 from aio_pika import Message, DeliveryMode
 
-from src.core.config import settings
 from src.domain.models.user_requests import AddUserRequestDTO
 from src.domain.models.user_responses import UserResponseDTO, UserAuthResponseDTO
+from src.core.config import settings
+from src.core.metrics import registry
+from src.core.micro_batcher import MicroBatcher
+from src.core.tracing import tracer
+from src.infrastructure.codecs import MessageCodecRegistry
 from src.infrastructure.exceptions import RabbitMQError, UserServiceError
+from src.infrastructure.rabbitmq_connection_manager import RabbitMQConnectionManager
 from src.core.exceptions import AuthServiceError
 from src.domain.schemas import RabbitMQResponse
 from src.domain.interfaces.user_adapter_interface import IUserAdapter
 
 
 class RabbitMQUserAdapter(IUserAdapter):
-    def __init__(self, logger):
+    """
+    Fetches and adds users through RPC calls to the User Service.
+
+    With batching enabled, lookups by email and by id arriving within a short window are
+    sent as one 'getManyByEmail' / 'getManyById' call, and the reply is split back to
+    the callers. Lookups by phone number and additions are always sent one by one.
+    """
+    def __init__(
+            self,
+            logger,
+            codecs: MessageCodecRegistry,
+            connection_manager: RabbitMQConnectionManager,
+            batching_enabled: bool = settings.user_batching_enabled,
+            batch_max_size: int = settings.user_batch_max_size,
+            batch_max_delay_ms: float = settings.user_batch_max_delay_ms
+    ):
         self._logger = logger
+        self._codecs = codecs
+        self._connection_manager = connection_manager
+        self._connection_manager.add_close_callback(self._on_connection_closed)
 
-        self._connection = None
         self._channel = None
         self._exchange = None
         self._exchange_name = 'AUTH-SERVICE-and-USER-SERVICE-exchange.direct'
         self._queue_name: str = 'USER.all'
 
-    async def connect(self):
-        if not self._connection or self._connection.is_closed:
-            try:
-                self._connection = await aio_pika.connect_robust(
-                    settings.rabbitmq_url,
-                    timeout=10,
-                    client_properties={'client_name': 'Auth Service'}
-                )
-                self._channel = await self._connection.channel()
-                self._exchange = await self._channel.declare_exchange(
-                    self._exchange_name,
-                    aio_pika.ExchangeType.DIRECT,
-                    durable=True
-                )
-            except aio_pika.exceptions.AMQPConnectionError as e:
-                self._logger.critical(f"RabbitMQ service is unavailable. Connection error: {e}. From: RabbitMQUserAdapter, connect().")
-                raise RabbitMQError(detail="RabbitMQ service is unavailable.")
+        # One reply queue per process, shared by all RPC calls. Replies are routed
+        # to the waiting callers by their correlation id.
+        self._callback_queue = None
+        self._callback_queue_name: str = f'from-USER-SERVICE-TO-AUTH-SERVICE.response-{uuid.uuid4()}'
+        self._pending_responses: Dict[str, asyncio.Future] = {}
+
+        self._email_batcher: Optional[MicroBatcher[str, dict]] = None
+        self._id_batcher: Optional[MicroBatcher[str, dict]] = None
+        if batching_enabled:
+            self._email_batcher = MicroBatcher(
+                lambda emails: self._get_many('getManyByEmail', 'user_emails', 'email', emails),
+                self._user_not_found_error,
+                max_batch_size=batch_max_size,
+                max_delay=batch_max_delay_ms / 1000
+            )
+            self._id_batcher = MicroBatcher(
+                lambda ids: self._get_many('getManyById', 'user_ids', 'id', ids),
+                self._user_not_found_error,
+                max_batch_size=batch_max_size,
+                max_delay=batch_max_delay_ms / 1000
+            )
 
+        self.rpc_duration = registry.histogram(
+            'auth_user_service_rpc_duration_seconds',
+            'Round-trip time of the User Service RPC calls, by operation type.',
+            ('operation_type',)
+        )
+        self.rpc_calls = registry.counter(
+            'auth_user_service_rpc_total',
+            'User Service RPC calls, by operation type and outcome.',
+            ('operation_type', 'outcome')
+        )
+        self.batch_size = registry.histogram(
+            'auth_user_service_batch_size',
+            'Number of users requested per batched User Service call, by operation type.',
+            ('operation_type',),
+            buckets=(1, 2, 4, 8, 16, 32, 64, 128, 256)
+        )
+        self.batch_latency = registry.histogram(
+            'auth_user_service_batch_latency_seconds',
+            'Round-trip time of the batched User Service calls, by operation type.',
+            ('operation_type',)
+        )
+
+    async def connect(self):
         if not self._channel or self._channel.is_closed:
-            self._channel = await self._connection.channel()
-            self._exchange = await self._channel.declare_exchange(
-                self._exchange_name,
-                aio_pika.ExchangeType.DIRECT,
-                durable=True
+            await self._open_channel()
+
+    async def _open_channel(self) -> None:
+        """
+        Opens the reply channel on the shared connection, declares the exchange and starts
+        the long-lived reply consumer. Requests are published on pooled channels.
+
+        The reply queue is exclusive, so the broker drops it together with the connection.
+        The robust channel declares it again (with the same name) and restores the consumer
+        after a reconnect.
+        """
+        self._channel = await self._connection_manager.open_channel()
+        self._exchange = await self._channel.declare_exchange(
+            self._exchange_name,
+            aio_pika.ExchangeType.DIRECT,
+            durable=True
+        )
+        self._callback_queue = await self._channel.declare_queue(
+            name=self._callback_queue_name,
+            exclusive=True,
+            auto_delete=True
+        )
+        await self._callback_queue.consume(self._on_response, no_ack=True)
+
+    async def _on_response(self, message: aio_pika.IncomingMessage) -> None:
+        """
+        Dispatches a User Service reply to the caller waiting for it.
+
+        Replies to calls that already timed out (or to calls made before a reconnect)
+        have no waiting future anymore and are dropped.
+        """
+        future = self._pending_responses.pop(message.correlation_id, None)
+        if future is None:
+            self._logger.warning(
+                "Late or unknown reply dropped. Correlation ID: %s. From: RabbitMQUserAdapter, _on_response().",
+                message.correlation_id
             )
+            return
+
+        if not future.done():
+            future.set_result(message)
+
+    def _on_connection_closed(self, *_args) -> None:
+        """
+        Fails all pending RPC calls when the connection is lost.
+
+        The exclusive reply queue is deleted by the broker together with the connection,
+        so replies to the calls in flight will never arrive.
+        """
+        pending_responses, self._pending_responses = self._pending_responses, {}
+        for future in pending_responses.values():
+            if not future.done():
+                future.set_exception(
+                    RabbitMQError(detail="Connection to RabbitMQ was lost while waiting for the User Service response.")
+                )
 
     async def _make_rpc_call(
             self,
@@ -59,75 +157,100 @@ class RabbitMQUserAdapter(IUserAdapter):
     ) -> RabbitMQResponse | None:
         await self.connect()
 
+        with tracer.start_span('user_service.rpc', operation_type=operation_type) as span:
+            response = await self._send_rpc_call(operation_type, payload, timeout)
+            span.set_attribute('status_code', response.status_code)
+            return response
+
+    async def _send_rpc_call(
+            self,
+            operation_type: str,
+            payload: Dict[str, Any],
+            timeout: int
+    ) -> RabbitMQResponse:
         message_body = {
             "operation_type": operation_type,
             **payload
         }
 
-        callback_queue = await self._channel.declare_queue(
-            name=f'from-USER-SERVICE-TO-AUTH-SERVICE.response-{uuid.uuid4()}',
-            exclusive=True,
-            auto_delete=True
-        )
-
-        future = asyncio.get_event_loop().create_future()
+        future = asyncio.get_running_loop().create_future()
         correlation_id = str(uuid.uuid4())
+        self._pending_responses[correlation_id] = future
 
-        async def on_response(received_message: aio_pika.IncomingMessage):
-            if received_message.correlation_id == correlation_id:
-                future.set_result(received_message)
-                await received_message.ack()
-
-        consumer_tag = await callback_queue.consume(on_response)
-
+        started_at = time.perf_counter()
+        outcome = 'error'
         try:
             # Send message
-            await self._exchange.publish(
-                Message(
-                    body=json.dumps(message_body).encode(),
-                    delivery_mode=DeliveryMode.PERSISTENT,
-                    correlation_id=correlation_id,
-                    reply_to=callback_queue.name,
-                ),
-                routing_key=self._queue_name
-            )
+            codec = self._codecs.default
+            async with self._connection_manager.acquire_channel('rpc') as channel:
+                exchange = await channel.get_exchange(self._exchange_name, ensure=False)
+                await exchange.publish(
+                    Message(
+                        body=codec.encode(message_body),
+                        content_type=codec.content_type,
+                        delivery_mode=DeliveryMode.PERSISTENT,
+                        correlation_id=correlation_id,
+                        reply_to=self._callback_queue_name,
+                        # The User Service continues the trace of the current request
+                        headers=tracer.inject({}),
+                    ),
+                    routing_key=self._queue_name
+                )
 
             # Wait for response
-            message = await asyncio.wait_for(future, timeout)
-            user_service_response = json.loads(message.body.decode())
+            with tracer.start_span('user_service.rpc.wait'):
+                message = await asyncio.wait_for(future, timeout)
+            user_service_response = self._codecs.get(message.content_type).decode(message.body)
+
+            if not user_service_response.get("success", True):
+                outcome = 'user_service_error'
+                return RabbitMQResponse.error_response(
+                    status_code=user_service_response.get("status_code", 500),
+                    message=user_service_response.get("error_message") or '',
+                    error_origin=user_service_response.get("error_origin") or 'User Service'
+                )
 
             response = RabbitMQResponse.success_response(
                 status_code=user_service_response.get("status_code", 200),
                 body=user_service_response.get("body", {})
             )
+            outcome = 'success'
 
             return response
 
         except asyncio.TimeoutError as e:
-            self._logger.critical(f"User Service is not responding. From: RabbitMQUserAdapter, _make_rpc_call(): {str(e)}")
+            outcome = 'timeout'
+            self._logger.critical("User Service is not responding. From: RabbitMQUserAdapter, _make_rpc_call(): %s", e)
             raise UserServiceError(
                 status_code=504,
                 detail='asyncio.TimeoutError: User Service is not responding.'
             )
+        except RabbitMQError:
+            raise
         except aio_pika.exceptions.AMQPException as e:
             error_message = "RabbitMQ communication error."
-            self._logger.critical(f"{error_message} From: RabbitMQUserAdapter, _make_rpc_call(): {str(e)}")
+            self._logger.critical("%s From: RabbitMQUserAdapter, _make_rpc_call(): %s", error_message, e)
             raise RabbitMQError(
                 status_code=503,
                 detail=error_message
             )
         except Exception as e:
             error_message = "Unhandled error occurred while processing a message."
-            self._logger.critical(f"{error_message} From: RabbitMQUserAdapter, _make_rpc_call(): {str(e)}")
+            self._logger.critical("%s From: RabbitMQUserAdapter, _make_rpc_call(): %s", error_message, e)
             raise AuthServiceError(
                 status_code=500,
                 detail=error_message
             )
         finally:
-            # Cancel the consumer tag
-            await callback_queue.cancel(consumer_tag)
+            # Forget the call, so a late reply is recognized and dropped
+            self._pending_responses.pop(correlation_id, None)
+            self.rpc_duration.labels(operation_type).observe(time.perf_counter() - started_at)
+            self.rpc_calls.labels(operation_type, outcome).inc()
 
     async def get_by_id(self, given_id: uuid.UUID, include_password_hash: bool) -> UserResponseDTO | UserAuthResponseDTO:
+        if self._id_batcher is not None:
+            return self._to_user_dto(await self._id_batcher.load(self._batch_key(given_id)), include_password_hash)
+
         response = await self._make_rpc_call(
             'getById',
             {"user_id": given_id}
@@ -136,11 +259,7 @@ class RabbitMQUserAdapter(IUserAdapter):
         if not response.success:
             self._handle_error_response(response)
 
-        if include_password_hash:
-            return UserAuthResponseDTO(**response.body)
-
-        return UserResponseDTO.do_not_include_password(**response.body)  # Called this method to exclude hashed_password hash.
-
+        return self._to_user_dto(response.body, include_password_hash)
 
     async def get_by_phone_number(self, phone_number: str, include_password_hash: bool) -> UserResponseDTO | UserAuthResponseDTO:
         response = await self._make_rpc_call(
@@ -151,12 +270,12 @@ class RabbitMQUserAdapter(IUserAdapter):
         if not response.success:
             self._handle_error_response(response)
 
-        if include_password_hash:
-            return UserAuthResponseDTO(**response.body)
-
-        return UserResponseDTO.do_not_include_password(**response.body)  # Called this method to exclude hashed_password hash.
+        return self._to_user_dto(response.body, include_password_hash)
 
     async def get_by_email(self, email: str, include_password_hash: bool) -> UserResponseDTO | UserAuthResponseDTO:
+        if self._email_batcher is not None:
+            return self._to_user_dto(await self._email_batcher.load(self._batch_key(email)), include_password_hash)
+
         response = await self._make_rpc_call(
             'getByEmail',
             {"user_email": email}
@@ -165,11 +284,58 @@ class RabbitMQUserAdapter(IUserAdapter):
         if not response.success:
             self._handle_error_response(response)
 
-        if include_password_hash:
-            return UserAuthResponseDTO(**response.body)
+        return self._to_user_dto(response.body, include_password_hash)
+
+    async def _get_many(self, operation_type: str, payload_key: str, key_field: str, keys: List[str]) -> Dict[str, dict]:
+        """
+        Fetches a batch of users with one RPC call.
 
-        return UserResponseDTO.do_not_include_password(**response.body)  # Called this method to exclude hashed_password hash.
+        Args:
+            operation_type: 'getManyByEmail' or 'getManyById'.
+            payload_key: Request field with the list of keys.
+            key_field: User field the users are matched to the keys by.
+            keys: Distinct keys to fetch, normalized with `_batch_key`.
 
+        Returns:
+            The found users keyed by the normalized key field. The User Service omits the users
+            it did not find, and may return a key in another case than requested.
+        """
+        self.batch_size.labels(operation_type).observe(len(keys))
+        started_at = time.perf_counter()
+        try:
+            response = await self._make_rpc_call(
+                operation_type,
+                {payload_key: keys}
+            )
+        finally:
+            self.batch_latency.labels(operation_type).observe(time.perf_counter() - started_at)
+
+        if not response.success:
+            self._handle_error_response(response)
+
+        return {self._batch_key(user[key_field]): user for user in response.body.get('users', [])}
+
+    @staticmethod
+    def _batch_key(key: Any) -> str:
+        """
+        Emails and ids are matched case-insensitively, so a requested key and the key of the
+        returned user agree however either is spelled.
+        """
+        return str(key).strip().lower()
+
+    @staticmethod
+    def _user_not_found_error(_key: str) -> UserServiceError:
+        return UserServiceError(
+            status_code=404,
+            detail='User not found.'
+        )
+
+    @staticmethod
+    def _to_user_dto(user_data: dict, include_password_hash: bool) -> UserResponseDTO | UserAuthResponseDTO:
+        if include_password_hash:
+            return UserAuthResponseDTO(**user_data)
+
+        return UserResponseDTO.do_not_include_password(dict(user_data))  # Called this method to exclude hashed_password hash.
 
     async def add(self, user_data: AddUserRequestDTO) -> UserResponseDTO:
         response = await self._make_rpc_call(
@@ -180,7 +346,16 @@ class RabbitMQUserAdapter(IUserAdapter):
         if not response.success:
             self._handle_error_response(response)
 
-        return UserResponseDTO.do_not_include_password(**response.body)  # Called this method to exclude hashed_password hash.
+        return UserResponseDTO.do_not_include_password(dict(response.body))  # Called this method to exclude hashed_password hash.
+
+    async def update_password_hash(self, user_id: uuid.UUID | str, hashed_password: str) -> None:
+        response = await self._make_rpc_call(
+            'updatePasswordHash',
+            {"user_id": user_id, "hashed_password": hashed_password}
+        )
+
+        if not response.success:
+            self._handle_error_response(response)
 
     def _handle_error_response(self, response: RabbitMQResponse):
         if response.status_code == 400:
@@ -199,7 +374,7 @@ class RabbitMQUserAdapter(IUserAdapter):
                 detail='asyncio.TimeoutError: User Service is not responding.'
             )
         elif response.status_code == 500 and response.error_origin == 'User Service':
-            self._logger.critical(f"User Service error occurred. From: RabbitMQUserAdapter, _handle_error_response(): {response.error_message}")
+            self._logger.critical("User Service error occurred. From: RabbitMQUserAdapter, _handle_error_response(): %s", response.error_message)
             raise UserServiceError(
                 status_code=500,
                 detail=response.error_message
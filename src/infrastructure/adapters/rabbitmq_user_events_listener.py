@@ -0,0 +1,77 @@
+from typing import Optional
+
+import aio_pika
+
+from src.core.config import settings
+from src.core.logger import LoggerService
+from src.infrastructure.adapters.caching_user_adapter import CachingUserAdapter
+from src.infrastructure.codecs import MessageCodecRegistry
+from src.infrastructure.rabbitmq_connection_manager import RabbitMQConnectionManager
+
+
+class RabbitMQUserEventsListener:
+    """
+    Invalidates the cached users on the events the User Service publishes when a user
+    is updated or deleted.
+
+    Every Auth Service process consumes all the events through its own exclusive queue.
+    Events published while the connection was down are lost, so the whole cache is
+    dropped after a reconnect.
+
+    Expected event body: {"event_type": "...", "user_id": "...", "email": "...", "phone_number": "..."},
+    where the email and phone number are the previous ones when they have changed.
+    """
+
+    def __init__(
+            self,
+            user_cache: CachingUserAdapter,
+            logger: LoggerService,
+            codecs: MessageCodecRegistry,
+            connection_manager: RabbitMQConnectionManager,
+            exchange_name: str = settings.user_events_exchange
+    ):
+        self._user_cache = user_cache
+        self._logger = logger
+        self._codecs = codecs
+        self._connection_manager = connection_manager
+        self._connection_manager.add_reconnect_callback(self._on_reconnected)
+        self._exchange_name = exchange_name
+
+        self._channel: Optional[aio_pika.abc.AbstractRobustChannel] = None
+
+    async def start_listening(self) -> None:
+        """
+        Raises:
+            RabbitMQError: When RabbitMQ service is not available.
+        """
+        self._channel = await self._connection_manager.open_channel()
+        exchange = await self._channel.declare_exchange(
+            self._exchange_name,
+            aio_pika.ExchangeType.FANOUT,
+            durable=True
+        )
+        queue = await self._channel.declare_queue(exclusive=True, auto_delete=True)
+        await queue.bind(exchange)
+        await queue.consume(self._on_event, no_ack=True)
+        self._logger.info("Started listening for user events of the '%s' exchange.", self._exchange_name)
+
+    async def stop_listening(self) -> None:
+        if self._channel and not self._channel.is_closed:
+            await self._channel.close()
+        self._channel = None
+
+    async def _on_event(self, message: aio_pika.IncomingMessage) -> None:
+        try:
+            event = self._codecs.get(message.content_type).decode(message.body)
+            self._user_cache.invalidate(
+                user_id=event.get('user_id'),
+                email=event.get('email'),
+                phone_number=event.get('phone_number')
+            )
+        except Exception as e:
+            # The event can't tell which user changed, play safe
+            self._user_cache.clear()
+            self._logger.error("Malformed user event, dropped the whole user cache. From: RabbitMQUserEventsListener, _on_event(): %s", e)
+
+    def _on_reconnected(self, *_args) -> None:
+        self._user_cache.clear()
@@ -0,0 +1,140 @@
+import asyncio
+import os
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Optional
+
+from src.domain.interfaces.token_store_interface import ITokenStore
+from src.domain.models.refresh_tokens import RefreshTokenRecord
+
+
+class SQLiteTokenStore(ITokenStore):
+    """
+    Refresh token store backed by a SQLite file.
+
+    The file can be shared by all the worker processes of a host. Queries run on a single
+    dedicated thread, so the event loop is never blocked and the connection is never used
+    concurrently. Tokens are indexed by 'jti' (primary key), user, family and expiry.
+    """
+
+    def __init__(self, path: str):
+        """
+        Args:
+            path: Path of the database file. The directory is created if needed.
+        """
+        self._path = path
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='sqlite-token-store')
+        self._connection: Optional[sqlite3.Connection] = None
+
+    async def _run(self, func: Callable[..., Any], *args: Any) -> Any:
+        return await asyncio.get_running_loop().run_in_executor(self._executor, func, *args)
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._connection is None:
+            directory = os.path.dirname(self._path)
+            if directory and not os.path.exists(directory):
+                os.makedirs(directory)
+
+            # Autocommit mode, transactions are opened explicitly where needed
+            connection = sqlite3.connect(self._path, isolation_level=None, check_same_thread=False, timeout=10)
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=NORMAL')
+            connection.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS refresh_tokens (
+                    jti TEXT PRIMARY KEY,
+                    user_id TEXT NOT NULL,
+                    family_id TEXT NOT NULL,
+                    expires_at REAL NOT NULL,
+                    revoked INTEGER NOT NULL DEFAULT 0,
+                    replaced_by TEXT
+                );
+                CREATE INDEX IF NOT EXISTS refresh_tokens_user_id_idx ON refresh_tokens (user_id);
+                CREATE INDEX IF NOT EXISTS refresh_tokens_family_id_idx ON refresh_tokens (family_id);
+                CREATE INDEX IF NOT EXISTS refresh_tokens_expires_at_idx ON refresh_tokens (expires_at);
+                """
+            )
+            self._connection = connection
+
+        return self._connection
+
+    @staticmethod
+    def _insert(connection: sqlite3.Connection, record: RefreshTokenRecord) -> None:
+        connection.execute(
+            'INSERT INTO refresh_tokens (jti, user_id, family_id, expires_at, revoked, replaced_by) '
+            'VALUES (?, ?, ?, ?, ?, ?)',
+            (record.jti, record.user_id, record.family_id, record.expires_at, int(record.revoked), record.replaced_by)
+        )
+
+    async def add(self, record: RefreshTokenRecord) -> None:
+        await self._run(lambda: self._insert(self._connect(), record))
+
+    async def get(self, jti: str) -> Optional[RefreshTokenRecord]:
+        def get() -> Optional[RefreshTokenRecord]:
+            row = self._connect().execute(
+                'SELECT jti, user_id, family_id, expires_at, revoked, replaced_by FROM refresh_tokens WHERE jti = ?',
+                (jti,)
+            ).fetchone()
+            if row is None:
+                return None
+
+            return RefreshTokenRecord(
+                jti=row[0],
+                user_id=row[1],
+                family_id=row[2],
+                expires_at=row[3],
+                revoked=bool(row[4]),
+                replaced_by=row[5]
+            )
+
+        return await self._run(get)
+
+    async def rotate(self, jti: str, new_record: RefreshTokenRecord) -> bool:
+        def rotate() -> bool:
+            connection = self._connect()
+            # IMMEDIATE takes the write lock up front, so two processes can't both rotate the same token
+            connection.execute('BEGIN IMMEDIATE')
+            try:
+                cursor = connection.execute(
+                    'UPDATE refresh_tokens SET replaced_by = ? WHERE jti = ? AND revoked = 0 AND replaced_by IS NULL',
+                    (new_record.jti, jti)
+                )
+                if cursor.rowcount != 1:
+                    connection.execute('ROLLBACK')
+                    return False
+
+                self._insert(connection, new_record)
+                connection.execute('COMMIT')
+                return True
+            except Exception:
+                connection.execute('ROLLBACK')
+                raise
+
+        return await self._run(rotate)
+
+    async def revoke_family(self, family_id: str) -> int:
+        return await self._run(lambda: self._connect().execute(
+            'UPDATE refresh_tokens SET revoked = 1 WHERE family_id = ? AND revoked = 0',
+            (family_id,)
+        ).rowcount)
+
+    async def revoke_all_for_user(self, user_id: str) -> int:
+        return await self._run(lambda: self._connect().execute(
+            'UPDATE refresh_tokens SET revoked = 1 WHERE user_id = ? AND revoked = 0',
+            (user_id,)
+        ).rowcount)
+
+    async def prune_expired(self, now: float) -> int:
+        return await self._run(lambda: self._connect().execute(
+            'DELETE FROM refresh_tokens WHERE expires_at <= ?',
+            (now,)
+        ).rowcount)
+
+    async def close(self) -> None:
+        def close() -> None:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+        await self._run(close)
+        self._executor.shutdown(wait=True)
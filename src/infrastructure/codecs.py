@@ -0,0 +1,117 @@
+import json
+from datetime import date, datetime
+from enum import Enum
+from typing import Any, Dict, Optional
+from uuid import UUID
+
+from src.core.config import settings
+from src.domain.interfaces.message_codec_interface import IMessageCodec
+
+try:
+    import orjson
+except ImportError:  # Optional dependency
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:  # Optional dependency
+    msgpack = None
+
+
+JSON_CONTENT_TYPE = 'application/json'
+MSGPACK_CONTENT_TYPE = 'application/x-msgpack'
+
+
+def _to_primitive(value: Any) -> Any:
+    """
+    Converts the values the codecs can't serialize natively.
+    UUIDs are sent as strings and datetimes as ISO 8601 strings, whatever the codec.
+    """
+    if isinstance(value, UUID):
+        return str(value)
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Enum):
+        return value.value
+    raise TypeError(f"Object of type {type(value).__name__} is not serializable.")
+
+
+class JsonCodec(IMessageCodec):
+    """Standard library JSON codec. Always available, used as the fallback."""
+    content_type = JSON_CONTENT_TYPE
+
+    def encode(self, data: Any) -> bytes:
+        return json.dumps(data, default=_to_primitive, separators=(',', ':')).encode()
+
+    def decode(self, body: bytes) -> Any:
+        # json.loads() detects the encoding of bytes itself, no need to decode() first
+        return json.loads(body)
+
+
+class OrjsonCodec(IMessageCodec):
+    """JSON codec backed by orjson. Serializes UUID, datetime and Enum natively."""
+    content_type = JSON_CONTENT_TYPE
+
+    def __init__(self):
+        if orjson is None:
+            raise RuntimeError("OrjsonCodec requires the 'orjson' package.")
+
+    def encode(self, data: Any) -> bytes:
+        return orjson.dumps(data, default=_to_primitive)
+
+    def decode(self, body: bytes) -> Any:
+        return orjson.loads(body)
+
+
+class MsgpackCodec(IMessageCodec):
+    """Binary MessagePack codec."""
+    content_type = MSGPACK_CONTENT_TYPE
+
+    def __init__(self):
+        if msgpack is None:
+            raise RuntimeError("MsgpackCodec requires the 'msgpack' package.")
+
+    def encode(self, data: Any) -> bytes:
+        return msgpack.packb(data, default=_to_primitive, use_bin_type=True)
+
+    def decode(self, body: bytes) -> Any:
+        return msgpack.unpackb(body, raw=False)
+
+
+class MessageCodecRegistry:
+    """
+    Selects the codec by the AMQP 'content_type' message property.
+
+    Messages without a content type (e.g. from older API Gateway instances) or with an
+    unknown one are treated as JSON, so switching codecs never breaks older peers.
+    """
+
+    def __init__(self, default_content_type: str = settings.amqp_content_type):
+        """
+        Args:
+            default_content_type: Content type used for the messages this service initiates.
+                Falls back to JSON when the codec for it is not installed.
+        """
+        json_codec = OrjsonCodec() if orjson is not None else JsonCodec()
+        self._codecs: Dict[str, IMessageCodec] = {JSON_CONTENT_TYPE: json_codec}
+        if msgpack is not None:
+            msgpack_codec = MsgpackCodec()
+            self._codecs[MSGPACK_CONTENT_TYPE] = msgpack_codec
+            self._codecs['application/msgpack'] = msgpack_codec
+
+        self._fallback = json_codec
+        self.default = self._codecs.get(default_content_type, json_codec)
+
+    def get(self, content_type: Optional[str]) -> IMessageCodec:
+        """
+        Returns the codec for the content type, JSON if it is missing or unknown.
+        """
+        if not content_type:
+            return self._fallback
+
+        codec = self._codecs.get(content_type)
+        if codec is None:
+            # e.g. 'application/json; charset=utf-8'
+            codec = self._codecs.get(content_type.split(';', 1)[0].strip(), self._fallback)
+
+        return codec
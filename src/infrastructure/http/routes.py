@@ -0,0 +1,151 @@
+import ipaddress
+import time
+from typing import Optional
+
+from fastapi import APIRouter, Request
+from starlette.responses import JSONResponse, PlainTextResponse, Response
+
+from src.core.config import settings
+from src.core.exceptions import AuthServiceError
+from src.core.ip_networks import IPNetworks
+from src.core.metrics import registry
+from src.infrastructure.codecs import JSON_CONTENT_TYPE
+
+router = APIRouter()
+
+# Proxies whose X-Forwarded-For header gives the client of the request
+_trusted_proxies = IPNetworks(settings.http_trusted_proxies_list)
+
+http_operation_duration = registry.histogram(
+    'auth_http_operation_duration_seconds',
+    'Time spent in the operation handlers of the HTTP endpoints, by operation type.',
+    ('operation_type',)
+)
+http_operations = registry.counter(
+    'auth_http_operations_total',
+    'Operations handled by the HTTP endpoints, by operation type and outcome.',
+    ('operation_type', 'outcome')
+)
+
+
+@router.get('/.well-known/jwks.json')
+async def get_jwks(request: Request) -> JSONResponse:
+    """
+    Publishes the public keys that verify the issued tokens.
+    Verifiers are expected to cache the keys and refetch them when they meet an unknown 'kid'.
+    """
+    jwt_service = request.app.state.dependencies.jwt_service
+    return JSONResponse(
+        content=jwt_service.get_jwks(),
+        headers={'Cache-Control': 'public, max-age=300'}
+    )
+
+
+@router.get('/metrics')
+async def get_metrics() -> PlainTextResponse:
+    """Exposes the metrics of this process in the Prometheus text format."""
+    return PlainTextResponse(
+        content=registry.render(),
+        media_type='text/plain; version=0.0.4; charset=utf-8'
+    )
+
+
+@router.post('/auth/login')
+async def login(request: Request) -> Response:
+    """
+    Same as the 'login' message: {"email" or "phone_number", "password"} -> tokens.
+    The client IP the failed logins are counted for is taken from the connection and the
+    X-Forwarded-For header of the trusted proxies (see _client_ip()), never from the body.
+    """
+    return await _run_operation(request, 'login', 200)
+
+
+@router.post('/auth/refresh')
+async def refresh(request: Request) -> Response:
+    """Same as the 'refresh' message: {"refresh_token"} -> rotated tokens."""
+    return await _run_operation(request, 'refresh', 200)
+
+
+@router.post('/auth/register')
+async def register(request: Request) -> Response:
+    """
+    Same as the 'register' message: user data with the plain "password" -> created user.
+    A retried request with the same Idempotency-Key header gets the user created the first time.
+    """
+    return await _run_operation(request, 'register', 201)
+
+
+async def _run_operation(request: Request, operation_type: str, status_code: int) -> Response:
+    """
+    Runs the use case the AMQP listener runs for the operation, without the broker round-trips.
+
+    The body is read in full before the use case runs and the response has a Content-Length,
+    so the connection stays reusable for the next (keep-alive or pipelined) request.
+    Errors are turned into JSON responses by the ExceptionMiddleware.
+    """
+    dependencies = request.app.state.dependencies
+    codec = dependencies.codecs.get(JSON_CONTENT_TYPE)
+    try:
+        payload = codec.decode(await request.body())
+    except ValueError:
+        raise AuthServiceError(status_code=400, detail="Request body is not valid JSON.")
+    if not isinstance(payload, dict):
+        raise AuthServiceError(status_code=400, detail="Request body must be a JSON object.")
+
+    idempotency_key = request.headers.get('idempotency-key')
+    if idempotency_key and operation_type == 'register':
+        payload.setdefault('idempotency_key', idempotency_key)
+
+    if operation_type == 'login':
+        payload.pop('client_ip', None)
+        login_client_ip = _client_ip(request)
+        if login_client_ip is not None:
+            payload['client_ip'] = login_client_ip
+
+    use_case = getattr(dependencies, f'{operation_type}_use_case')
+    started_at = time.perf_counter()
+    outcome = 'error'
+    try:
+        result = await use_case.execute(payload)
+        outcome = 'success'
+    finally:
+        http_operation_duration.labels(operation_type).observe(time.perf_counter() - started_at)
+        http_operations.labels(operation_type, outcome).inc()
+
+    return Response(
+        content=codec.encode(result.to_dict()),
+        status_code=status_code,
+        media_type=JSON_CONTENT_TYPE
+    )
+
+
+def _client_ip(request: Request) -> Optional[str]:
+    """
+    Returns the address of the client the request comes from, or None if it is unknown.
+
+    The X-Forwarded-For header is only believed as far as it was written by the trusted proxies:
+    the client is the last address that isn't one of them. A request from a trusted proxy without
+    the header has no known client, rather than all of the proxy's clients sharing its address
+    (and its failed login counter).
+    """
+    if request.client is None:
+        return None
+
+    peer = request.client.host
+    if peer not in _trusted_proxies:
+        return peer
+
+    forwarded_for = [
+        address.strip()
+        for header in request.headers.getlist('x-forwarded-for')
+        for address in header.split(',')
+    ]
+    for address in reversed(forwarded_for):
+        if address not in _trusted_proxies:
+            try:
+                return str(ipaddress.ip_address(address))
+            except ValueError:
+                # Mangled or forged header
+                return None
+
+    return None
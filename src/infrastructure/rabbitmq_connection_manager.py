@@ -0,0 +1,140 @@
+import asyncio
+from typing import Callable, Dict, Optional, AsyncContextManager
+
+import aio_pika
+from aio_pika.abc import AbstractRobustChannel, AbstractRobustConnection
+from aio_pika.pool import Pool
+
+from src.core.config import settings
+from src.core.logger import LoggerService
+from src.infrastructure.exceptions import RabbitMQError
+
+
+class RabbitMQConnectionManager:
+    """
+    Owns the single robust AMQP connection of the process and hands out its channels.
+
+    Consumers get dedicated channels (their QoS and consumers are bound to the channel),
+    publishers share per-workload channel pools, so concurrent publishes are not
+    serialized on one channel. Robust channels declare their exchanges, queues and
+    consumers again after a reconnect.
+    """
+
+    def __init__(
+            self,
+            logger: LoggerService,
+            url: str = settings.rabbitmq_url,
+            channel_pool_sizes: Optional[Dict[str, int]] = None,
+            publisher_confirms_workloads: Optional[set[str]] = None
+    ):
+        """
+        Args:
+            logger: Logger service.
+            url: RabbitMQ URL.
+            channel_pool_sizes: Number of pooled channels per workload name.
+            publisher_confirms_workloads: Workloads whose channels wait for the broker to confirm every publish.
+        """
+        self._logger = logger
+        self._url = url
+        self._channel_pool_sizes = channel_pool_sizes or settings.rabbitmq_channel_pool_sizes_map
+        self._publisher_confirms_workloads = (
+            publisher_confirms_workloads
+            if publisher_confirms_workloads is not None
+            else settings.rabbitmq_publisher_confirms_workloads_set
+        )
+
+        self._connection: Optional[AbstractRobustConnection] = None
+        self._connect_lock = asyncio.Lock()
+        self._channel_pools: Dict[str, Pool] = {}
+        self._close_callbacks: list[Callable] = []
+        self._reconnect_callbacks: list[Callable] = []
+
+    async def connect(self) -> AbstractRobustConnection:
+        """
+        Establishes the connection to the RabbitMQ service, once per process.
+
+        Returns:
+            The robust connection.
+
+        Raises:
+            RabbitMQError: When RabbitMQ service is not available.
+        """
+        if self._connection and not self._connection.is_closed:
+            return self._connection
+
+        async with self._connect_lock:
+            if self._connection and not self._connection.is_closed:
+                return self._connection
+
+            try:
+                self._connection = await aio_pika.connect_robust(
+                    self._url,
+                    timeout=10,
+                    client_properties={'client_name': 'Auth Service'}
+                )
+            except aio_pika.exceptions.AMQPConnectionError as e:
+                self._logger.critical("RabbitMQ service is unavailable. Connection error: %s. From: RabbitMQConnectionManager, connect().", e)
+                raise RabbitMQError(detail="RabbitMQ service is unavailable.")
+
+            for callback in self._close_callbacks:
+                self._connection.close_callbacks.add(callback)
+            for callback in self._reconnect_callbacks:
+                self._connection.reconnect_callbacks.add(callback)
+
+        return self._connection
+
+    async def open_channel(self, publisher_confirms: bool = False) -> AbstractRobustChannel:
+        """
+        Opens a dedicated channel, e.g. for a consumer with its own QoS.
+
+        Args:
+            publisher_confirms: Whether publishes on the channel wait for the broker confirmation.
+
+        Returns:
+            The robust channel. The caller owns it and closes it when done.
+        """
+        connection = await self.connect()
+        return await connection.channel(publisher_confirms=publisher_confirms)
+
+    def acquire_channel(self, workload: str) -> AsyncContextManager[AbstractRobustChannel]:
+        """
+        Borrows a channel from the pool of the workload for the duration of the 'async with' block.
+
+        Args:
+            workload: Workload name, e.g. 'responses' or 'rpc'. Sets the pool size and publisher confirms.
+        """
+        pool = self._channel_pools.get(workload)
+        if pool is None:
+            pool = self._channel_pools[workload] = Pool(
+                self.open_channel,
+                workload in self._publisher_confirms_workloads,
+                max_size=self._channel_pool_sizes.get(workload, 1)
+            )
+
+        return pool.acquire()
+
+    def add_close_callback(self, callback: Callable) -> None:
+        """
+        Registers a callback called as `callback(connection, exception)` every time the connection is lost.
+        """
+        self._close_callbacks.append(callback)
+        if self._connection is not None:
+            self._connection.close_callbacks.add(callback)
+
+    def add_reconnect_callback(self, callback: Callable) -> None:
+        """
+        Registers a callback called as `callback(connection)` after the connection
+        and its channels, exchanges, queues and consumers are restored.
+        """
+        self._reconnect_callbacks.append(callback)
+        if self._connection is not None:
+            self._connection.reconnect_callbacks.add(callback)
+
+    async def close(self) -> None:
+        """Closes the channel pools and the connection."""
+        channel_pools, self._channel_pools = self._channel_pools, {}
+        for pool in channel_pools.values():
+            await pool.close()
+
+        if self._connection and not self._connection.is_closed:
+            await self._connection.close()
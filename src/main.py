@@ -1,63 +1,249 @@
 from contextlib import asynccontextmanager
+from dataclasses import dataclass
+import os
+from typing import Optional
 
 import uvicorn
 from fastapi import FastAPI
 import asyncio
 
-from starlette.middleware.base import BaseHTTPMiddleware
-
-from src.application.services.password_hasher import BcryptPasswordHasher
+from src.application.services.async_password_hasher import AsyncPasswordHasher
+from src.application.services.password_hasher import BcryptPasswordHasher, Argon2PasswordHasher, \
+    MultiAlgorithmPasswordHasher
+from src.application.services.password_rehasher import PasswordRehasher
 from src.application.services.auth_service import AuthService
 from src.application.services.jwt_service import JWTService
-from src.application.use_cases.login import LoginUseCase, StubLoginUseCase
+from src.application.services.login_throttler import LoginThrottler
+from src.application.services.session_token_service import SessionTokenService
+from src.application.services.token_store_sweeper import TokenStoreSweeper
+from src.application.use_cases.login import LoginUseCase
+from src.application.use_cases.logout import LogoutUseCase
 from src.application.use_cases.refresh import RefreshUseCase
 from src.application.use_cases.register import RegisterUseCase
+from src.application.use_cases.verify import VerifyTokenUseCase
+from src.core.config import settings
 from src.core.logger import LoggerService
+from src.core.tracing import tracer, SpanExporter, InMemorySpanExporter, FileSpanExporter
 from src.core.middleware.clients_filter_middleware import IPFilterMiddleware
 from src.core.middleware.exception_middleware import ExceptionMiddleware
+from src.domain.interfaces.login_attempt_store_interface import ILoginAttemptStore
+from src.domain.interfaces.token_store_interface import ITokenStore
+from src.infrastructure.adapters.caching_user_adapter import CachingUserAdapter
+from src.infrastructure.adapters.in_memory_login_attempt_store import InMemoryLoginAttemptStore
+from src.infrastructure.adapters.in_memory_token_store import InMemoryTokenStore
 from src.infrastructure.adapters.rabbitmq_api_gateway_listener import RabbitMQApiGatewayListener
 from src.infrastructure.adapters.rabbitmq_user_adapter import RabbitMQUserAdapter
+from src.infrastructure.adapters.rabbitmq_user_events_listener import RabbitMQUserEventsListener
+from src.infrastructure.adapters.sqlite_token_store import SQLiteTokenStore
+from src.infrastructure.codecs import MessageCodecRegistry
+from src.infrastructure.http.routes import router
+from src.infrastructure.rabbitmq_connection_manager import RabbitMQConnectionManager
+
+
+@dataclass
+class Dependencies:
+    """Wired application components that need to be started and stopped with the application."""
+    listener: RabbitMQApiGatewayListener
+    password_hasher: AsyncPasswordHasher
+    password_rehasher: PasswordRehasher
+    connection_manager: RabbitMQConnectionManager
+    jwt_service: JWTService
+    token_store: ITokenStore
+    token_store_sweeper: TokenStoreSweeper
+    # Used by the HTTP endpoints, which run the same use cases as the listener
+    login_use_case: LoginUseCase
+    refresh_use_case: RefreshUseCase
+    register_use_case: RegisterUseCase
+    codecs: MessageCodecRegistry
+    user_events_listener: Optional[RabbitMQUserEventsListener] = None
+
+
+def create_token_store() -> ITokenStore:
+    """
+    Create the refresh token store configured by TOKEN_STORE_BACKEND.
+    The in-memory store is per process, so several workers need the SQLite one.
+    """
+    if settings.token_store_backend == 'sqlite':
+        return SQLiteTokenStore(path=settings.token_store_sqlite_path)
+    if settings.token_store_backend == 'memory':
+        return InMemoryTokenStore()
+
+    raise ValueError(f"Unknown token store backend: {settings.token_store_backend}")
+
+
+def create_span_exporter() -> Optional[SpanExporter]:
+    """
+    Create the span exporter configured by TRACING_EXPORTER, None when tracing is disabled.
+    Every process writes its own spans file, so the workers don't interleave their writes.
+    """
+    if settings.tracing_exporter == 'file':
+        return FileSpanExporter(path=settings.tracing_file_path.format(pid=os.getpid()))
+    if settings.tracing_exporter == 'memory':
+        return InMemorySpanExporter()
+    if settings.tracing_exporter == 'none':
+        return None
+
+    raise ValueError(f"Unknown tracing exporter: {settings.tracing_exporter}")
+
+
+def create_login_attempt_store(max_failures: int) -> ILoginAttemptStore:
+    """
+    Create a store of failed login attempts. The store is per process,
+    so with several workers the limits apply to each of them.
+    """
+    return InMemoryLoginAttemptStore(
+        max_failures=max_failures,
+        window=settings.login_failure_window,
+        lockout=settings.login_lockout,
+        max_lockout=settings.login_max_lockout,
+        max_keys=settings.login_throttle_max_keys
+    )
+
+
+async def create_password_hasher(logger: LoggerService) -> MultiAlgorithmPasswordHasher:
+    """
+    Create the password hasher: new hashes use PASSWORD_HASH_ALGORITHM, while bcrypt
+    and (if 'argon2-cffi' is installed) Argon2id hashes are both verified.
+
+    The bcrypt cost is set by BCRYPT_ROUNDS, or calibrated to PASSWORD_HASH_TARGET_MS on this host.
+    """
+    if settings.bcrypt_rounds:
+        bcrypt_hasher = BcryptPasswordHasher(rounds=settings.bcrypt_rounds)
+    else:
+        bcrypt_hasher = await asyncio.to_thread(
+            BcryptPasswordHasher.calibrated,
+            settings.password_hash_target_ms / 1000,
+            settings.bcrypt_min_rounds,
+            settings.bcrypt_max_rounds
+        )
+        logger.info("Calibrated bcrypt cost: %d.", bcrypt_hasher.rounds)
+
+    argon2_hasher = None
+    try:
+        argon2_hasher = Argon2PasswordHasher(
+            time_cost=settings.argon2_time_cost,
+            memory_cost=settings.argon2_memory_cost,
+            parallelism=settings.argon2_parallelism
+        )
+    except ImportError:
+        if settings.password_hash_algorithm == 'argon2id':
+            raise
+        logger.warning("'argon2-cffi' is not installed, Argon2id hashes can't be verified.")
+
+    if settings.password_hash_algorithm == 'argon2id':
+        return MultiAlgorithmPasswordHasher(primary=argon2_hasher, others=[bcrypt_hasher])
+    if settings.password_hash_algorithm == 'bcrypt':
+        return MultiAlgorithmPasswordHasher(primary=bcrypt_hasher, others=[argon2_hasher] if argon2_hasher else [])
 
+    raise ValueError(f"Unknown password hash algorithm: {settings.password_hash_algorithm}")
 
-async def setup_dependencies():
+
+async def setup_dependencies() -> Dependencies:
     """
     Initialize all dependencies.
 
     This function creates and wires together all the components of our application:
-    - Logger
+    - Logger and tracer
     - Password hasher for secure hashed_password verification
     - Auth service for authentication operations
     - JWT service for token management
-    - User adapter for communication with User Service
+    - Token store and session token service for refresh token rotation and revocation
+    - RabbitMQ connection manager shared by the adapters
+    - User adapter for communication with User Service, behind a short-lived cache
     - Login use case that orchestrates the authentication flow
-    - RabbitMQ listener that handles incoming requests
+    - RabbitMQ listener that handles incoming requests (the HTTP endpoints call the same use cases)
     """
     logger = LoggerService(__name__, "auth_service_log.log")
 
+    # Spans of the requests, linked to the API Gateway and User Service ones by the 'traceparent' header
+    tracer.configure(create_span_exporter(), sample_rate=settings.tracing_sample_rate)
+
     # Create core services
     jwt_service = JWTService()
-    bcrypt_password_hasher = BcryptPasswordHasher()
-    auth_service = AuthService(password_hasher=bcrypt_password_hasher)
+    # Hashing runs on a worker pool, so it does not block the event loop
+    password_hasher = AsyncPasswordHasher(password_hasher=await create_password_hasher(logger))
+    auth_service = AuthService(password_hasher=password_hasher)
+
+    # Issued refresh tokens, so they can be rotated and revoked
+    token_store = create_token_store()
+    token_store_sweeper = TokenStoreSweeper(token_store=token_store, logger=logger)
+    session_token_service = SessionTokenService(
+        jwt_service=jwt_service,
+        token_store=token_store,
+        logger=logger
+    )
+
+    # Message body codecs, selected by the AMQP 'content_type' property
+    codecs = MessageCodecRegistry()
+
+    # One RabbitMQ connection per process, shared by the listener and the user adapter
+    connection_manager = RabbitMQConnectionManager(logger=logger)
 
     # Create data access layer
-    user_adapter = RabbitMQUserAdapter(logger=logger)
+    user_adapter = CachingUserAdapter(
+        user_adapter=RabbitMQUserAdapter(
+            logger=logger,
+            codecs=codecs,
+            connection_manager=connection_manager
+        )
+    )
+
+    # Without the User Service events, cached users only expire by their TTL
+    user_events_listener = None
+    if settings.user_events_exchange:
+        user_events_listener = RabbitMQUserEventsListener(
+            user_cache=user_adapter,
+            logger=logger,
+            codecs=codecs,
+            connection_manager=connection_manager
+        )
+
+    # Stored hashes with an outdated cost are rehashed after the login
+    password_rehasher = PasswordRehasher(
+        password_hasher=password_hasher,
+        user_adapter=user_adapter,
+        logger=logger
+    )
+
+    # Failed logins lock the identifier and the client IP out, before any hashing
+    login_throttler = None
+    if settings.login_throttle_enabled:
+        login_throttler = LoginThrottler(
+            identifier_attempts=create_login_attempt_store(settings.login_max_failures_per_identifier),
+            ip_attempts=create_login_attempt_store(settings.login_max_failures_per_ip),
+            logger=logger
+        )
 
     # Create use cases
-    login_use_case = StubLoginUseCase(  # FOR TESTING PURPOSES ONLY!!!
+    login_use_case = LoginUseCase(
         user_adapter=user_adapter,
-        jwt_service=jwt_service,
+        session_token_service=session_token_service,
         auth_service=auth_service,
-        logger=logger
+        logger=logger,
+        password_rehasher=password_rehasher,
+        login_throttler=login_throttler
     )
 
     refresh_use_case = RefreshUseCase(
         jwt_service=jwt_service,
+        session_token_service=session_token_service,
         logger=logger
     )
 
     register_use_case = RegisterUseCase(
         user_adapter=user_adapter,
-        password_hasher=bcrypt_password_hasher,
+        password_hasher=password_hasher,
+        logger=logger
+    )
+
+    verify_use_case = VerifyTokenUseCase(
+        jwt_service=jwt_service,
+        logger=logger
+    )
+
+    logout_use_case = LogoutUseCase(
+        jwt_service=jwt_service,
+        session_token_service=session_token_service,
         logger=logger
     )
 
@@ -66,41 +252,82 @@ async def setup_dependencies():
         login_use_case=login_use_case,
         refresh_use_case=refresh_use_case,
         register_use_case=register_use_case,
-        logger=logger
+        verify_use_case=verify_use_case,
+        logout_use_case=logout_use_case,
+        logger=logger,
+        codecs=codecs,
+        connection_manager=connection_manager
     )
 
-    return rabbitmq_api_gateway_listener
+    return Dependencies(
+        listener=rabbitmq_api_gateway_listener,
+        password_hasher=password_hasher,
+        password_rehasher=password_rehasher,
+        connection_manager=connection_manager,
+        jwt_service=jwt_service,
+        token_store=token_store,
+        token_store_sweeper=token_store_sweeper,
+        login_use_case=login_use_case,
+        refresh_use_case=refresh_use_case,
+        register_use_case=register_use_case,
+        codecs=codecs,
+        user_events_listener=user_events_listener
+    )
 
 async def start_api_gateway_rabbitmq_listener(listener: RabbitMQApiGatewayListener):
     """Start the RabbitMQ listener."""
     await listener.start_listening()
 
 
+async def start_dependencies(dependencies: Dependencies) -> None:
+    """Start the background components, then the RabbitMQ listener."""
+    await dependencies.password_hasher.start()
+    await dependencies.token_store_sweeper.start()
+    if dependencies.user_events_listener is not None:
+        await dependencies.user_events_listener.start_listening()
+    await start_api_gateway_rabbitmq_listener(dependencies.listener)
+
+
+async def stop_dependencies(dependencies: Dependencies) -> None:
+    """Drain the RabbitMQ listener, then stop the background components."""
+    await dependencies.listener.stop_listening()
+    if dependencies.user_events_listener is not None:
+        await dependencies.user_events_listener.stop_listening()
+    await dependencies.password_rehasher.shutdown()
+    await dependencies.connection_manager.close()
+    await dependencies.password_hasher.shutdown()
+    await dependencies.token_store_sweeper.shutdown()
+    await dependencies.token_store.close()
+    tracer.shutdown()
+
+
 @asynccontextmanager
 async def lifespan(_app: FastAPI):
     """FastAPI lifespan event handler for startup and shutdown."""
     # Create dependencies
-    listener = await setup_dependencies()
+    dependencies = await setup_dependencies()
+    _app.state.dependencies = dependencies
 
-    # Start RabbitMQ listener
-    listeners_task = asyncio.create_task(
-        start_api_gateway_rabbitmq_listener(listener)
-    )
+    # Start background components and RabbitMQ listener. A failed startup fails the lifespan,
+    # so the process exits (and the supervisor restarts the worker) instead of serving without a consumer
+    try:
+        await start_dependencies(dependencies)
+    except BaseException:
+        await stop_dependencies(dependencies)
+        raise
 
     yield  # Application runs here
 
     # Cleanup on shutdown
-    listeners_task.cancel()
-    try:
-        await listeners_task
-    except asyncio.CancelledError:
-        pass
+    await stop_dependencies(dependencies)
 
 
 app = FastAPI(lifespan=lifespan)
+app.include_router(router)
 
+# Pure ASGI middlewares, the last added one is the outermost
 app.add_middleware(IPFilterMiddleware)
-app.add_middleware(BaseHTTPMiddleware, dispatch=ExceptionMiddleware(app=app).dispatch)
+app.add_middleware(ExceptionMiddleware, logger=LoggerService(__name__, "auth_service_log.log"))
 
 if __name__ == "__main__":
     uvicorn.run(app, host='localhost', port=8001)
@@ -0,0 +1,207 @@
+"""
+Multi-worker mode.
+
+Starts `settings.auth_workers` processes, each running the whole application (src.main:app):
+its own AMQP connection and 'AUTH.all' consumer, and the HTTP endpoints on a socket bound
+once by the supervisor (HTTP_HOST:HTTP_PORT) and shared by all the workers, so the service
+uses all CPU cores of the host. Crashed workers are restarted with a backoff. SIGTERM/SIGINT
+drains the workers: they stop consuming, finish and acknowledge the in-flight messages and exit.
+
+Every worker starts its own password hashing pool, so size PASSWORD_HASHER_WORKERS
+per worker (e.g. 1-2) when running in this mode. The bcrypt cost is calibrated once
+by the supervisor, so all the workers hash with the same cost.
+
+State that stays per worker process:
+- Refresh token store: TOKEN_STORE_BACKEND must be 'sqlite', so every worker knows the tokens
+  issued by the others. The supervisor refuses to start several workers with the 'memory' store.
+- Failed login counters: the limits apply per worker, so a client can make up to
+  `AUTH_WORKERS` times LOGIN_MAX_FAILURES_PER_* failures before being locked out everywhere.
+- User cache: every worker receives the user events through its own queue, so each cache is
+  invalidated; without USER_EVENTS_EXCHANGE each one serves users up to USER_CACHE_TTL_SECONDS old.
+- Completed registrations (idempotency): a 'register' message redelivered to another worker
+  runs again, and the User Service rejects the duplicate user.
+- Metrics: /metrics returns the metrics of the worker that accepted the connection.
+- Traces: every worker writes its own TRACING_FILE_PATH file.
+
+Usage:
+    python -m src.supervisor
+"""
+import asyncio
+import multiprocessing
+import os
+import signal
+import socket
+import time
+from multiprocessing.process import BaseProcess
+from typing import Optional
+
+import uvicorn
+
+from src.core.config import settings
+from src.core.logger import LoggerService
+
+
+async def run_worker(http_socket: socket.socket) -> bool:
+    """
+    Runs the application in a worker process until SIGTERM/SIGINT is received.
+    The app lifespan starts the components and drains the listener on shutdown.
+
+    Args:
+        http_socket: Listening socket of the HTTP endpoints, shared with the other workers.
+
+    Returns:
+        Whether the application started.
+    """
+    # Imported here, so the supervisor process does not create any of the application components
+    from src.main import app
+
+    server = uvicorn.Server(uvicorn.Config(app, lifespan='on', access_log=False))
+    await server.serve(sockets=[http_socket])
+    return server.started
+
+
+def _worker_main(http_socket: socket.socket) -> None:
+    try:
+        started = asyncio.run(run_worker(http_socket))
+    except KeyboardInterrupt:
+        # uvicorn re-raises the SIGINT it handled, once the worker has drained
+        return
+
+    if not started:
+        raise SystemExit(3)
+
+
+class WorkerSupervisor:
+    """Starts, watches and restarts the worker processes."""
+
+    def __init__(
+            self,
+            logger: LoggerService,
+            worker_count: int = settings.auth_workers,
+            shutdown_timeout: float = settings.worker_shutdown_timeout,
+            min_uptime: float = 10,
+            max_restart_delay: float = 60
+    ):
+        """
+        Args:
+            logger: Logger service.
+            worker_count: Number of worker processes.
+            shutdown_timeout: Max time in seconds for the workers to drain after SIGTERM.
+            min_uptime: Workers that crash sooner than this (in seconds) are restarted with a growing delay.
+            max_restart_delay: Max delay in seconds between the restarts of a crashing worker.
+        """
+        self._logger = logger
+        self._worker_count = max(1, worker_count)
+        # Drain timeout of the workers plus some time to close the connections
+        self._shutdown_timeout = shutdown_timeout + 5
+        self._min_uptime = min_uptime
+        self._max_restart_delay = max_restart_delay
+
+        # 'spawn' gives every worker a clean interpreter without the supervisor's state
+        self._context = multiprocessing.get_context('spawn')
+        self._workers: list[Optional[BaseProcess]] = [None] * self._worker_count
+        self._started_at: list[float] = [0.0] * self._worker_count
+        self._restart_delay: list[float] = [0.0] * self._worker_count
+        self._restart_at: list[float] = [0.0] * self._worker_count
+        self._http_socket: Optional[socket.socket] = None
+        self._stopping = False
+
+    def run(self) -> None:
+        """
+        Runs the workers until SIGTERM/SIGINT is received, then drains them.
+
+        Raises:
+            ValueError: When the settings can't work with several workers.
+        """
+        if self._worker_count > 1 and settings.token_store_backend == 'memory':
+            # Every worker would only know its own refresh tokens and reject most of the refreshes
+            raise ValueError(
+                "TOKEN_STORE_BACKEND=memory keeps the refresh tokens per process. "
+                "Use TOKEN_STORE_BACKEND=sqlite with several workers, or set AUTH_WORKERS=1."
+            )
+
+        signal.signal(signal.SIGTERM, self._on_stop_signal)
+        signal.signal(signal.SIGINT, self._on_stop_signal)
+
+        if not settings.bcrypt_rounds:
+            # Workers calibrating on their own could pick different costs and rehash each other's hashes
+            from src.application.services.password_hasher import BcryptPasswordHasher
+            rounds = BcryptPasswordHasher.calibrated(
+                settings.password_hash_target_ms / 1000,
+                min_rounds=settings.bcrypt_min_rounds,
+                max_rounds=settings.bcrypt_max_rounds
+            ).rounds
+            os.environ['BCRYPT_ROUNDS'] = str(rounds)
+            self._logger.info("Calibrated bcrypt cost for the workers: %d.", rounds)
+
+        # Bound once, the workers accept the HTTP connections on the same socket
+        self._http_socket = uvicorn.Config('src.main:app', host=settings.http_host, port=settings.http_port).bind_socket()
+
+        self._logger.info("Starting %d Auth Service worker(s).", self._worker_count)
+        for index in range(self._worker_count):
+            self._start_worker(index)
+
+        while not self._stopping:
+            self._watch_workers()
+            time.sleep(0.5)
+
+        self._stop_workers()
+
+    def _on_stop_signal(self, signal_number: int, _frame) -> None:
+        self._logger.info("Received signal %d, stopping the workers.", signal_number)
+        self._stopping = True
+
+    def _start_worker(self, index: int) -> None:
+        worker = self._context.Process(target=_worker_main, args=(self._http_socket,), name=f'auth-worker-{index}')
+        worker.start()
+        self._workers[index] = worker
+        self._started_at[index] = time.monotonic()
+        self._logger.info("Started worker %d (pid %s).", index, worker.pid)
+
+    def _watch_workers(self) -> None:
+        """Restarts the workers that exited, delaying the restart of the ones that keep crashing."""
+        now = time.monotonic()
+        for index, worker in enumerate(self._workers):
+            if worker is not None and worker.is_alive():
+                continue
+
+            if worker is not None:
+                self._logger.error("Worker %d (pid %s) exited with code %s.", index, worker.pid, worker.exitcode)
+                worker.close()
+                self._workers[index] = None
+
+                if now - self._started_at[index] < self._min_uptime:
+                    self._restart_delay[index] = min(
+                        max(self._restart_delay[index] * 2, 1),
+                        self._max_restart_delay
+                    )
+                else:
+                    self._restart_delay[index] = 0
+
+                self._restart_at[index] = now + self._restart_delay[index]
+
+            if now >= self._restart_at[index]:
+                self._start_worker(index)
+
+    def _stop_workers(self) -> None:
+        """Sends SIGTERM to the workers and waits for them to drain, killing the ones that do not exit in time."""
+        workers = [worker for worker in self._workers if worker is not None]
+        for worker in workers:
+            if worker.is_alive():
+                worker.terminate()
+
+        deadline = time.monotonic() + self._shutdown_timeout
+        for worker in workers:
+            worker.join(max(0.0, deadline - time.monotonic()))
+            if worker.is_alive():
+                self._logger.warning("Worker %s (pid %s) did not stop in time, killing it.", worker.name, worker.pid)
+                worker.kill()
+                worker.join()
+
+        if self._http_socket is not None:
+            self._http_socket.close()
+        self._logger.info("All workers stopped.")
+
+
+if __name__ == "__main__":
+    WorkerSupervisor(logger=LoggerService(__name__, "auth_service_log.log")).run()
@@ -0,0 +1,74 @@
+import os
+
+# The settings are read when src.core.config is imported, set the required ones first
+os.environ.setdefault('JWT_PRIVATE_SECRET_KEY', 'test-secret-key-of-at-least-32-bytes')
+os.environ.setdefault('ALGORITHM', 'HS256')
+os.environ.setdefault('ACCESS_TOKEN_EXPIRE_MINUTES', '15')
+os.environ.setdefault('REFRESH_TOKEN_EXPIRE_DAYS', '30')
+os.environ.setdefault('RABBITMQ_PORT', '5672')
+
+import pytest
+
+from benchmarks.fake_broker import InMemoryConnectionManager
+from benchmarks.stub_user_service import StubUserService
+from src.application.services.password_hasher import BcryptPasswordHasher
+from src.core.logger import LoggerService
+from src.infrastructure.adapters.rabbitmq_user_adapter import RabbitMQUserAdapter
+from src.infrastructure.codecs import MessageCodecRegistry
+
+PASSWORD = 'correct horse battery staple'
+
+
+@pytest.fixture
+def anyio_backend():
+    return 'asyncio'
+
+
+@pytest.fixture(scope='session')
+def logger(tmp_path_factory) -> LoggerService:
+    return LoggerService('tests', 'tests_log.log', log_dir=str(tmp_path_factory.mktemp('logs')))
+
+
+@pytest.fixture
+def codecs() -> MessageCodecRegistry:
+    return MessageCodecRegistry()
+
+
+@pytest.fixture
+def connection_manager() -> InMemoryConnectionManager:
+    return InMemoryConnectionManager()
+
+
+@pytest.fixture
+def user_service(codecs) -> StubUserService:
+    """Stub User Service with 3 users ('user0@example.com', ...) sharing PASSWORD, hashed with a low bcrypt cost."""
+    service = StubUserService(codecs=codecs)
+    service.seed(3, PASSWORD, password_hasher=BcryptPasswordHasher(rounds=4))
+    return service
+
+
+@pytest.fixture
+def user_service_requests(user_service) -> list:
+    """Requests received by the stub User Service."""
+    requests = []
+    handle = user_service.handle
+
+    async def handle_and_record(request):
+        requests.append(request)
+        return await handle(request)
+
+    user_service.handle = handle_and_record
+    return requests
+
+
+@pytest.fixture
+async def user_adapter(logger, codecs, connection_manager, user_service):
+    """RabbitMQUserAdapter talking to the stub User Service through the in-memory broker, without batching."""
+    await user_service.serve(connection_manager)
+    yield RabbitMQUserAdapter(
+        logger=logger,
+        codecs=codecs,
+        connection_manager=connection_manager,
+        batching_enabled=False
+    )
+    await user_service.stop()
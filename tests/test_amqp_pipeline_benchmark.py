@@ -0,0 +1,54 @@
+import argparse
+import json
+
+import pytest
+
+from benchmarks import amqp_pipeline
+
+pytestmark = pytest.mark.anyio
+
+
+def _args(**overrides) -> argparse.Namespace:
+    parser = argparse.ArgumentParser()
+    amqp_pipeline.add_arguments(parser)
+    args = parser.parse_args([
+        '--concurrency', '1,4', '--duration', '0.1', '--bcrypt-rounds', '4', '--executor', 'thread',
+        '--user-service-latency-ms', '0', '--users', '8'
+    ])
+    vars(args).update(overrides)
+    return args
+
+
+def test_percentile():
+    values = [float(value) for value in range(1, 101)]
+
+    assert amqp_pipeline.percentile(values, 0.50) == 50
+    assert amqp_pipeline.percentile(values, 0.99) == 99
+    assert amqp_pipeline.percentile([], 0.99) == 0
+
+
+async def test_runs_every_operation_without_errors(capsys):
+    results = await amqp_pipeline.run(_args())
+
+    assert [(result['operation'], result['concurrency']) for result in results] == [
+        (operation_type, concurrency) for operation_type in amqp_pipeline.OPERATIONS for concurrency in (1, 4)
+    ]
+    assert all(result['requests'] > 0 and result['errors'] == 0 for result in results)
+
+
+def test_compare_flags_regressions(tmp_path, capsys):
+    baseline = tmp_path / 'baseline.json'
+    amqp_pipeline.write_results(str(baseline), 'amqp_pipeline', _args(), [
+        {"operation": 'login', "concurrency": 1, "p99_ms": 10.0, "messages_per_second": 100.0},
+        {"operation": 'refresh', "concurrency": 1, "p99_ms": 10.0, "messages_per_second": 100.0},
+    ])
+    assert json.loads(baseline.read_text())['parameters']['bcrypt_rounds'] == 4
+
+    within_budget = [{"operation": 'login', "concurrency": 1, "p99_ms": 10.5, "messages_per_second": 98.0}]
+    slower = [{"operation": 'refresh', "concurrency": 1, "p99_ms": 12.0, "messages_per_second": 100.0}]
+    fewer_messages = [{"operation": 'refresh', "concurrency": 1, "p99_ms": 10.0, "messages_per_second": 80.0}]
+
+    assert amqp_pipeline.compare(within_budget, str(baseline), max_regression=10)
+    assert not amqp_pipeline.compare(slower, str(baseline), max_regression=10)
+    assert not amqp_pipeline.compare(fewer_messages, str(baseline), max_regression=10)
+    assert 'REGRESSION' in capsys.readouterr().out
@@ -0,0 +1,77 @@
+import asyncio
+import threading
+
+import pytest
+
+from src.application.services.async_password_hasher import AsyncPasswordHasher
+from src.application.services.password_hasher import BcryptPasswordHasher
+from src.core.exceptions import AuthServiceError
+from src.domain.interfaces.password_hasher_interface import IPasswordHasher
+
+pytestmark = pytest.mark.anyio
+
+
+class BlockingPasswordHasher(IPasswordHasher):
+    """Hasher whose operations block their worker until released."""
+
+    def __init__(self):
+        self.released = threading.Event()
+
+    def hash(self, password: str) -> str:
+        self.released.wait(5)
+        return f'hashed:{password}'
+
+    def verify(self, plain_password: str, password_hash: str) -> bool:
+        self.released.wait(5)
+        return password_hash == f'hashed:{plain_password}'
+
+    def needs_rehash(self, password_hash: str) -> bool:
+        return False
+
+
+@pytest.mark.parametrize('executor_type', ['thread', 'process'])
+async def test_hash_and_verify_on_the_pool(executor_type):
+    hasher = AsyncPasswordHasher(BcryptPasswordHasher(rounds=4), executor_type=executor_type, max_workers=2)
+    await hasher.start()
+    try:
+        hashed_password = await hasher.hash('secret')
+
+        assert await hasher.verify('secret', hashed_password)
+        assert not await hasher.verify('wrong', hashed_password)
+    finally:
+        await hasher.shutdown()
+
+
+async def test_rejects_operations_beyond_the_queue_limit():
+    blocking_hasher = BlockingPasswordHasher()
+    hasher = AsyncPasswordHasher(blocking_hasher, executor_type='thread', max_workers=1, max_queue_size=1)
+    await hasher.start()
+    try:
+        running = [asyncio.create_task(hasher.hash(str(i))) for i in range(2)]
+        await asyncio.sleep(0.01)
+        assert hasher.pending == 2
+
+        with pytest.raises(AuthServiceError) as error:
+            await hasher.hash('rejected')
+        assert error.value.status_code == 503
+
+        blocking_hasher.released.set()
+        assert await asyncio.gather(*running) == ['hashed:0', 'hashed:1']
+        assert hasher.pending == 0
+    finally:
+        blocking_hasher.released.set()
+        await hasher.shutdown()
+
+
+async def test_rejects_operations_when_not_started():
+    hasher = AsyncPasswordHasher(BcryptPasswordHasher(rounds=4), executor_type='thread')
+
+    with pytest.raises(AuthServiceError) as error:
+        await hasher.hash('secret')
+
+    assert error.value.status_code == 503
+
+
+def test_unknown_executor_type():
+    with pytest.raises(ValueError):
+        AsyncPasswordHasher(BcryptPasswordHasher(rounds=4), executor_type='fiber')
@@ -0,0 +1,60 @@
+import pytest
+
+from src.core.cache import TTLCache
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr('src.core.cache.time.monotonic', lambda: now[0])
+    return now
+
+
+def test_returns_the_cached_value_until_it_expires(clock):
+    cache = TTLCache(max_size=10, ttl=5)
+    cache.set('key', 'value')
+
+    clock[0] += 4
+    assert cache.get('key') == 'value'
+    clock[0] += 1
+    assert cache.get('key') is None
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_entry_ttl_is_capped_by_the_cache_ttl(clock):
+    cache = TTLCache(max_size=10, ttl=5)
+    cache.set('short', 'value', ttl=1)
+    cache.set('long', 'value', ttl=60)
+    cache.set('expired', 'value', ttl=0)
+
+    clock[0] += 2
+    assert cache.get('short') is None
+    assert cache.get('long') == 'value'
+    assert cache.get('expired') is None
+    clock[0] += 3
+    assert cache.get('long') is None
+
+
+def test_evicts_the_least_recently_used_entry():
+    cache = TTLCache(max_size=2, ttl=60)
+    cache.set('a', 1)
+    cache.set('b', 2)
+    cache.get('a')
+
+    cache.set('c', 3)
+
+    assert len(cache) == 2
+    assert cache.get('b') is None
+    assert cache.get('a') == 1
+    assert cache.get('c') == 3
+
+
+def test_pop_and_clear():
+    cache = TTLCache(max_size=10, ttl=60)
+    cache.set('a', 1)
+    cache.set('b', 2)
+
+    assert cache.pop('a') == 1
+    assert cache.pop('a', 'missing') == 'missing'
+    cache.clear()
+    assert len(cache) == 0
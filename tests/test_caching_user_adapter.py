@@ -0,0 +1,101 @@
+import asyncio
+
+import aio_pika
+import pytest
+
+from benchmarks.fake_broker import InMemoryConnectionManager
+from src.infrastructure.adapters.caching_user_adapter import CachingUserAdapter
+from src.infrastructure.adapters.rabbitmq_user_events_listener import RabbitMQUserEventsListener
+from src.infrastructure.exceptions import UserServiceError
+
+pytestmark = pytest.mark.anyio
+
+EMAIL = 'user0@example.com'
+
+
+@pytest.fixture
+def caching_user_adapter(user_adapter) -> CachingUserAdapter:
+    return CachingUserAdapter(user_adapter=user_adapter, max_size=100, ttl=60)
+
+
+async def test_repeated_lookups_are_served_from_the_cache(caching_user_adapter, user_service_requests):
+    user = await caching_user_adapter.get_by_email(EMAIL, include_password_hash=True)
+    again = await caching_user_adapter.get_by_email(EMAIL, include_password_hash=True)
+    without_hash = await caching_user_adapter.get_by_email(EMAIL, include_password_hash=False)
+
+    assert again is user
+    assert not hasattr(without_hash, 'hashed_password')
+    assert len(user_service_requests) == 2
+
+
+async def test_concurrent_lookups_share_one_call(caching_user_adapter, user_service_requests):
+    users = await asyncio.gather(*(caching_user_adapter.get_by_email(EMAIL, include_password_hash=True) for _ in range(10)))
+
+    assert len({id(user) for user in users}) == 1
+    assert len(user_service_requests) == 1
+
+
+async def test_errors_are_not_cached(caching_user_adapter, user_service_requests):
+    for _ in range(2):
+        with pytest.raises(UserServiceError):
+            await caching_user_adapter.get_by_email('missing@example.com', include_password_hash=True)
+
+    assert len(user_service_requests) == 2
+
+
+async def test_invalidation_drops_the_user_under_all_its_identifiers(caching_user_adapter, user_service_requests):
+    user = await caching_user_adapter.get_by_email(EMAIL, include_password_hash=True)
+    await caching_user_adapter.get_by_phone_number(user.phone_number, include_password_hash=True)
+    await caching_user_adapter.get_by_id(user.id, include_password_hash=False)
+
+    caching_user_adapter.invalidate(email=EMAIL)
+    await caching_user_adapter.get_by_email(EMAIL, include_password_hash=True)
+    await caching_user_adapter.get_by_phone_number(user.phone_number, include_password_hash=True)
+    await caching_user_adapter.get_by_id(user.id, include_password_hash=False)
+
+    assert len(user_service_requests) == 6
+
+
+async def test_lookup_racing_an_invalidation_is_not_cached(caching_user_adapter, user_service, user_service_requests):
+    user_service._latency = 0.02
+    lookup = asyncio.create_task(caching_user_adapter.get_by_email(EMAIL, include_password_hash=True))
+    await asyncio.sleep(0.01)
+
+    caching_user_adapter.invalidate(email=EMAIL)
+    await lookup
+    await caching_user_adapter.get_by_email(EMAIL, include_password_hash=True)
+
+    assert len(user_service_requests) == 2
+
+
+async def test_password_hash_update_invalidates_the_user(caching_user_adapter, user_service_requests):
+    user = await caching_user_adapter.get_by_email(EMAIL, include_password_hash=True)
+
+    await caching_user_adapter.update_password_hash(user.id, 'new-hash')
+    updated = await caching_user_adapter.get_by_email(EMAIL, include_password_hash=True)
+
+    assert updated.hashed_password == 'new-hash'
+
+
+async def test_user_events_invalidate_the_cache(caching_user_adapter, user_service_requests, logger, codecs,
+                                                connection_manager: InMemoryConnectionManager):
+    events_listener = RabbitMQUserEventsListener(
+        user_cache=caching_user_adapter,
+        logger=logger,
+        codecs=codecs,
+        connection_manager=connection_manager,
+        exchange_name='USER-SERVICE-events.fanout'
+    )
+    await events_listener.start_listening()
+    user = await caching_user_adapter.get_by_email(EMAIL, include_password_hash=True)
+
+    exchange = connection_manager.broker.exchanges['USER-SERVICE-events.fanout']
+    await exchange.publish(
+        aio_pika.Message(body=codecs.default.encode({"event_type": 'user_updated', "user_id": str(user.id)})),
+        routing_key=''
+    )
+    await asyncio.sleep(0.01)
+    await caching_user_adapter.get_by_email(EMAIL, include_password_hash=True)
+
+    assert len(user_service_requests) == 2
+    await events_listener.stop_listening()
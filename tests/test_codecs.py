@@ -0,0 +1,60 @@
+import datetime
+import uuid
+
+import pytest
+
+from src.domain.schemas import RolesEnum
+from src.infrastructure.codecs import JSON_CONTENT_TYPE, MSGPACK_CONTENT_TYPE, JsonCodec, MessageCodecRegistry, \
+    MsgpackCodec, OrjsonCodec
+
+USER_ID = uuid.UUID('12345678-1234-5678-1234-567812345678')
+CREATED_AT = datetime.datetime(2025, 1, 2, 3, 4, 5, tzinfo=datetime.UTC)
+
+
+def _codec(codec_class):
+    if codec_class is OrjsonCodec:
+        pytest.importorskip('orjson')
+    if codec_class is MsgpackCodec:
+        pytest.importorskip('msgpack')
+    return codec_class()
+
+
+@pytest.mark.parametrize('codec_class', [JsonCodec, OrjsonCodec, MsgpackCodec])
+def test_round_trip_converts_the_non_primitive_values(codec_class):
+    codec = _codec(codec_class)
+
+    decoded = codec.decode(codec.encode({
+        "id": USER_ID,
+        "created_at": CREATED_AT,
+        "roles": [RolesEnum.USER],
+        "is_active": True,
+    }))
+
+    assert decoded == {
+        "id": str(USER_ID),
+        "created_at": CREATED_AT.isoformat(),
+        "roles": [RolesEnum.USER.value],
+        "is_active": True,
+    }
+
+
+@pytest.mark.parametrize('codec_class', [JsonCodec, OrjsonCodec])
+def test_json_codecs_are_interchangeable(codec_class):
+    codec = _codec(codec_class)
+
+    assert JsonCodec().decode(codec.encode({"a": [1, "b"]})) == {"a": [1, "b"]}
+    assert codec.decode(JsonCodec().encode({"a": [1, "b"]})) == {"a": [1, "b"]}
+
+
+@pytest.mark.parametrize('content_type', [None, '', 'text/plain', JSON_CONTENT_TYPE, 'application/json; charset=utf-8'])
+def test_registry_falls_back_to_json(content_type):
+    assert MessageCodecRegistry(JSON_CONTENT_TYPE).get(content_type).content_type == JSON_CONTENT_TYPE
+
+
+def test_registry_selects_msgpack_by_content_type():
+    pytest.importorskip('msgpack')
+    codecs = MessageCodecRegistry(MSGPACK_CONTENT_TYPE)
+
+    assert codecs.default.content_type == MSGPACK_CONTENT_TYPE
+    assert codecs.get(MSGPACK_CONTENT_TYPE).content_type == MSGPACK_CONTENT_TYPE
+    assert codecs.get('application/msgpack').content_type == MSGPACK_CONTENT_TYPE
@@ -0,0 +1,122 @@
+from types import SimpleNamespace
+
+import httpx
+import pytest
+from fastapi import FastAPI
+
+from src.application.services.jwt_service import JWTService
+from src.core.exceptions import AuthServiceError
+from src.core.middleware.exception_middleware import ExceptionMiddleware
+from src.core.ip_networks import IPNetworks
+from src.infrastructure.http import routes
+from src.infrastructure.http.routes import router
+
+pytestmark = pytest.mark.anyio
+
+CLIENT_IP = '203.0.113.7'
+
+
+class Result:
+    def __init__(self, payload: dict):
+        self.payload = payload
+
+    def to_dict(self) -> dict:
+        return self.payload
+
+
+class RecordingUseCase:
+    def __init__(self, error: Exception = None):
+        self.payloads = []
+        self._error = error
+
+    async def execute(self, payload: dict) -> Result:
+        self.payloads.append(payload)
+        if self._error is not None:
+            raise self._error
+        return Result({"received": sorted(payload)})
+
+
+@pytest.fixture
+def dependencies(codecs) -> SimpleNamespace:
+    return SimpleNamespace(
+        codecs=codecs,
+        jwt_service=JWTService(),
+        login_use_case=RecordingUseCase(),
+        refresh_use_case=RecordingUseCase(error=AuthServiceError(status_code=401, detail='Invalid token.')),
+        register_use_case=RecordingUseCase()
+    )
+
+
+@pytest.fixture
+def peer() -> str:
+    """Address of the connection the requests come from."""
+    return CLIENT_IP
+
+
+@pytest.fixture
+async def client(dependencies, peer, monkeypatch):
+    app = FastAPI()
+    app.include_router(router)
+    app.add_middleware(ExceptionMiddleware)
+    app.state.dependencies = dependencies
+    monkeypatch.setattr(routes, '_trusted_proxies', IPNetworks(['127.0.0.1/32', '10.0.0.0/8']))
+
+    transport = httpx.ASGITransport(app=app, client=(peer, 1234))
+    async with httpx.AsyncClient(transport=transport, base_url='http://testserver') as client:
+        yield client
+
+
+async def test_login_counts_failures_for_the_connection_address(client, dependencies):
+    response = await client.post('/auth/login', json={"email": 'user0@example.com', "password": 'x', "client_ip": '1.2.3.4'})
+
+    assert response.status_code == 200
+    assert response.json() == {"received": ['client_ip', 'email', 'password']}
+    assert dependencies.login_use_case.payloads[0]['client_ip'] == CLIENT_IP
+
+
+@pytest.mark.parametrize('peer, forwarded_for, client_ip', [
+    ('127.0.0.1', ['198.51.100.1, 10.0.0.5'], '198.51.100.1'),
+    ('127.0.0.1', ['192.0.2.1, 198.51.100.1', '10.0.0.5'], '198.51.100.1'),
+    ('127.0.0.1', [], None),
+    ('127.0.0.1', ['not-an-ip'], None),
+    (CLIENT_IP, ['198.51.100.1'], CLIENT_IP),
+])
+async def test_login_client_ip_behind_a_trusted_proxy(client, dependencies, forwarded_for, client_ip):
+    headers = [('x-forwarded-for', value) for value in forwarded_for]
+
+    await client.post('/auth/login', json={"email": 'user0@example.com', "password": 'x'}, headers=headers)
+
+    assert dependencies.login_use_case.payloads[0].get('client_ip') == client_ip
+
+
+async def test_register_passes_the_idempotency_key(client, dependencies):
+    response = await client.post('/auth/register', json={"email": 'new@example.com'}, headers={'Idempotency-Key': 'key-1'})
+
+    assert response.status_code == 201
+    assert dependencies.register_use_case.payloads[0]['idempotency_key'] == 'key-1'
+
+
+@pytest.mark.parametrize('body', [b'not json', b'[1, 2]'])
+async def test_rejects_a_body_that_is_not_a_json_object(client, dependencies, body):
+    response = await client.post('/auth/login', content=body)
+
+    assert response.status_code == 400
+    assert dependencies.login_use_case.payloads == []
+
+
+async def test_use_case_errors_become_json_responses(client):
+    response = await client.post('/auth/refresh', json={"refresh_token": 'token'})
+
+    assert response.status_code == 401
+    assert response.json() == {"success": False, "message": 'Invalid token.', "error_origin": 'Auth Service'}
+
+
+async def test_publishes_the_metrics_and_the_jwks(client):
+    await client.post('/auth/login', json={})
+
+    metrics = await client.get('/metrics')
+    jwks = await client.get('/.well-known/jwks.json')
+
+    assert 'auth_http_operations_total{operation_type="login",outcome="success"}' in metrics.text
+    assert jwks.json() == {"keys": []}
+    assert jwks.headers['cache-control'] == 'public, max-age=300'
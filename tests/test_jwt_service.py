@@ -0,0 +1,117 @@
+import uuid
+
+import pytest
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ed25519, rsa
+
+from src.application.exceptions import InvalidTokenError
+from src.application.services.jwt_service import JWTService
+from src.application.services.jwt_signing_keys import load_signing_key, load_verification_key
+from src.domain.schemas import RolesEnum
+
+USER_ID = uuid.uuid4()
+
+
+def _private_pem(private_key) -> str:
+    return private_key.private_bytes(
+        serialization.Encoding.PEM,
+        serialization.PrivateFormat.PKCS8,
+        serialization.NoEncryption()
+    ).decode()
+
+
+def _public_pem(private_key) -> str:
+    return private_key.public_key().public_bytes(
+        serialization.Encoding.PEM,
+        serialization.PublicFormat.SubjectPublicKeyInfo
+    ).decode()
+
+
+@pytest.fixture(scope='module')
+def rsa_private_key():
+    return rsa.generate_private_key(public_exponent=65537, key_size=2048)
+
+
+@pytest.fixture(params=['HS256', 'RS256', 'EdDSA'])
+def jwt_service(request, rsa_private_key) -> JWTService:
+    if request.param == 'HS256':
+        key_material = 'test-secret-key-of-at-least-32-bytes'
+    elif request.param == 'RS256':
+        key_material = _private_pem(rsa_private_key)
+    else:
+        key_material = _private_pem(ed25519.Ed25519PrivateKey.generate())
+    return JWTService(signing_key=load_signing_key(request.param, key_material), previous_keys=[])
+
+
+def test_issued_tokens_verify(jwt_service):
+    access_token = jwt_service.generate_access_token(USER_ID, [RolesEnum.USER])
+    refresh_token = jwt_service.generate_refresh_token(USER_ID, [RolesEnum.USER])
+
+    access_claims = jwt_service.verify(access_token, token_type='access')
+    refresh_claims = jwt_service.verify(refresh_token, token_type='refresh')
+
+    assert access_claims['sub'] == str(USER_ID)
+    assert access_claims['roles'] == [RolesEnum.USER.value]
+    assert refresh_claims['fid'] == refresh_claims['jti']
+    assert access_claims['jti'] != refresh_claims['jti']
+
+
+def test_rejects_the_wrong_token_type(jwt_service):
+    refresh_token = jwt_service.generate_refresh_token(USER_ID, [RolesEnum.USER])
+
+    with pytest.raises(InvalidTokenError):
+        jwt_service.verify(refresh_token, token_type='access')
+
+
+def test_rejects_an_expired_token(jwt_service):
+    access_token = jwt_service.generate_access_token(USER_ID, [RolesEnum.USER], expire_time_in_minutes=-1)
+
+    with pytest.raises(InvalidTokenError, match='expired'):
+        jwt_service.verify(access_token, token_type='access')
+
+
+def test_rejects_a_tampered_token(jwt_service):
+    header, payload, signature = jwt_service.generate_access_token(USER_ID, [RolesEnum.USER]).split('.')
+    other_payload = jwt_service.generate_access_token(uuid.uuid4(), [RolesEnum.CSS_ADMIN]).split('.')[1]
+
+    with pytest.raises(InvalidTokenError, match='signature'):
+        jwt_service.verify(f'{header}.{other_payload}.{signature}', token_type='access')
+
+
+@pytest.mark.parametrize('token', ['', 'abc', 'a.b.c', 'a.b.c.d', 'é.b.c'])
+def test_rejects_a_malformed_token(jwt_service, token):
+    with pytest.raises(InvalidTokenError):
+        jwt_service.verify(token, token_type='access')
+
+
+def test_symmetric_keys_are_not_published():
+    jwt_service = JWTService(signing_key=load_signing_key('HS256', 'test-secret-key-of-at-least-32-bytes'), previous_keys=[])
+
+    assert jwt_service.get_jwks() == {'keys': []}
+
+
+def test_jwks_publishes_the_current_and_previous_public_keys(rsa_private_key):
+    previous_private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    previous_service = JWTService(signing_key=load_signing_key('RS256', _private_pem(previous_private_key)), previous_keys=[])
+    token = previous_service.generate_access_token(USER_ID, [RolesEnum.USER])
+
+    jwt_service = JWTService(
+        signing_key=load_signing_key('RS256', _private_pem(rsa_private_key)),
+        previous_keys=[load_verification_key('RS256', _public_pem(previous_private_key))]
+    )
+
+    jwks = jwt_service.get_jwks()
+    assert [jwk['kty'] for jwk in jwks['keys']] == ['RSA', 'RSA']
+    assert {jwk['kid'] for jwk in jwks['keys']} == {
+        jwt_service._signing_key.kid, previous_service._signing_key.kid
+    }
+    # Tokens signed before the rotation are still accepted
+    assert jwt_service.verify(token, token_type='access')['sub'] == str(USER_ID)
+
+
+def test_rejects_a_token_of_an_unknown_key(rsa_private_key):
+    other_service = JWTService(signing_key=load_signing_key('EdDSA', _private_pem(ed25519.Ed25519PrivateKey.generate())), previous_keys=[])
+    jwt_service = JWTService(signing_key=load_signing_key('RS256', _private_pem(rsa_private_key)), previous_keys=[])
+
+    with pytest.raises(InvalidTokenError, match='unknown key'):
+        jwt_service.verify(other_service.generate_access_token(USER_ID, [RolesEnum.USER]), token_type='access')
@@ -0,0 +1,124 @@
+import json
+import logging
+import queue
+import threading
+import time
+
+import pytest
+
+from src.core.logger import BoundedQueueHandler, JsonFormatter, LoggerService, RepeatSuppressionFilter, \
+    SamplingFilter, _listeners
+
+
+def _record(message: str = 'message', level: int = logging.INFO, **fields) -> logging.LogRecord:
+    record = logging.LogRecord('tests', level, __file__, 0, message, (), None)
+    record.__dict__.update(fields)
+    return record
+
+
+def test_drops_records_when_the_queue_is_full_and_reports_them():
+    record_queue = queue.Queue(maxsize=2)
+    handler = BoundedQueueHandler(record_queue, overflow_policy='drop')
+
+    for i in range(5):
+        handler.handle(_record(f'message {i}'))
+    assert handler.dropped == 3
+
+    record_queue.get_nowait()
+    record_queue.get_nowait()
+    handler.handle(_record('message 5'))
+
+    records = [record_queue.get_nowait() for _ in range(record_queue.qsize())]
+    assert [record.getMessage() for record in records] == [
+        'message 5', 'Log queue was full, dropped 3 log record(s).'
+    ]
+    assert records[1].levelno == logging.WARNING
+
+
+def test_block_policy_waits_for_free_space():
+    record_queue = queue.Queue(maxsize=1)
+    handler = BoundedQueueHandler(record_queue, overflow_policy='block')
+    handler.handle(_record('first'))
+
+    writer = threading.Thread(target=handler.handle, args=(_record('second'),))
+    writer.start()
+    writer.join(0.05)
+    assert writer.is_alive()
+
+    assert record_queue.get().getMessage() == 'first'
+    writer.join(1)
+    assert record_queue.get_nowait().getMessage() == 'second'
+    assert handler.dropped == 0
+
+
+def test_unknown_overflow_policy():
+    with pytest.raises(ValueError):
+        BoundedQueueHandler(queue.Queue(), overflow_policy='spill')
+
+
+def test_records_are_written_by_the_background_thread(tmp_path):
+    logger = LoggerService('tests.background', 'background.log', log_dir=str(tmp_path), console_level=logging.CRITICAL)
+
+    logger.error("Failed to handle %s", 'request')
+    _listeners.pop('tests.background').stop()
+
+    assert (tmp_path / 'background.log').read_text().strip().endswith('tests.background: Failed to handle request')
+
+
+def test_json_lines_carry_the_structured_fields():
+    record = _record('Handled %s', event='request', latency_ms=1.5, correlation_id=None)
+    record.args = ('login',)
+
+    entry = json.loads(JsonFormatter().format(record))
+
+    assert entry['message'] == 'Handled login'
+    assert entry['level'] == 'INFO'
+    assert entry['event'] == 'request'
+    assert entry['latency_ms'] == 1.5
+    assert 'correlation_id' not in entry
+
+
+def test_sampling_keeps_warnings_and_unsampled_events():
+    sampling_filter = SamplingFilter({'request': 0})
+
+    assert not sampling_filter.filter(_record(event='request'))
+    assert sampling_filter.filter(_record(event='request', level=logging.WARNING))
+    assert sampling_filter.filter(_record(event='startup'))
+    assert sampling_filter.filter(_record())
+
+
+def test_repeats_are_suppressed_and_counted():
+    repeat_filter = RepeatSuppressionFilter(limit=2, window=0.05)
+
+    assert [repeat_filter.filter(_record('Failed')) for _ in range(5)] == [True, True, False, False, False]
+    assert repeat_filter.filter(_record('Other'))
+
+    time.sleep(0.06)
+    record = _record('Failed')
+    assert repeat_filter.filter(record)
+    assert record.suppressed_repeats == 3
+
+
+def test_repeat_suppression_tracks_a_bounded_number_of_templates():
+    repeat_filter = RepeatSuppressionFilter(limit=1, window=0.05, max_templates=2)
+
+    for message in ('a', 'b', 'c'):
+        assert repeat_filter.filter(_record(message))
+    assert list(repeat_filter._counters) == [(logging.INFO, 'b'), (logging.INFO, 'c')]
+    assert not repeat_filter.filter(_record('c'))
+
+    time.sleep(0.06)
+    assert repeat_filter.filter(_record('d'))
+    assert list(repeat_filter._counters) == [(logging.INFO, 'd')]
+
+
+def test_json_output(tmp_path):
+    logger = LoggerService('tests.json', 'json.log', log_dir=str(tmp_path), console_level=logging.CRITICAL,
+                           output_format='json')
+
+    logger.error("Failed to handle %s", 'request', event='request', status_code=500)
+    _listeners.pop('tests.json').stop()
+
+    entry = json.loads((tmp_path / 'json.log').read_text())
+    assert entry['message'] == 'Failed to handle request'
+    assert entry['status_code'] == 500
@@ -0,0 +1,122 @@
+import asyncio
+
+import pytest
+
+from src.application.exceptions import InvalidPasswordError, TooManyLoginAttemptsError
+from src.application.services.async_password_hasher import AsyncPasswordHasher
+from src.application.services.auth_service import AuthService
+from src.application.services.jwt_service import JWTService
+from src.application.services.login_throttler import LoginThrottler
+from src.application.services.password_hasher import BcryptPasswordHasher
+from src.application.services.session_token_service import SessionTokenService
+from src.application.use_cases.login import LoginUseCase
+from src.infrastructure.adapters.in_memory_login_attempt_store import InMemoryLoginAttemptStore
+from src.infrastructure.adapters.in_memory_token_store import InMemoryTokenStore
+from src.infrastructure.exceptions import UserServiceError
+from tests.conftest import PASSWORD
+
+pytestmark = pytest.mark.anyio
+
+EMAIL = 'user0@example.com'
+CLIENT_IP = '203.0.113.7'
+
+
+def _store(max_failures: int = 3, max_keys: int = 100) -> InMemoryLoginAttemptStore:
+    return InMemoryLoginAttemptStore(max_failures=max_failures, window=60, lockout=10, max_lockout=25, max_keys=max_keys)
+
+
+async def test_store_locks_out_after_the_max_failures_with_a_growing_lockout():
+    store = _store()
+
+    assert [await store.record_failure('key') for _ in range(5)] == [0, 0, 10, 20, 25]
+    assert 24 < await store.locked_for('key') <= 25
+    assert await store.locked_for('other') == 0
+
+
+async def test_store_reset_forgets_the_failures():
+    store = _store()
+    for _ in range(3):
+        await store.record_failure('key')
+
+    await store.reset('key')
+
+    assert await store.locked_for('key') == 0
+    assert await store.record_failure('key') == 0
+
+
+async def test_store_evicts_the_least_recently_failed_keys():
+    store = _store(max_keys=2)
+
+    for key in ('a', 'b', 'a', 'c'):
+        await store.record_failure(key)
+
+    assert len(store) == 2
+    assert list(store._attempts) == ['a', 'c']
+
+
+@pytest.fixture
+async def password_hasher():
+    password_hasher = AsyncPasswordHasher(BcryptPasswordHasher(rounds=4), executor_type='thread', max_workers=2)
+    await password_hasher.start()
+    yield password_hasher
+    await password_hasher.shutdown()
+
+
+@pytest.fixture
+def login_use_case(user_adapter, password_hasher, logger) -> LoginUseCase:
+    return LoginUseCase(
+        user_adapter=user_adapter,
+        session_token_service=SessionTokenService(jwt_service=JWTService(), token_store=InMemoryTokenStore(), logger=logger),
+        auth_service=AuthService(password_hasher=password_hasher),
+        logger=logger,
+        login_throttler=LoginThrottler(identifier_attempts=_store(), ip_attempts=_store(max_failures=5), logger=logger)
+    )
+
+
+async def _fail_login(login_use_case: LoginUseCase, email: str, client_ip: str = CLIENT_IP) -> None:
+    with pytest.raises((InvalidPasswordError, UserServiceError)):
+        await login_use_case.execute({"email": email, "password": 'wrong', "client_ip": client_ip})
+
+
+async def test_locked_out_identifier_is_rejected_before_the_user_service(login_use_case, user_service_requests):
+    for _ in range(3):
+        await _fail_login(login_use_case, EMAIL)
+    requests = len(user_service_requests)
+
+    with pytest.raises(TooManyLoginAttemptsError) as error:
+        await login_use_case.execute({"email": EMAIL.upper(), "password": PASSWORD, "client_ip": '198.51.100.1'})
+
+    assert error.value.status_code == 429
+    assert error.value.retry_after == 10
+    assert len(user_service_requests) == requests
+
+
+async def test_locked_out_client_ip_is_rejected_for_every_account(login_use_case):
+    for email in ('missing0@example.com', 'missing1@example.com', 'missing2@example.com', 'user1@example.com', 'user2@example.com'):
+        await _fail_login(login_use_case, email)
+
+    with pytest.raises(TooManyLoginAttemptsError):
+        await login_use_case.execute({"email": EMAIL, "password": PASSWORD, "client_ip": CLIENT_IP})
+
+    assert await login_use_case.execute({"email": EMAIL, "password": PASSWORD, "client_ip": '198.51.100.1'})
+
+
+async def test_successful_login_resets_the_identifier(login_use_case):
+    for _ in range(2):
+        await _fail_login(login_use_case, EMAIL)
+
+    await login_use_case.execute({"email": EMAIL, "password": PASSWORD})
+    for _ in range(2):
+        await _fail_login(login_use_case, EMAIL)
+
+    assert await login_use_case.execute({"email": EMAIL, "password": PASSWORD})
+
+
+async def test_identical_concurrent_failures_count_once(login_use_case):
+    credentials = {"email": EMAIL, "password": 'wrong', "client_ip": CLIENT_IP}
+
+    results = await asyncio.gather(*(login_use_case.execute(dict(credentials)) for _ in range(5)), return_exceptions=True)
+
+    assert all(isinstance(result, InvalidPasswordError) for result in results)
+    # 3 failures lock the identifier out, the 5 retries only counted as one
+    assert await login_use_case.execute({"email": EMAIL, "password": PASSWORD, "client_ip": CLIENT_IP})
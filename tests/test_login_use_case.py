@@ -0,0 +1,164 @@
+import asyncio
+from typing import Optional
+
+import pytest
+
+from src.application.exceptions import InvalidPasswordError
+from src.application.services.async_password_hasher import AsyncPasswordHasher
+from src.application.services.auth_service import AuthService
+from src.application.services.jwt_service import JWTService
+from src.application.services.password_hasher import BcryptPasswordHasher
+from src.application.services.session_token_service import SessionTokenService
+from src.application.use_cases.login import LoginUseCase
+from src.core.exceptions import AuthServiceError
+from src.core.single_flight import SingleFlight
+from src.infrastructure.adapters.in_memory_token_store import InMemoryTokenStore
+from src.infrastructure.exceptions import UserServiceError
+from tests.conftest import PASSWORD
+
+pytestmark = pytest.mark.anyio
+
+EMAIL = 'user0@example.com'
+
+
+class CountingPasswordHasher(BcryptPasswordHasher):
+    def __init__(self, rounds: Optional[int] = 4):
+        super().__init__(rounds=rounds)
+        self.verified = 0
+
+    def verify(self, plain_password: str, password_hash: str) -> bool:
+        self.verified += 1
+        return super().verify(plain_password, password_hash)
+
+
+@pytest.fixture
+def jwt_service() -> JWTService:
+    return JWTService()
+
+
+@pytest.fixture
+def blocking_password_hasher() -> CountingPasswordHasher:
+    return CountingPasswordHasher()
+
+
+@pytest.fixture
+async def password_hasher(blocking_password_hasher):
+    password_hasher = AsyncPasswordHasher(blocking_password_hasher, executor_type='thread', max_workers=2)
+    await password_hasher.start()
+    yield password_hasher
+    await password_hasher.shutdown()
+
+
+@pytest.fixture
+def login_options():
+    """Extra arguments of the login use case, changed by the tests before the use case fixture is used."""
+    return {}
+
+
+@pytest.fixture
+def login_use_case(user_adapter, password_hasher, jwt_service, logger, login_options) -> LoginUseCase:
+    return LoginUseCase(
+        user_adapter=user_adapter,
+        session_token_service=SessionTokenService(jwt_service=jwt_service, token_store=InMemoryTokenStore(), logger=logger),
+        auth_service=AuthService(password_hasher=password_hasher),
+        logger=logger,
+        **login_options
+    )
+
+
+async def test_issues_tokens_for_valid_credentials(login_use_case, jwt_service, user_service):
+    tokens = await login_use_case.execute({"email": EMAIL, "password": PASSWORD})
+
+    claims = jwt_service.verify(tokens.access_token, token_type='access')
+    assert claims['sub'] == user_service._ids_by_email[EMAIL]
+    assert jwt_service.verify(tokens.refresh_token, token_type='refresh')['sub'] == claims['sub']
+
+
+async def test_logs_in_by_phone_number(login_use_case, user_service):
+    user_id = user_service._ids_by_email[EMAIL]
+
+    tokens = await login_use_case.execute({"phone_number": user_service._users[user_id]['phone_number'], "password": PASSWORD})
+
+    assert tokens.access_token
+
+
+async def test_rejects_a_wrong_password(login_use_case):
+    with pytest.raises(InvalidPasswordError):
+        await login_use_case.execute({"email": EMAIL, "password": 'wrong'})
+
+
+async def test_rejects_an_unknown_user(login_use_case):
+    with pytest.raises(UserServiceError) as error:
+        await login_use_case.execute({"email": 'missing@example.com', "password": PASSWORD})
+
+    assert error.value.status_code == 404
+
+
+async def test_rejects_unknown_fields(login_use_case, user_service_requests):
+    with pytest.raises(AuthServiceError) as error:
+        await login_use_case.execute({"email": EMAIL, "password": PASSWORD, "remember_me": True})
+
+    assert error.value.status_code == 400
+    assert user_service_requests == []
+
+
+async def test_identical_concurrent_logins_share_the_authentication(login_use_case, blocking_password_hasher,
+                                                                    user_service_requests, jwt_service):
+    results = await asyncio.gather(*(login_use_case.execute({"email": EMAIL, "password": PASSWORD}) for _ in range(5)))
+
+    assert len(user_service_requests) == 1
+    assert blocking_password_hasher.verified == 1
+    # Every caller gets its own session
+    family_ids = {jwt_service.verify(tokens.refresh_token, token_type='refresh')['fid'] for tokens in results}
+    assert len(family_ids) == 5
+
+
+async def test_logins_with_different_passwords_are_not_shared(login_use_case, blocking_password_hasher):
+    results = await asyncio.gather(
+        login_use_case.execute({"email": EMAIL, "password": PASSWORD}),
+        login_use_case.execute({"email": EMAIL, "password": 'wrong'}),
+        return_exceptions=True
+    )
+
+    assert results[0].access_token
+    assert isinstance(results[1], InvalidPasswordError)
+    assert blocking_password_hasher.verified == 2
+
+
+async def test_single_flight_shares_results_and_errors():
+    single_flight = SingleFlight()
+    calls = []
+
+    async def call(value):
+        calls.append(value)
+        await asyncio.sleep(0.01)
+        if value == 'error':
+            raise ValueError(value)
+        return value
+
+    results = await asyncio.gather(
+        *(single_flight.do('a', lambda: call('a')) for _ in range(3)),
+        *(single_flight.do('error', lambda: call('error')) for _ in range(2)),
+        return_exceptions=True
+    )
+
+    assert results[:3] == ['a', 'a', 'a']
+    assert all(isinstance(result, ValueError) for result in results[3:])
+    assert calls == ['a', 'error']
+    assert single_flight.shared == 3
+    assert len(single_flight) == 0
+
+
+async def test_cancelled_caller_does_not_cancel_the_shared_call():
+    single_flight = SingleFlight()
+
+    async def call():
+        await asyncio.sleep(0.02)
+        return 'done'
+
+    first = asyncio.create_task(single_flight.do('key', call))
+    second = asyncio.create_task(single_flight.do('key', call))
+    await asyncio.sleep(0.01)
+    first.cancel()
+
+    assert await second == 'done'
@@ -0,0 +1,59 @@
+import pytest
+
+from src.core.metrics import MetricsRegistry
+
+
+@pytest.fixture
+def registry() -> MetricsRegistry:
+    return MetricsRegistry()
+
+
+def test_renders_counters_and_gauges(registry):
+    messages = registry.counter('messages_total', 'Processed messages.', ('operation_type',))
+    in_flight = registry.gauge('messages_in_flight', 'Messages being processed.')
+    messages.labels('login').inc()
+    messages.labels('login').inc(2)
+    messages.labels('say "hi"\n').inc()
+    in_flight.labels().set(3)
+    in_flight.labels().dec()
+
+    assert registry.render().splitlines() == [
+        '# HELP messages_total Processed messages.',
+        '# TYPE messages_total counter',
+        'messages_total{operation_type="login"} 3',
+        'messages_total{operation_type="say \\"hi\\"\\n"} 1',
+        '# HELP messages_in_flight Messages being processed.',
+        '# TYPE messages_in_flight gauge',
+        'messages_in_flight 2',
+    ]
+
+
+def test_renders_cumulative_histogram_buckets(registry):
+    latency = registry.histogram('latency_seconds', 'Latency.', ('operation_type',), buckets=(0.5, 0.1))
+    for value in (0.05, 0.1, 0.3, 2):
+        latency.labels('login').observe(value)
+
+    assert registry.render().splitlines()[2:] == [
+        'latency_seconds_bucket{operation_type="login",le="0.1"} 2',
+        'latency_seconds_bucket{operation_type="login",le="0.5"} 3',
+        'latency_seconds_bucket{operation_type="login",le="+Inf"} 4',
+        'latency_seconds_sum{operation_type="login"} 2.45',
+        'latency_seconds_count{operation_type="login"} 4',
+    ]
+
+
+def test_returns_the_registered_metric(registry):
+    counter = registry.counter('messages_total', 'Processed messages.', ('operation_type',))
+
+    assert registry.counter('messages_total', 'Processed messages.', ('operation_type',)) is counter
+    with pytest.raises(ValueError):
+        registry.gauge('messages_total', 'Processed messages.', ('operation_type',))
+    with pytest.raises(ValueError):
+        registry.counter('messages_total', 'Processed messages.')
+
+
+def test_rejects_wrong_label_values(registry):
+    counter = registry.counter('messages_total', 'Processed messages.', ('operation_type',))
+
+    with pytest.raises(ValueError):
+        counter.labels()
@@ -0,0 +1,120 @@
+import asyncio
+
+import pytest
+
+from src.core.micro_batcher import MicroBatcher
+from src.infrastructure.adapters.rabbitmq_user_adapter import RabbitMQUserAdapter
+from src.infrastructure.exceptions import UserServiceError
+
+pytestmark = pytest.mark.anyio
+
+
+class Loader:
+    def __init__(self, error: Exception = None):
+        self.batches = []
+        self._error = error
+
+    async def __call__(self, keys):
+        self.batches.append(keys)
+        await asyncio.sleep(0)
+        if self._error is not None:
+            raise self._error
+        return {key: key.upper() for key in keys if key != 'missing'}
+
+
+def _batcher(loader: Loader, max_batch_size: int = 10, max_delay: float = 0.01) -> MicroBatcher:
+    return MicroBatcher(loader, missing_error=KeyError, max_batch_size=max_batch_size, max_delay=max_delay)
+
+
+async def test_batches_the_keys_requested_within_the_window():
+    loader = Loader()
+    batcher = _batcher(loader)
+
+    results = await asyncio.gather(*(batcher.load(key) for key in ['a', 'b', 'a', 'c']))
+
+    assert results == ['A', 'B', 'A', 'C']
+    assert loader.batches == [['a', 'b', 'c']]
+
+
+async def test_sends_a_full_batch_right_away():
+    loader = Loader()
+    batcher = _batcher(loader, max_batch_size=2, max_delay=10)
+
+    results = await asyncio.wait_for(asyncio.gather(*(batcher.load(key) for key in 'abcd')), timeout=1)
+
+    assert results == ['A', 'B', 'C', 'D']
+    assert loader.batches == [['a', 'b'], ['c', 'd']]
+
+
+async def test_missing_key_fails_only_its_callers():
+    batcher = _batcher(Loader())
+
+    results = await asyncio.gather(batcher.load('a'), batcher.load('missing'), return_exceptions=True)
+
+    assert results[0] == 'A'
+    assert isinstance(results[1], KeyError)
+
+
+async def test_batch_error_fails_all_its_callers():
+    batcher = _batcher(Loader(error=ConnectionError('down')))
+
+    results = await asyncio.gather(batcher.load('a'), batcher.load('b'), return_exceptions=True)
+
+    assert all(isinstance(result, ConnectionError) for result in results)
+
+
+@pytest.fixture
+def batching_user_adapter(user_adapter, logger, codecs, connection_manager) -> RabbitMQUserAdapter:
+    """Adapter talking to the same stub User Service as `user_adapter`, with batching enabled."""
+    return RabbitMQUserAdapter(
+        logger=logger,
+        codecs=codecs,
+        connection_manager=connection_manager,
+        batching_enabled=True,
+        batch_max_size=10,
+        batch_max_delay_ms=5
+    )
+
+
+async def test_user_adapter_batches_lookups_by_email(batching_user_adapter, user_service_requests):
+    emails = ['user0@example.com', 'user1@example.com', 'user0@example.com', 'user2@example.com']
+
+    users = await asyncio.gather(*(batching_user_adapter.get_by_email(email, include_password_hash=True) for email in emails))
+
+    assert [user.email for user in users] == emails
+    assert all(user.hashed_password for user in users)
+    assert [request['operation_type'] for request in user_service_requests] == ['getManyByEmail']
+    assert sorted(user_service_requests[0]['user_emails']) == sorted(set(emails))
+
+
+async def test_user_adapter_batches_lookups_by_id(batching_user_adapter, user_service, user_service_requests):
+    user_ids = list(user_service._users)
+
+    users = await asyncio.gather(*(batching_user_adapter.get_by_id(user_id, include_password_hash=False) for user_id in user_ids))
+
+    assert [str(user.id) for user in users] == user_ids
+    assert [request['operation_type'] for request in user_service_requests] == ['getManyById']
+
+
+async def test_user_adapter_reports_a_missing_user_of_a_batch(batching_user_adapter):
+    results = await asyncio.gather(
+        batching_user_adapter.get_by_email('user0@example.com', include_password_hash=False),
+        batching_user_adapter.get_by_email('missing@example.com', include_password_hash=False),
+        return_exceptions=True
+    )
+
+    assert results[0].email == 'user0@example.com'
+    assert isinstance(results[1], UserServiceError)
+    assert results[1].status_code == 404
+
+
+async def test_user_adapter_matches_emails_of_a_batch_in_any_case(batching_user_adapter, user_service, user_service_requests):
+    await user_service.handle({"operation_type": "addUser", "email": 'Ada@Example.com', "phone_number": '+70000000100'})
+
+    users = await asyncio.gather(
+        batching_user_adapter.get_by_email('ada@example.com', include_password_hash=False),
+        batching_user_adapter.get_by_email(' ADA@example.com', include_password_hash=False)
+    )
+
+    assert [user.email for user in users] == ['Ada@Example.com', 'Ada@Example.com']
+    assert user_service_requests[-1]['user_emails'] == ['ada@example.com']
@@ -0,0 +1,84 @@
+import httpx
+import pytest
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+
+from src.application.exceptions import InvalidPasswordError, TooManyLoginAttemptsError
+from src.core.exceptions import AuthServiceError
+from src.core.middleware.clients_filter_middleware import IPFilterMiddleware
+from src.core.middleware.exception_middleware import ExceptionMiddleware
+from src.infrastructure.exceptions import UserServiceError
+
+pytestmark = pytest.mark.anyio
+
+ERRORS = {
+    'auth': AuthServiceError(status_code=400, detail='Bad request.'),
+    'user-service': UserServiceError(status_code=404, detail='User not found.'),
+    'password': InvalidPasswordError(),
+    'throttled': TooManyLoginAttemptsError(retry_after=30),
+    'bug': RuntimeError('bug'),
+}
+
+
+async def ok(_request):
+    return JSONResponse({"success": True})
+
+
+async def fail(request):
+    raise ERRORS[request.path_params['error']]
+
+
+@pytest.fixture
+def app():
+    app = Starlette(routes=[Route('/ok', ok), Route('/fail/{error}', fail)])
+    app.add_middleware(IPFilterMiddleware, allowed_networks=['127.0.0.1/32', '10.0.0.0/8'])
+    app.add_middleware(ExceptionMiddleware)
+    return app
+
+
+def _client(app, client_ip: str) -> httpx.AsyncClient:
+    transport = httpx.ASGITransport(app=app, client=(client_ip, 1234))
+    return httpx.AsyncClient(transport=transport, base_url='http://testserver')
+
+
+@pytest.mark.parametrize('client_ip', ['127.0.0.1', '10.1.2.3', '::ffff:10.1.2.3'])
+async def test_allows_the_clients_of_the_allowed_networks(app, client_ip):
+    async with _client(app, client_ip) as client:
+        response = await client.get('/ok')
+
+    assert response.status_code == 200
+
+
+@pytest.mark.parametrize('client_ip', ['192.168.1.1', '::1', 'not-an-ip'])
+async def test_rejects_the_other_clients(app, client_ip):
+    async with _client(app, client_ip) as client:
+        response = await client.get('/ok')
+
+    assert response.status_code == 403
+    assert response.json() == {
+        "success": False, "message": "Access denied: your IP is not allowed.", "error_origin": "Auth Service"
+    }
+
+
+@pytest.mark.parametrize('error, status_code, error_origin', [
+    ('auth', 400, 'Auth Service'),
+    ('user-service', 404, 'User Service'),
+    ('password', 401, 'Auth Service'),
+    ('bug', 500, 'Auth Service'),
+])
+async def test_maps_the_errors_to_json_responses(app, error, status_code, error_origin):
+    async with _client(app, '127.0.0.1') as client:
+        response = await client.get(f'/fail/{error}')
+
+    assert response.status_code == status_code
+    assert response.json()['success'] is False
+    assert response.json()['error_origin'] == error_origin
+
+
+async def test_lockout_response_has_a_retry_after_header(app):
+    async with _client(app, '127.0.0.1') as client:
+        response = await client.get('/fail/throttled')
+
+    assert response.status_code == 429
+    assert response.headers['retry-after'] == '30'
@@ -0,0 +1,57 @@
+import pytest
+
+from src.application.services.password_hasher import Argon2PasswordHasher, BcryptPasswordHasher, \
+    MultiAlgorithmPasswordHasher
+
+pytest.importorskip('argon2')
+
+
+@pytest.fixture
+def argon2_hasher() -> Argon2PasswordHasher:
+    return Argon2PasswordHasher(time_cost=1, memory_cost=1024)
+
+
+@pytest.fixture
+def bcrypt_hasher() -> BcryptPasswordHasher:
+    return BcryptPasswordHasher(rounds=4)
+
+
+def test_argon2_hashes_verify(argon2_hasher):
+    hashed_password = argon2_hasher.hash('secret')
+
+    assert hashed_password.startswith('$argon2id$')
+    assert argon2_hasher.verify('secret', hashed_password)
+    assert not argon2_hasher.verify('wrong', hashed_password)
+
+
+def test_argon2_hashes_of_other_parameters_need_a_rehash(argon2_hasher):
+    assert not argon2_hasher.needs_rehash(argon2_hasher.hash('secret'))
+    assert argon2_hasher.needs_rehash(Argon2PasswordHasher(time_cost=2, memory_cost=1024).hash('secret'))
+
+
+@pytest.mark.parametrize('password_hasher', ['argon2_hasher', 'bcrypt_hasher'])
+def test_corrupt_hash_fails_the_verification(password_hasher, request):
+    password_hasher = request.getfixturevalue(password_hasher)
+    hashed_password = password_hasher.hash('secret')
+
+    assert not password_hasher.verify('secret', hashed_password[:-10])
+    assert not password_hasher.verify('secret', 'not-a-hash')
+
+
+def test_multi_algorithm_hasher_verifies_both_algorithms(argon2_hasher, bcrypt_hasher):
+    password_hasher = MultiAlgorithmPasswordHasher(primary=argon2_hasher, others=[bcrypt_hasher])
+    bcrypt_hash = bcrypt_hasher.hash('secret')
+    argon2_hash = password_hasher.hash('secret')
+
+    assert argon2_hash.startswith('$argon2id$')
+    assert password_hasher.verify('secret', bcrypt_hash)
+    assert password_hasher.verify('secret', argon2_hash)
+    assert not password_hasher.verify('secret', '$unknown$hash')
+
+
+def test_multi_algorithm_hasher_moves_hashes_to_the_primary_algorithm(argon2_hasher, bcrypt_hasher):
+    password_hasher = MultiAlgorithmPasswordHasher(primary=argon2_hasher, others=[bcrypt_hasher])
+
+    assert password_hasher.needs_rehash(bcrypt_hasher.hash('secret'))
+    assert not password_hasher.needs_rehash(argon2_hasher.hash('secret'))
+    assert not password_hasher.needs_rehash('$unknown$hash')
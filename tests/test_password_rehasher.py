@@ -0,0 +1,102 @@
+import asyncio
+
+import pytest
+
+from src.application.services.async_password_hasher import AsyncPasswordHasher
+from src.application.services.auth_service import AuthService
+from src.application.services.jwt_service import JWTService
+from src.application.services.password_hasher import BcryptPasswordHasher
+from src.application.services.password_rehasher import PasswordRehasher
+from src.application.services.session_token_service import SessionTokenService
+from src.application.use_cases.login import LoginUseCase
+from src.infrastructure.adapters.in_memory_token_store import InMemoryTokenStore
+from tests.conftest import PASSWORD
+
+pytestmark = pytest.mark.anyio
+
+EMAIL = 'user0@example.com'
+
+
+@pytest.fixture
+async def password_hasher():
+    """Hasher with a higher cost than the hashes of the stub User Service users."""
+    password_hasher = AsyncPasswordHasher(BcryptPasswordHasher(rounds=5), executor_type='thread', max_workers=2)
+    await password_hasher.start()
+    yield password_hasher
+    await password_hasher.shutdown()
+
+
+@pytest.fixture
+async def password_rehasher(password_hasher, user_adapter, logger):
+    password_rehasher = PasswordRehasher(password_hasher, user_adapter, logger, max_pending=2)
+    yield password_rehasher
+    await password_rehasher.shutdown()
+
+
+async def _wait_for_rehashes(password_rehasher: PasswordRehasher) -> None:
+    await asyncio.gather(*password_rehasher._pending.values())
+
+
+def test_bcrypt_hashes_of_a_lower_cost_need_a_rehash():
+    password_hasher = BcryptPasswordHasher(rounds=5)
+
+    assert not password_hasher.needs_rehash(password_hasher.hash('secret'))
+    assert password_hasher.needs_rehash(BcryptPasswordHasher(rounds=4).hash('secret'))
+    # A host calibrated to a lower cost doesn't downgrade the hashes of the others
+    assert not password_hasher.needs_rehash(BcryptPasswordHasher(rounds=6).hash('secret'))
+    assert not password_hasher.needs_rehash('not-a-hash')
+
+
+def test_calibrated_cost_stays_within_the_bounds():
+    assert BcryptPasswordHasher.calibrated(target_seconds=0, min_rounds=4, max_rounds=6).rounds == 4
+    assert BcryptPasswordHasher.calibrated(target_seconds=60, min_rounds=4, max_rounds=6).rounds == 6
+
+
+async def test_saves_the_new_hash_through_the_user_service(password_rehasher, user_service):
+    user_id = user_service._ids_by_email[EMAIL]
+
+    assert password_rehasher.schedule(user_id, PASSWORD)
+    await _wait_for_rehashes(password_rehasher)
+
+    hashed_password = user_service._users[user_id]['hashed_password']
+    assert hashed_password.startswith('$2b$05$')
+    assert BcryptPasswordHasher().verify(PASSWORD, hashed_password)
+
+
+async def test_skips_pending_users_and_rehashes_over_the_limit(password_rehasher, user_service):
+    user_ids = list(user_service._users)
+
+    assert password_rehasher.schedule(user_ids[0], PASSWORD)
+    assert not password_rehasher.schedule(user_ids[0], PASSWORD)
+    assert password_rehasher.schedule(user_ids[1], PASSWORD)
+    assert not password_rehasher.schedule(user_ids[2], PASSWORD)
+
+    await _wait_for_rehashes(password_rehasher)
+    assert password_rehasher.schedule(user_ids[2], PASSWORD)
+
+
+async def test_failed_rehash_is_not_raised(password_rehasher, user_service):
+    user_service._users.clear()
+
+    assert password_rehasher.schedule('00000000-0000-0000-0000-000000000000', PASSWORD)
+    await _wait_for_rehashes(password_rehasher)
+
+    assert password_rehasher._pending == {}
+
+
+async def test_login_rehashes_an_outdated_hash(password_hasher, password_rehasher, user_adapter, user_service, logger):
+    login_use_case = LoginUseCase(
+        user_adapter=user_adapter,
+        session_token_service=SessionTokenService(jwt_service=JWTService(), token_store=InMemoryTokenStore(), logger=logger),
+        auth_service=AuthService(password_hasher=password_hasher),
+        logger=logger,
+        password_rehasher=password_rehasher
+    )
+    user_id = user_service._ids_by_email[EMAIL]
+
+    await login_use_case.execute({"email": EMAIL, "password": PASSWORD})
+    await _wait_for_rehashes(password_rehasher)
+    await login_use_case.execute({"email": EMAIL, "password": PASSWORD})
+
+    assert user_service._users[user_id]['hashed_password'].startswith('$2b$05$')
+    assert password_rehasher._pending == {}
@@ -0,0 +1,225 @@
+import asyncio
+from typing import List, Optional
+
+import aio_pika
+import pytest
+
+from benchmarks.amqp_pipeline import GatewayClient
+from src.infrastructure.adapters.rabbitmq_api_gateway_listener import RabbitMQApiGatewayListener
+from src.infrastructure.codecs import MSGPACK_CONTENT_TYPE, MessageCodecRegistry
+from src.infrastructure.exceptions import RabbitMQError, UserServiceError
+
+pytestmark = pytest.mark.anyio
+
+OPERATION_TYPES = ('login', 'refresh', 'register', 'verify', 'logout')
+
+
+class Result:
+    def __init__(self, body: dict):
+        self.body = body
+
+    def to_dict(self) -> dict:
+        return self.body
+
+
+class FakeUseCase:
+    """Use case answering with the data it got, after a delay, or failing with the given error."""
+
+    def __init__(self, delay: float = 0, error: Optional[Exception] = None):
+        self.delay = delay
+        self.error = error
+        self.calls: List[dict] = []
+        self.running = 0
+        self.max_running = 0
+
+    async def execute(self, data: dict) -> Result:
+        self.calls.append(data)
+        self.running += 1
+        self.max_running = max(self.max_running, self.running)
+        try:
+            await asyncio.sleep(self.delay)
+            if self.error is not None:
+                raise self.error
+            return Result(dict(data))
+        finally:
+            self.running -= 1
+
+
+class RecordingGatewayClient(GatewayClient):
+    """Keeps the reply messages, to check their properties."""
+
+    def __init__(self, *args):
+        super().__init__(*args)
+        self.replies = []
+
+    async def _on_reply(self, message) -> None:
+        self.replies.append(message)
+        await super()._on_reply(message)
+
+
+@pytest.fixture
+def use_cases():
+    return {operation_type: FakeUseCase() for operation_type in OPERATION_TYPES}
+
+
+@pytest.fixture
+def listener_options():
+    """Extra arguments of the listener, changed by the tests before the listener fixture is used."""
+    return {}
+
+
+@pytest.fixture
+async def listener(logger, codecs, connection_manager, use_cases, listener_options):
+    listener = RabbitMQApiGatewayListener(
+        **{f'{operation_type}_use_case': use_case for operation_type, use_case in use_cases.items()},
+        logger=logger,
+        codecs=codecs,
+        connection_manager=connection_manager,
+        **listener_options
+    )
+    await listener.start_listening()
+    yield listener
+    await listener.stop_listening(timeout=1)
+
+
+@pytest.fixture
+async def client(listener, connection_manager, codecs):
+    client = GatewayClient(connection_manager, codecs)
+    await client.start()
+    return client
+
+
+async def test_answers_with_the_use_case_result(client, use_cases):
+    reply = await client.call('refresh', {"refresh_token": 'token'})
+
+    assert reply['success']
+    assert reply['status_code'] == 200
+    assert reply['body'] == {"refresh_token": 'token'}
+    assert use_cases['refresh'].calls == [{"refresh_token": 'token'}]
+
+
+async def test_answers_with_the_codec_of_the_request(listener, connection_manager):
+    pytest.importorskip('msgpack')
+    client = RecordingGatewayClient(connection_manager, MessageCodecRegistry(MSGPACK_CONTENT_TYPE))
+    await client.start()
+
+    reply = await client.call('verify', {"tokens": ['token']})
+
+    assert reply['body'] == {"tokens": ['token']}
+    assert client.replies[0].content_type == MSGPACK_CONTENT_TYPE
+
+
+async def test_unknown_operation_type(client):
+    reply = await client.call('teleport', {})
+
+    assert reply['status_code'] == 404
+
+
+@pytest.mark.parametrize('listener_options', [{
+    "prefetch_count": 10,
+    "operation_concurrency_limits": {"login": 2}
+}])
+async def test_operation_concurrency_limit(client, use_cases, listener):
+    use_cases['login'].delay = 0.05
+
+    logins = [asyncio.create_task(client.call('login', {"email": str(i)})) for i in range(6)]
+    await asyncio.sleep(0.01)
+    # Slow logins waiting for their limit don't hold up the other operations
+    refresh_reply = await client.call('refresh', {"refresh_token": 'token'})
+
+    assert refresh_reply['success']
+    assert not all(login.done() for login in logins)
+    replies = await asyncio.gather(*logins)
+    assert all(reply['success'] for reply in replies)
+    assert use_cases['login'].max_running == 2
+
+
+@pytest.mark.parametrize('listener_options', [{"prefetch_count": 3}])
+@pytest.mark.parametrize('use_cases', [dict.fromkeys(OPERATION_TYPES, FakeUseCase(delay=0.02))])
+async def test_prefetch_count_bounds_the_messages_in_flight(client, use_cases, listener):
+    replies = await asyncio.gather(*(client.call(operation_type, {}) for operation_type in ['login', 'refresh', 'verify'] * 3))
+
+    assert all(reply['success'] for reply in replies)
+    assert use_cases['login'].max_running == 3
+
+
+@pytest.mark.parametrize('prefetch_count, warned', [(10, True), (16, False)])
+def test_warns_when_the_limits_exceed_the_prefetch_count(logger, codecs, connection_manager, use_cases, caplog,
+                                                        prefetch_count, warned):
+    RabbitMQApiGatewayListener(
+        **{f'{operation_type}_use_case': use_case for operation_type, use_case in use_cases.items()},
+        logger=logger,
+        codecs=codecs,
+        connection_manager=connection_manager,
+        prefetch_count=prefetch_count,
+        operation_concurrency_limits={"login": 8, "refresh": 8, "unknown": 100}
+    )
+
+    assert any('above the prefetch count' in record.getMessage() for record in caplog.records) == warned
+
+
+async def test_stop_listening_drains_the_messages_in_flight(client, use_cases, listener):
+    use_cases['login'].delay = 0.05
+    reply = asyncio.create_task(client.call('login', {}))
+    await asyncio.sleep(0.01)
+
+    await listener.stop_listening(timeout=1)
+
+    assert (await reply)['success']
+
+
+def _dead_lettered(connection_manager) -> List[dict]:
+    """Headers of the messages in the dead-letter queue."""
+    messages = connection_manager.broker.queues['AUTH.all.dead-letter']._messages
+    return [messages.get_nowait()[0].headers for _ in range(messages.qsize())]
+
+
+async def test_malformed_message_is_dead_lettered(client, connection_manager, use_cases):
+    reply = asyncio.get_running_loop().create_future()
+    client._pending['malformed'] = reply
+    await client._exchange.publish(
+        aio_pika.Message(body=b'not json', content_type='application/json', correlation_id='malformed',
+                         reply_to=client._reply_queue_name),
+        routing_key='AUTH.all'
+    )
+
+    assert (await reply)['status_code'] == 400
+    assert _dead_lettered(connection_manager)[0]['x-auth-failure-class'] == 'malformed'
+
+
+@pytest.mark.parametrize('listener_options', [{"max_attempts": 3, "retry_delay_ms": 1}])
+@pytest.mark.parametrize('error, status_code', [(RabbitMQError(), 503), (UserServiceError(status_code=504), 504)])
+async def test_unavailable_dependency_is_retried_then_dead_lettered(client, connection_manager, use_cases, error, status_code):
+    use_cases['login'].error = error
+
+    reply = await client.call('login', {"email": 'user0@example.com'})
+
+    assert reply['status_code'] == status_code
+    assert len(use_cases['login'].calls) == 3
+    dead_lettered = _dead_lettered(connection_manager)
+    assert len(dead_lettered) == 1
+    assert dead_lettered[0]['x-auth-failure-class'] == 'unavailable'
+    assert dead_lettered[0]['x-auth-attempt'] == 3
+
+
+@pytest.mark.parametrize('listener_options', [{"max_attempts": 3, "retry_delay_ms": 1}])
+async def test_user_service_rejection_is_answered_without_retry(client, connection_manager, use_cases):
+    use_cases['login'].error = UserServiceError(status_code=404, detail='User not found.')
+
+    reply = await client.call('login', {"email": 'missing@example.com'})
+
+    assert reply['status_code'] == 404
+    assert reply['error_origin'] == 'User Service'
+    assert len(use_cases['login'].calls) == 1
+    assert _dead_lettered(connection_manager) == []
+
+
+@pytest.mark.parametrize('listener_options', [{"max_attempts": 3, "retry_delay_ms": 1}])
+async def test_unhandled_error_is_dead_lettered_without_retry(client, connection_manager, use_cases):
+    use_cases['login'].error = RuntimeError('bug')
+
+    reply = await client.call('login', {"email": 'user0@example.com'})
+
+    assert reply['status_code'] == 500
+    assert len(use_cases['login'].calls) == 1
+    assert _dead_lettered(connection_manager)[0]['x-auth-failure-class'] == 'unhandled'
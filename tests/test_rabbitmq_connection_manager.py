@@ -0,0 +1,122 @@
+import asyncio
+
+import aio_pika
+import pytest
+
+from src.infrastructure.exceptions import RabbitMQError
+from src.infrastructure.rabbitmq_connection_manager import RabbitMQConnectionManager
+
+pytestmark = pytest.mark.anyio
+
+
+class FakeChannel:
+    def __init__(self, publisher_confirms: bool):
+        self.publisher_confirms = publisher_confirms
+        self.is_closed = False
+
+    async def close(self) -> None:
+        self.is_closed = True
+
+
+class FakeConnection:
+    def __init__(self):
+        self.is_closed = False
+        self.close_callbacks = set()
+        self.reconnect_callbacks = set()
+        self.channels = []
+
+    async def channel(self, publisher_confirms: bool = False) -> FakeChannel:
+        channel = FakeChannel(publisher_confirms)
+        self.channels.append(channel)
+        return channel
+
+    async def close(self) -> None:
+        self.is_closed = True
+
+
+@pytest.fixture
+def connections(monkeypatch):
+    """Connections opened through aio_pika.connect_robust()."""
+    connections = []
+
+    async def connect_robust(*_args, **_kwargs):
+        await asyncio.sleep(0)
+        connections.append(FakeConnection())
+        return connections[-1]
+
+    monkeypatch.setattr(aio_pika, 'connect_robust', connect_robust)
+    return connections
+
+
+@pytest.fixture
+def connection_manager(logger):
+    return RabbitMQConnectionManager(
+        logger=logger,
+        url='amqp://localhost',
+        channel_pool_sizes={'responses': 2},
+        publisher_confirms_workloads={'rpc'}
+    )
+
+
+async def test_connects_once_per_process(connection_manager, connections):
+    results = await asyncio.gather(*(connection_manager.connect() for _ in range(5)))
+
+    assert len(connections) == 1
+    assert all(connection is connections[0] for connection in results)
+
+
+async def test_reconnects_a_closed_connection(connection_manager, connections):
+    await connection_manager.connect()
+    connections[0].is_closed = True
+
+    assert await connection_manager.connect() is connections[1]
+
+
+async def test_registers_the_callbacks_on_the_connection(connection_manager, connections):
+    def before(*_args):
+        pass
+
+    def after(*_args):
+        pass
+
+    connection_manager.add_close_callback(before)
+    await connection_manager.connect()
+    connection_manager.add_reconnect_callback(after)
+
+    assert connections[0].close_callbacks == {before}
+    assert connections[0].reconnect_callbacks == {after}
+
+
+async def test_pools_the_publishing_channels_per_workload(connection_manager, connections):
+    async def publish(workload: str) -> FakeChannel:
+        async with connection_manager.acquire_channel(workload) as channel:
+            await asyncio.sleep(0.01)
+            return channel
+
+    responses_channels = await asyncio.gather(*(publish('responses') for _ in range(6)))
+    rpc_channel = await publish('rpc')
+
+    assert len({id(channel) for channel in responses_channels}) == 2
+    assert not any(channel.publisher_confirms for channel in responses_channels)
+    assert rpc_channel.publisher_confirms
+    assert len(connections[0].channels) == 3
+
+
+async def test_close_closes_the_channels_and_the_connection(connection_manager, connections):
+    async with connection_manager.acquire_channel('responses'):
+        pass
+
+    await connection_manager.close()
+
+    assert all(channel.is_closed for channel in connections[0].channels)
+    assert connections[0].is_closed
+
+
+async def test_unavailable_broker(connection_manager, monkeypatch):
+    async def connect_robust(*_args, **_kwargs):
+        raise aio_pika.exceptions.AMQPConnectionError()
+
+    monkeypatch.setattr(aio_pika, 'connect_robust', connect_robust)
+
+    with pytest.raises(RabbitMQError):
+        await connection_manager.connect()
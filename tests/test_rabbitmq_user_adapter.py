@@ -0,0 +1,47 @@
+import asyncio
+
+import pytest
+
+from src.infrastructure.exceptions import RabbitMQError, UserServiceError
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_concurrent_calls_share_one_reply_queue(user_adapter, connection_manager):
+    emails = [f'user{i % 3}@example.com' for i in range(30)]
+
+    users = await asyncio.gather(*(user_adapter.get_by_email(email, include_password_hash=False) for email in emails))
+
+    assert [user.email for user in users] == emails
+    reply_queues = [name for name in connection_manager.broker.queues if name.startswith('from-USER-SERVICE')]
+    assert len(reply_queues) == 1
+    assert user_adapter._pending_responses == {}
+
+
+async def test_user_service_error_is_raised(user_adapter):
+    with pytest.raises(UserServiceError) as error:
+        await user_adapter.get_by_email('missing@example.com', include_password_hash=False)
+
+    assert error.value.status_code == 404
+
+
+async def test_timed_out_call_forgets_its_reply(user_adapter, user_service):
+    user_service._latency = 0.05
+
+    with pytest.raises(UserServiceError) as error:
+        await user_adapter._make_rpc_call('getByEmail', {"user_email": 'user0@example.com'}, timeout=0.01)
+    await asyncio.sleep(0.1)
+
+    assert error.value.status_code == 504
+    assert user_adapter._pending_responses == {}
+
+
+async def test_lost_connection_fails_pending_calls(user_adapter, user_service):
+    user_service._latency = 1
+    call = asyncio.create_task(user_adapter.get_by_email('user0@example.com', include_password_hash=False))
+    await asyncio.sleep(0.01)
+
+    user_adapter._on_connection_closed()
+
+    with pytest.raises(RabbitMQError):
+        await call
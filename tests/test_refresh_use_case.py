@@ -0,0 +1,69 @@
+import uuid
+
+import pytest
+
+from src.application.exceptions import InvalidTokenError
+from src.application.services.jwt_service import JWTService
+from src.application.services.session_token_service import SessionTokenService
+from src.application.use_cases.refresh import RefreshUseCase
+from src.domain.schemas import RolesEnum
+from src.infrastructure.adapters.in_memory_token_store import InMemoryTokenStore
+
+pytestmark = pytest.mark.anyio
+
+USER_ID = uuid.uuid4()
+
+
+@pytest.fixture
+def jwt_service() -> JWTService:
+    return JWTService()
+
+
+@pytest.fixture
+def session_token_service(jwt_service, logger) -> SessionTokenService:
+    return SessionTokenService(jwt_service=jwt_service, token_store=InMemoryTokenStore(), logger=logger)
+
+
+@pytest.fixture
+def refresh_use_case(jwt_service, session_token_service, logger) -> RefreshUseCase:
+    return RefreshUseCase(jwt_service=jwt_service, session_token_service=session_token_service, logger=logger)
+
+
+async def test_exchanges_a_refresh_token_for_new_tokens(refresh_use_case, session_token_service, jwt_service):
+    tokens = await session_token_service.issue_tokens(USER_ID, [RolesEnum.USER])
+
+    new_tokens = await refresh_use_case.execute({"refresh_token": tokens.refresh_token})
+
+    claims = jwt_service.verify(new_tokens.refresh_token, token_type='refresh')
+    assert claims['sub'] == str(USER_ID)
+    assert claims['fid'] == jwt_service.verify(tokens.refresh_token, token_type='refresh')['fid']
+    assert jwt_service.verify(new_tokens.access_token, token_type='access')['roles'] == [RolesEnum.USER.value]
+
+
+@pytest.mark.parametrize('payload', [{}, {"refresh_token": ''}, {"refresh_token": 'not-a-token'}])
+async def test_rejects_a_missing_or_malformed_token(refresh_use_case, payload):
+    with pytest.raises(InvalidTokenError):
+        await refresh_use_case.execute(payload)
+
+
+async def test_rejects_an_access_token(refresh_use_case, session_token_service):
+    tokens = await session_token_service.issue_tokens(USER_ID, [RolesEnum.USER])
+
+    with pytest.raises(InvalidTokenError):
+        await refresh_use_case.execute({"refresh_token": tokens.access_token})
+
+
+async def test_rejects_a_token_with_a_forged_signature(refresh_use_case, session_token_service):
+    tokens = await session_token_service.issue_tokens(USER_ID, [RolesEnum.USER])
+    forged = tokens.refresh_token[:-4] + ('AAAA' if not tokens.refresh_token.endswith('AAAA') else 'BBBB')
+
+    with pytest.raises(InvalidTokenError):
+        await refresh_use_case.execute({"refresh_token": forged})
+
+
+async def test_rejects_an_unknown_refresh_token(refresh_use_case, jwt_service):
+    # Validly signed, but never recorded by the session token service
+    refresh_token = jwt_service.generate_refresh_token(USER_ID, [RolesEnum.USER])
+
+    with pytest.raises(InvalidTokenError):
+        await refresh_use_case.execute({"refresh_token": refresh_token})
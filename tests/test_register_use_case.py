@@ -0,0 +1,116 @@
+import asyncio
+
+import pytest
+
+from src.application.services.async_password_hasher import AsyncPasswordHasher
+from src.application.services.password_hasher import BcryptPasswordHasher
+from src.application.use_cases.register import RegisterUseCase
+from src.core.exceptions import AuthServiceError
+from src.domain.schemas import RolesEnum
+from src.infrastructure.exceptions import UserServiceError
+
+pytestmark = pytest.mark.anyio
+
+
+def _user_data(**overrides) -> dict:
+    user_data = {
+        "first_name": 'Ada',
+        "last_name": 'Lovelace',
+        "email": 'ada@example.com',
+        "phone_number": '+79990000000',
+        "roles": [RolesEnum.USER.value],
+        "password": 'secret',
+    }
+    user_data.update(overrides)
+    return user_data
+
+
+@pytest.fixture
+async def password_hasher():
+    password_hasher = AsyncPasswordHasher(BcryptPasswordHasher(rounds=4), executor_type='thread', max_workers=2)
+    await password_hasher.start()
+    yield password_hasher
+    await password_hasher.shutdown()
+
+
+@pytest.fixture
+def register_use_case(user_adapter, password_hasher, logger) -> RegisterUseCase:
+    return RegisterUseCase(user_adapter=user_adapter, password_hasher=password_hasher, logger=logger)
+
+
+async def test_registers_the_user_with_a_hashed_password(register_use_case, user_service):
+    user = await register_use_case.execute(_user_data())
+
+    stored_user = user_service._users[str(user.id)]
+    assert user.email == 'ada@example.com'
+    assert BcryptPasswordHasher().verify('secret', stored_user['hashed_password'])
+
+
+@pytest.mark.parametrize('user_data, detail', [
+    ({key: value for key, value in _user_data().items() if key != 'email'}, 'Missing required fields: email.'),
+    ({key: value for key, value in _user_data().items() if key != 'password'}, 'Missing required fields: password.'),
+    (_user_data(nickname='ada'), 'Unknown fields: nickname.'),
+    (_user_data(hashed_password='$2b$04$forged'), 'Unknown fields: hashed_password.'),
+    (_user_data(password=''), 'Password must be a non-empty string.'),
+    (_user_data(password=42), 'Password must be a non-empty string.'),
+])
+async def test_rejects_invalid_user_data_before_hashing(register_use_case, user_service_requests, user_data, detail):
+    with pytest.raises(AuthServiceError) as error:
+        await register_use_case.execute(user_data)
+
+    assert error.value.status_code == 400
+    assert error.value.detail == detail
+    assert user_service_requests == []
+
+
+async def test_repeated_idempotency_key_returns_the_created_user(register_use_case, user_service_requests):
+    results = await asyncio.gather(
+        register_use_case.execute(_user_data(idempotency_key='key-1')),
+        register_use_case.execute(_user_data(idempotency_key='key-1'))
+    )
+    replayed = await register_use_case.execute(_user_data(idempotency_key='key-1'))
+
+    assert results[0].id == results[1].id == replayed.id
+    assert len(user_service_requests) == 1
+
+
+async def test_idempotency_key_reused_for_other_data(register_use_case):
+    await register_use_case.execute(_user_data(idempotency_key='key-1'))
+
+    with pytest.raises(AuthServiceError) as error:
+        await register_use_case.execute(_user_data(idempotency_key='key-1', first_name='Grace'))
+
+    assert error.value.status_code == 422
+
+
+async def test_concurrent_registration_with_the_same_key_and_other_data(register_use_case, user_service_requests):
+    results = await asyncio.gather(
+        register_use_case.execute(_user_data(idempotency_key='key-1')),
+        register_use_case.execute(_user_data(idempotency_key='key-1', first_name='Grace')),
+        return_exceptions=True
+    )
+
+    assert results[0].email == 'ada@example.com'
+    assert isinstance(results[1], AuthServiceError)
+    assert results[1].status_code == 409
+    assert len(user_service_requests) == 1
+    assert register_use_case._in_flight_fingerprints == {}
+
+
+async def test_fingerprints_are_keyed(register_use_case, logger):
+    other_use_case = RegisterUseCase(user_adapter=None, password_hasher=None, logger=logger)
+
+    assert register_use_case._fingerprint(_user_data()) == register_use_case._fingerprint(_user_data())
+    assert register_use_case._fingerprint(_user_data()) != other_use_case._fingerprint(_user_data())
+
+
+async def test_failed_registration_can_be_retried(register_use_case, user_service):
+    await register_use_case.execute(_user_data())
+
+    with pytest.raises(UserServiceError):
+        await register_use_case.execute(_user_data(idempotency_key='key-1'))
+    user_service._users.clear()
+    user_service._ids_by_email.clear()
+    user_service._ids_by_phone_number.clear()
+
+    assert (await register_use_case.execute(_user_data(idempotency_key='key-1'))).email == 'ada@example.com'
@@ -0,0 +1,86 @@
+import uuid
+
+import pytest
+
+from src.application.exceptions import InvalidTokenError, TokenReuseError
+from src.application.services.jwt_service import JWTService
+from src.application.services.session_token_service import SessionTokenService
+from src.application.use_cases.logout import LogoutUseCase
+from src.domain.schemas import RolesEnum
+from src.infrastructure.adapters.in_memory_token_store import InMemoryTokenStore
+
+pytestmark = pytest.mark.anyio
+
+USER_ID = uuid.uuid4()
+
+
+@pytest.fixture
+def jwt_service() -> JWTService:
+    return JWTService()
+
+
+@pytest.fixture
+def session_token_service(jwt_service, logger) -> SessionTokenService:
+    return SessionTokenService(jwt_service=jwt_service, token_store=InMemoryTokenStore(), logger=logger)
+
+
+@pytest.fixture
+def logout_use_case(jwt_service, session_token_service, logger) -> LogoutUseCase:
+    return LogoutUseCase(jwt_service=jwt_service, session_token_service=session_token_service, logger=logger)
+
+
+async def _rotate(session_token_service, jwt_service, refresh_token: str):
+    return await session_token_service.rotate(jwt_service.verify(refresh_token, token_type='refresh'))
+
+
+async def test_rotation_keeps_the_session(session_token_service, jwt_service):
+    tokens = await session_token_service.issue_tokens(USER_ID, [RolesEnum.USER])
+
+    rotated = await _rotate(session_token_service, jwt_service, tokens.refresh_token)
+    rotated_again = await _rotate(session_token_service, jwt_service, rotated.refresh_token)
+
+    family_ids = {jwt_service.verify(token.refresh_token, token_type='refresh')['fid'] for token in (tokens, rotated, rotated_again)}
+    assert len(family_ids) == 1
+
+
+async def test_reused_refresh_token_revokes_the_session(session_token_service, jwt_service):
+    tokens = await session_token_service.issue_tokens(USER_ID, [RolesEnum.USER])
+    other_session = await session_token_service.issue_tokens(USER_ID, [RolesEnum.USER])
+    rotated = await _rotate(session_token_service, jwt_service, tokens.refresh_token)
+
+    with pytest.raises(TokenReuseError):
+        await _rotate(session_token_service, jwt_service, tokens.refresh_token)
+    # The legitimate holder of the session is logged out too, other sessions are not
+    with pytest.raises(InvalidTokenError, match='revoked'):
+        await _rotate(session_token_service, jwt_service, rotated.refresh_token)
+    await _rotate(session_token_service, jwt_service, other_session.refresh_token)
+
+
+async def test_logout_revokes_the_session(logout_use_case, session_token_service, jwt_service):
+    tokens = await session_token_service.issue_tokens(USER_ID, [RolesEnum.USER])
+    other_session = await session_token_service.issue_tokens(USER_ID, [RolesEnum.USER])
+
+    response = await logout_use_case.execute({"refresh_token": tokens.refresh_token})
+
+    assert response.revoked == 1
+    with pytest.raises(InvalidTokenError):
+        await _rotate(session_token_service, jwt_service, tokens.refresh_token)
+    await _rotate(session_token_service, jwt_service, other_session.refresh_token)
+
+
+async def test_logout_of_all_sessions(logout_use_case, session_token_service, jwt_service):
+    tokens = await session_token_service.issue_tokens(USER_ID, [RolesEnum.USER])
+    other_session = await session_token_service.issue_tokens(USER_ID, [RolesEnum.USER])
+
+    response = await logout_use_case.execute({"refresh_token": tokens.refresh_token, "all_sessions": True})
+
+    assert response.revoked == 2
+    with pytest.raises(InvalidTokenError):
+        await _rotate(session_token_service, jwt_service, other_session.refresh_token)
+
+
+async def test_logout_requires_a_valid_refresh_token(logout_use_case):
+    with pytest.raises(InvalidTokenError):
+        await logout_use_case.execute({})
+    with pytest.raises(InvalidTokenError):
+        await logout_use_case.execute({"refresh_token": 'garbage'})
@@ -0,0 +1,95 @@
+import socket
+
+import pytest
+
+from src.core.config import settings
+from src.infrastructure.exceptions import RabbitMQError
+from src.supervisor import WorkerSupervisor, run_worker
+
+
+class ExitedWorker:
+    """Worker process that already exited."""
+    pid = 1234
+    exitcode = 1
+    name = 'auth-worker-0'
+
+    def is_alive(self) -> bool:
+        return False
+
+    def close(self) -> None:
+        pass
+
+
+@pytest.fixture
+def supervisor(logger, monkeypatch):
+    supervisor = WorkerSupervisor(logger=logger, worker_count=1, min_uptime=10, max_restart_delay=4)
+    started = []
+    monkeypatch.setattr(supervisor, '_start_worker', started.append)
+    supervisor.started = started
+    return supervisor
+
+
+def test_refuses_several_workers_with_the_memory_token_store(logger, monkeypatch):
+    monkeypatch.setattr(settings, 'token_store_backend', 'memory')
+
+    with pytest.raises(ValueError):
+        WorkerSupervisor(logger=logger, worker_count=2).run()
+
+
+def test_restarts_a_worker_that_ran_long_enough_right_away(supervisor, monkeypatch):
+    monkeypatch.setattr('src.supervisor.time.monotonic', lambda: 100.0)
+    supervisor._workers[0] = ExitedWorker()
+    supervisor._started_at[0] = 50.0
+
+    supervisor._watch_workers()
+
+    assert supervisor.started == [0]
+
+
+def test_delays_the_restarts_of_a_crashing_worker(supervisor, monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr('src.supervisor.time.monotonic', lambda: now[0])
+
+    delays = []
+    for _ in range(4):
+        supervisor._workers[0] = ExitedWorker()
+        supervisor._started_at[0] = now[0]
+        supervisor.started.clear()
+
+        supervisor._watch_workers()
+        assert supervisor.started == []
+        delays.append(supervisor._restart_delay[0])
+
+        now[0] = supervisor._restart_at[0]
+        supervisor._watch_workers()
+        assert supervisor.started == [0]
+
+    assert delays == [1, 2, 4, 4]
+
+
+@pytest.mark.anyio
+async def test_worker_fails_when_the_listener_does_not_start(monkeypatch):
+    import src.main
+
+    stopped = []
+
+    async def setup_dependencies():
+        return object()
+
+    async def start_dependencies(_dependencies):
+        raise RabbitMQError(detail="RabbitMQ service is unavailable.")
+
+    async def stop_dependencies(dependencies):
+        stopped.append(dependencies)
+
+    monkeypatch.setattr(src.main, 'setup_dependencies', setup_dependencies)
+    monkeypatch.setattr(src.main, 'start_dependencies', start_dependencies)
+    monkeypatch.setattr(src.main, 'stop_dependencies', stop_dependencies)
+
+    http_socket = socket.create_server(('127.0.0.1', 0))
+    try:
+        # Not started, so the worker exits with an error and the supervisor restarts it
+        assert not await run_worker(http_socket)
+    finally:
+        http_socket.close()
+    assert len(stopped) == 1
@@ -0,0 +1,86 @@
+import asyncio
+import time
+
+import pytest
+
+from src.domain.models.refresh_tokens import RefreshTokenRecord
+from src.infrastructure.adapters.in_memory_token_store import InMemoryTokenStore
+from src.infrastructure.adapters.sqlite_token_store import SQLiteTokenStore
+
+pytestmark = pytest.mark.anyio
+
+
+def _record(jti: str, user_id: str = 'user', family_id: str = None, expires_in: float = 3600) -> RefreshTokenRecord:
+    return RefreshTokenRecord(jti=jti, user_id=user_id, family_id=family_id or jti, expires_at=time.time() + expires_in)
+
+
+@pytest.fixture(params=['memory', 'sqlite'])
+async def token_store(request, tmp_path):
+    if request.param == 'memory':
+        store = InMemoryTokenStore()
+    else:
+        store = SQLiteTokenStore(path=str(tmp_path / 'tokens.sqlite3'))
+    yield store
+    await store.close()
+
+
+async def test_stores_and_finds_a_token(token_store):
+    await token_store.add(_record('a'))
+
+    record = await token_store.get('a')
+
+    assert (record.jti, record.user_id, record.family_id) == ('a', 'user', 'a')
+    assert record.is_active()
+    assert await token_store.get('unknown') is None
+
+
+async def test_a_token_is_rotated_once(token_store):
+    await token_store.add(_record('a'))
+
+    assert await token_store.rotate('a', _record('b', family_id='a'))
+    assert not await token_store.rotate('a', _record('c', family_id='a'))
+    assert (await token_store.get('a')).replaced_by == 'b'
+    assert await token_store.get('c') is None
+
+
+async def test_concurrent_rotations_of_the_same_token(token_store):
+    await token_store.add(_record('a'))
+
+    rotated = await asyncio.gather(*(token_store.rotate('a', _record(f'b{i}', family_id='a')) for i in range(5)))
+
+    assert sorted(rotated) == [False] * 4 + [True]
+
+
+async def test_revokes_a_family_or_all_the_user_tokens(token_store):
+    await token_store.add(_record('a'))
+    await token_store.rotate('a', _record('b', family_id='a'))
+    await token_store.add(_record('c'))
+    await token_store.add(_record('d', user_id='other'))
+
+    assert await token_store.revoke_family('a') == 2
+    assert not await token_store.rotate('b', _record('e', family_id='a'))
+    assert await token_store.revoke_all_for_user('user') == 1
+    assert (await token_store.get('c')).revoked
+    assert (await token_store.get('d')).is_active()
+
+
+async def test_prunes_the_expired_tokens(token_store):
+    await token_store.add(_record('expired', expires_in=-1))
+    await token_store.add(_record('active'))
+
+    assert await token_store.prune_expired(time.time()) == 1
+    assert await token_store.get('expired') is None
+    assert await token_store.get('active') is not None
+
+
+async def test_sqlite_store_is_shared_between_instances(tmp_path):
+    path = str(tmp_path / 'tokens.sqlite3')
+    first, second = SQLiteTokenStore(path=path), SQLiteTokenStore(path=path)
+    try:
+        await first.add(_record('a'))
+
+        assert await second.rotate('a', _record('b', family_id='a'))
+        assert not await first.rotate('a', _record('c', family_id='a'))
+    finally:
+        await first.close()
+        await second.close()
@@ -0,0 +1,112 @@
+import asyncio
+import json
+
+import pytest
+
+from src.core.tracing import FileSpanExporter, InMemorySpanExporter, NOOP_SPAN, SpanContext, Tracer, \
+    format_traceparent, parse_traceparent
+
+TRACE_ID = '4bf92f3577b34da6a3ce929d0e0e4736'
+TRACEPARENT = f'00-{TRACE_ID}-00f067aa0ba902b7-01'
+
+
+@pytest.fixture
+def exporter() -> InMemorySpanExporter:
+    return InMemorySpanExporter()
+
+
+@pytest.fixture
+def tracer(exporter) -> Tracer:
+    return Tracer(exporter)
+
+
+def test_parses_the_traceparent():
+    context = parse_traceparent(TRACEPARENT.encode())
+
+    assert context == SpanContext(TRACE_ID, '00f067aa0ba902b7', True)
+    assert format_traceparent(context) == TRACEPARENT
+
+
+@pytest.mark.parametrize('value', [
+    None, 42, '', 'garbage',
+    f'ff-{TRACE_ID}-00f067aa0ba902b7-01',
+    f'00-{TRACE_ID}-00f067aa0ba902b7-01-extra',
+    f'00-{"0" * 32}-00f067aa0ba902b7-01',
+    f'00-{TRACE_ID}-{"0" * 16}-01',
+])
+def test_rejects_a_malformed_traceparent(value):
+    assert parse_traceparent(value) is None
+
+
+def test_child_spans_join_the_trace_of_their_parent(tracer, exporter):
+    parent = Tracer.extract({"traceparent": TRACEPARENT})
+
+    with tracer.start_span('handle', parent=parent, operation_type='login') as span:
+        with tracer.start_span('jwt.sign') as child:
+            headers = tracer.inject({})
+
+    assert headers == {"traceparent": child.traceparent}
+    assert [exported.name for exported in exporter.spans()] == ['jwt.sign', 'handle']
+    assert child.context.trace_id == span.context.trace_id == TRACE_ID
+    assert child.parent_id == span.context.span_id
+    assert span.parent_id == '00f067aa0ba902b7'
+    assert span.to_dict()['attributes'] == {"operation_type": 'login'}
+
+
+def test_failed_span_is_marked_as_an_error(tracer, exporter):
+    with pytest.raises(ValueError):
+        with tracer.start_span('handle'):
+            raise ValueError()
+
+    assert exporter.spans()[0].status == 'error'
+    assert exporter.spans()[0].attributes == {"error": 'ValueError'}
+
+
+def test_unsampled_traces_propagate_without_exporting(exporter):
+    tracer = Tracer(exporter, sample_rate=0)
+
+    with tracer.start_span('handle') as span:
+        headers = tracer.inject({})
+
+    assert headers["traceparent"].endswith('-00')
+    assert span.context.sampled is False
+    assert exporter.spans() == []
+
+
+@pytest.mark.anyio
+async def test_current_span_follows_the_tasks(tracer):
+    async def inject():
+        return tracer.inject({})
+
+    with tracer.start_span('handle') as span:
+        headers = await asyncio.create_task(inject())
+
+    assert headers == {"traceparent": span.traceparent}
+    assert tracer.inject({}) == {}
+
+
+def test_disabled_tracer_forwards_the_incoming_context():
+    tracer = Tracer()
+
+    with tracer.start_span('handle', parent=parse_traceparent(TRACEPARENT)):
+        with tracer.start_span('jwt.sign') as child:
+            headers = tracer.inject({})
+
+    assert child is NOOP_SPAN
+    assert headers == {"traceparent": TRACEPARENT}
+    assert tracer.start_span('handle') is NOOP_SPAN
+    assert tracer.inject({}) == {}
+
+
+def test_file_exporter_writes_json_lines(tmp_path):
+    path = tmp_path / 'spans' / 'spans.jsonl'
+    tracer = Tracer(FileSpanExporter(str(path)))
+
+    with tracer.start_span('handle', operation_type='login'):
+        pass
+    tracer.shutdown()
+
+    span = json.loads(path.read_text())
+    assert span['name'] == 'handle'
+    assert span['attributes'] == {"operation_type": 'login'}
+    assert not tracer.enabled
@@ -0,0 +1,72 @@
+import uuid
+
+import pytest
+
+from src.application.services.jwt_service import JWTService
+from src.application.use_cases.verify import VerifyTokenUseCase
+from src.core.exceptions import AuthServiceError
+from src.domain.schemas import RolesEnum
+
+pytestmark = pytest.mark.anyio
+
+USER_ID = uuid.uuid4()
+
+
+class CountingJWTService(JWTService):
+    def __init__(self):
+        super().__init__()
+        self.verified = 0
+
+    def verify(self, token: str, token_type: str) -> dict:
+        self.verified += 1
+        return super().verify(token, token_type)
+
+
+@pytest.fixture
+def jwt_service() -> CountingJWTService:
+    return CountingJWTService()
+
+
+@pytest.fixture
+def verify_use_case(jwt_service, logger) -> VerifyTokenUseCase:
+    return VerifyTokenUseCase(jwt_service=jwt_service, logger=logger, max_batch_size=5)
+
+
+async def test_answers_a_result_per_token_in_order(verify_use_case, jwt_service):
+    access_token = jwt_service.generate_access_token(USER_ID, [RolesEnum.USER])
+    refresh_token = jwt_service.generate_refresh_token(USER_ID, [RolesEnum.USER])
+
+    response = await verify_use_case.execute({"tokens": [access_token, 'garbage', refresh_token, 42]})
+
+    results = response.to_dict()['results']
+    assert results[0] == {"valid": True, "claims": jwt_service.verify(access_token, token_type='access')}
+    assert results[1] == {"valid": False, "error": "Malformed token."}
+    assert not results[2]['valid']
+    assert results[3] == {"valid": False, "error": "Malformed token."}
+
+
+async def test_verifies_a_single_token_of_the_given_type(verify_use_case, jwt_service):
+    refresh_token = jwt_service.generate_refresh_token(USER_ID, [RolesEnum.USER])
+
+    response = await verify_use_case.execute({"token": refresh_token, "token_type": 'refresh'})
+
+    assert response.results[0].valid
+    assert response.results[0].claims['sub'] == str(USER_ID)
+
+
+@pytest.mark.parametrize('payload', [{}, {"tokens": []}, {"tokens": 'not-a-list'}, {"tokens": ['t'] * 6}])
+async def test_rejects_empty_and_oversized_batches(verify_use_case, payload):
+    with pytest.raises(AuthServiceError) as error:
+        await verify_use_case.execute(payload)
+
+    assert error.value.status_code == 400
+
+
+async def test_verifies_repeated_tokens_once(verify_use_case, jwt_service):
+    access_token = jwt_service.generate_access_token(USER_ID, [RolesEnum.USER])
+
+    await verify_use_case.execute({"tokens": [access_token, access_token, 'garbage', 'garbage']})
+    response = await verify_use_case.execute({"tokens": [access_token, 'garbage']})
+
+    assert jwt_service.verified == 2
+    assert [result.valid for result in response.results] == [True, False]